@@ -0,0 +1,69 @@
+"""
+benchmark.py
+
+Time the pipeline operators on a synthetic city at one or more scales,
+append the results to a JSON-lines file and compare them with the last
+recorded run of each scale/case.
+
+    python bin/benchmark.py --scales block neighborhood --repeat 3
+"""
+
+import argparse
+import logging
+import sys
+
+from stp.testing.benchmark import (
+    CASES,
+    DEFAULT_RESULTS,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+from stp.testing.synth import SCALES
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--scales", nargs="+", default=["block"], choices=list(SCALES)
+    )
+    parser.add_argument("--cases", nargs="+", choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes for the tiled operators",
+    )
+    parser.add_argument("--out", default=str(DEFAULT_RESULTS))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout)
+    previous = load_results(args.out)
+    results = run_benchmarks(
+        args.scales, args.cases, repeat=args.repeat, seed=args.seed,
+        workers=args.workers,
+    )
+    save_results(results, args.out)
+
+    last = {}
+    if len(previous):
+        for row in previous.itertuples():
+            last[row.scale, row.case] = row.seconds
+    print(
+        f"{'scale':<13} {'case':<14} {'seconds':>9} {'rows':>9} "
+        f"{'vs last':>8}"
+    )
+    for row in results:
+        before = last.get((row["scale"], row["case"]))
+        ratio = f"{row['seconds'] / before:.2f}x" if before else "-"
+        print(
+            f"{row['scale']:<13} {row['case']:<14} {row['seconds']:>9.3f} "
+            f"{row['rows']:>9} {ratio:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
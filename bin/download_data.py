@@ -29,6 +29,7 @@ from stp.table import (
     record_layer_metadata_db,
 )
 from stp.fetch.lookup import FETCHERS
+from stp.pipeline.delta import record_changes
 
 logger = logging.getLogger(__name__)
 
@@ -76,7 +77,14 @@ def load_layer_list():
 
 
 def process_layer(
-    layer, idx, total, socrata_token, db_engine, gpkg, metadata_csv
+    layer,
+    idx,
+    total,
+    socrata_token,
+    db_engine,
+    gpkg,
+    metadata_csv,
+    output_epsg,
 ):
     """Fetch, record metadata, and store one layer."""
     layer_id = layer["id"]
@@ -131,6 +139,14 @@ def process_layer(
                 index=False,
             )
         else:
+            key = get("delta.keys", {}).get(clean_name)
+            if key and key in gdf:
+                # Log what changed since the last download for --delta,
+                # compared in the output CRS the stored layer is in
+                if gdf.crs is None:
+                    gdf = gdf.set_crs(epsg=source_epsg)
+                gdf = gdf.to_crs(epsg=output_epsg)
+                source_epsg = output_epsg
             record_layer_metadata_csv(
                 metadata_csv,
                 clean_name,
@@ -138,7 +154,10 @@ def process_layer(
                 source_epsg,
                 service_wkid,
             )
-            export_spatial_layer(gdf, clean_name, gpkg)
+            if key and key in gdf:
+                record_changes(gpkg, clean_name, gdf, key)
+            else:
+                export_spatial_layer(gdf, clean_name, gpkg)
 
 
 def finalize(gpkg, metadata_csv, output_epsg):
@@ -166,6 +185,7 @@ def main():
             db_engine,
             gpkg,
             metadata_csv,
+            output_epsg,
         )
     finalize(gpkg, metadata_csv, output_epsg)
 
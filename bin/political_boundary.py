@@ -1,72 +1,101 @@
 """
-tempp
+Build the ``political_boundaries`` overlay from the boundary layers.
+
+Every face of the result carries the key fields of each boundary layer
+listed under ``boundaries`` in the config.
 """
 from pathlib import Path
 import geopandas as gpd
 from sqlalchemy import create_engine
-from shapely.ops import unary_union
-from stp.config_loader import get_setting, get_constant
 from stp.config_loader import get_setting, get_constant
+from stp.ops.overlay import planar_overlay
+from stp.pipeline.study_area import resolve_study_area
 
-# 1) Paths and config
-base_dir = Path.cwd()
-db_cfg = get_setting("db", {})
-output_epsg = get_setting("data.output_epsg", get_constant("nysp_epsg", 2263))
-output_dir = Path(get_setting("data.output_shapefile", "Data/shapefiles"))
-output_dir.mkdir(parents=True, exist_ok=True)
 
-# 2) Setup storage mode
-engine = None
-if db_cfg.get("enabled"):
-    conn_url = (
-        f"{db_cfg['driver']}://{db_cfg['user']}:{db_cfg['password']}@"
-        f"{db_cfg['host']}:{db_cfg['port']}/{db_cfg['database']}"
-    )
-    engine = create_engine(conn_url)
-else:
-    gpkg_path = output_dir / get_constant(
-        "default_gpkg_name", "project_data.gpkg"
+def read_postgis_layer(engine, layer, area=None, srid=None):
+    """Read a PostGIS *layer*, only the rows meeting *area* if given."""
+    sql = f"SELECT * FROM {layer}"
+    params = None
+    if area is not None:
+        # Filtered in the database, so the spatial index does the work
+        sql += (
+            " WHERE ST_Intersects(geometry, "
+            "ST_GeomFromText(%(wkt)s, %(srid)s))"
+        )
+        params = {"wkt": area.wkt, "srid": srid}
+    return gpd.read_postgis(sql, engine, geom_col="geometry", params=params)
+
+
+def main():
+    # 1) Paths and config
+    db_cfg = get_setting("db", {})
+    output_epsg = get_setting(
+        "data.output_epsg", get_constant("nysp_epsg", 2263)
     )
-    if gpkg_path.exists():
-        gpkg_path.unlink()
+    output_dir = Path(get_setting("data.output_shapefile", "Data/shapefiles"))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # 2) Setup storage mode
+    engine = None
+    if db_cfg.get("enabled"):
+        conn_url = (
+            f"{db_cfg['driver']}://{db_cfg['user']}:{db_cfg['password']}@"
+            f"{db_cfg['host']}:{db_cfg['port']}/{db_cfg['database']}"
+        )
+        engine = create_engine(conn_url)
+    else:
+        gpkg_path = output_dir / get_constant(
+            "default_gpkg_name", "project_data.gpkg"
+        )
 
-# 3) Define layers to process
-layer_ids = [
-    "borough", "community_districts", "city_council_districts",
-    "us_congressional_districts", "state_senate_districts",
-    "state_assembly_districts", "community_district_tabulation_areas",
-    "neighborhood_tabulation_areas", "census_tracts", "census_blocks",
-    "zoning_districts", "commercial_districts", "special_purpose_districts"
-]
+    # 3) Define layers to process and the key fields kept from each
+    boundary_fields = get_setting(
+        "boundaries", get_constant("boundaries", {})
+    )
 
-# 4) Load each layer into GeoDataFrames
-gdfs = []
-for layer in layer_ids:
+    # 4) Load each layer into GeoDataFrames, only near the study area
     if engine:
-        # Read from PostGIS
-        gdf = gpd.read_postgis(
-            f"SELECT * FROM {layer}", engine, geom_col="geometry"
+        area = resolve_study_area(
+            get_setting("study_area"),
+            None,
+            boundary_fields,
+            crs=output_epsg,
+            reader=lambda layer: read_postgis_layer(engine, layer),
+        )
+    else:
+        area = resolve_study_area(
+            get_setting("study_area"), gpkg_path, boundary_fields
         )
-        gdf = gpd.read_postgis(
-            f"SELECT * FROM {layer}", engine, geom_col="geometry"
+    gdfs = {}
+    for layer in boundary_fields:
+        if engine:
+            # Read from PostGIS
+            gdf = read_postgis_layer(engine, layer, area, output_epsg)
+            gdf.set_crs(epsg=output_epsg, inplace=True)
+        else:
+            # Read from GeoPackage
+            gdf = gpd.read_file(gpkg_path, layer=layer, mask=area)
+        gdfs[layer] = gdf.to_crs(epsg=output_epsg)
+
+    # 5) Overlay all boundaries, keeping district ids on every face
+    result_gdf = planar_overlay(
+        gdfs,
+        boundary_fields,
+        workers=get_setting("parallel.workers"),
+        grid_size=get_setting("precision"),
+    )
+
+    # 6) Persist the result
+    if engine:
+        result_gdf.to_postgis(
+            "political_boundaries", engine, if_exists="replace", index=False
         )
-        gdf.set_crs(epsg=output_epsg, inplace=True)
     else:
-        # Read from GeoPackage
-        gdf = gpd.read_file(gpkg_path, layer=layer)
-    gdfs.append(gdf)
+        result_gdf.to_file(
+            gpkg_path, layer="political_boundaries", driver="GPKG"
+        )
+    print("✅ political_boundaries created")
 
-# 5) Union all boundaries
-all_union = unary_union([gdf.unary_union for gdf in gdfs])
-result_gdf = gpd.GeoDataFrame([{"geometry": all_union}], crs=output_epsg)
 
-# 6) Persist the result
-if engine:
-    result_gdf.to_postgis(
-        "political_boundaries", engine, if_exists="replace", index=False
-    )
-else:
-    result_gdf.to_file(
-        gpkg_path, layer="political_boundaries", driver="GPKG"
-    )
-print("✅ political_boundaries created")
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,69 @@
 """Generate curb polygons around lines using GeoPandas/Shapely."""
-import math
 from pathlib import Path
 
 import geopandas as gpd
+import numpy as np
+import pyogrio
+import shapely
 import yaml
-from shapely.geometry import Polygon
-
-def get_dominant_segment_angle(line):
-    """Return angle (radians) of the longest segment in a LineString."""
-    max_len = 0.0
-    best_angle = 0.0
-    coords = list(line.coords)
-    for (x1, y1), (x2, y2) in zip(coords[:-1], coords[1:]):
-        dx = x2 - x1
-        dy = y2 - y1
-        seg_len = math.hypot(dx, dy)
-        if seg_len > max_len:
-            max_len = seg_len
-            best_angle = math.atan2(dy, dx)
-    return best_angle
+
+from stp.pipeline.study_area import resolve_study_area
+
+
+def get_dominant_segment_angles(coords, owner, size):
+    """Return the angle (radians) of each line's longest segment.
+
+    *coords* and *owner* come from ``shapely.get_coordinates(...,
+    return_index=True)``; lines are numbered ``0 .. size - 1``. The first
+    of equally long segments wins, and lines without a segment get 0.
+    """
+    same = owner[1:] == owner[:-1]
+    dx = np.diff(coords[:, 0])[same]
+    dy = np.diff(coords[:, 1])[same]
+    seg_owner = owner[1:][same]
+    # Longest first within each line; lexsort is stable for ties
+    order = np.lexsort((-np.hypot(dx, dy), seg_owner))
+    present, first = np.unique(seg_owner[order], return_index=True)
+    best = order[first]
+    angles = np.zeros(size)
+    angles[present] = np.arctan2(dy[best], dx[best])
+    return angles
+
 
 def generate_polygons(lines_gdf, extension_distance, buffer_width):
     """Return GeoDataFrame of rectangles around each line."""
-    polys = []
-    for line in lines_gdf.geometry:
-        if line is None or len(line.coords) < 2:
-            continue
-
-        angle = get_dominant_segment_angle(line)
-        sx, sy = line.coords[0]
-        ex, ey = line.coords[-1]
-
-        # Extend line ends
-        sx -= extension_distance * math.cos(angle)
-        sy -= extension_distance * math.sin(angle)
-        ex += extension_distance * math.cos(angle)
-        ey += extension_distance * math.sin(angle)
-
-        # Buffer offset
-        dx = (buffer_width / 2.0) * math.sin(angle)
-        dy = (buffer_width / 2.0) * math.cos(angle)
-
-        points = [
-            (sx - dx, sy + dy),
-            (ex - dx, ey + dy),
-            (ex + dx, ey - dy),
-            (sx + dx, sy - dy),
-        ]
-        polys.append(Polygon(points))
-
+    geoms = np.asarray(lines_gdf.geometry.values, dtype=object)
+    geoms = geoms[shapely.get_num_coordinates(geoms) >= 2]
+    coords, owner = shapely.get_coordinates(geoms, return_index=True)
+    angle = get_dominant_segment_angles(coords, owner, len(geoms))
+    first = np.searchsorted(owner, np.arange(len(geoms)))
+    last = np.searchsorted(owner, np.arange(len(geoms)), side="right") - 1
+    cos, sin = np.cos(angle), np.sin(angle)
+
+    # Extend line ends along the dominant direction
+    sx = coords[first, 0] - extension_distance * cos
+    sy = coords[first, 1] - extension_distance * sin
+    ex = coords[last, 0] + extension_distance * cos
+    ey = coords[last, 1] + extension_distance * sin
+
+    # Buffer offset
+    dx = (buffer_width / 2.0) * sin
+    dy = (buffer_width / 2.0) * cos
+
+    corners = np.stack(
+        [
+            np.column_stack([sx - dx, sy + dy]),
+            np.column_stack([ex - dx, ey + dy]),
+            np.column_stack([ex + dx, ey - dy]),
+            np.column_stack([sx + dx, sy - dy]),
+            np.column_stack([sx - dx, sy + dy]),
+        ],
+        axis=1,
+    )
+    polys = shapely.polygons(corners)
     return gpd.GeoDataFrame({"geometry": polys}, crs=lines_gdf.crs)
 
+
 def main():
     """Entry point for CLI usage: build curb buffer polygons."""
     base_dir = Path.cwd()
@@ -65,7 +78,14 @@ def main():
     out_dir = Path(config.get("output_shapefiles", "Data/shapefiles"))
     gpkg = out_dir / "project_data.gpkg"
 
-    lines = gpd.read_file(gpkg, layer="curb")
+    # Optional study area, in any form resolve_study_area accepts
+    area = resolve_study_area(
+        config.get("study_area"),
+        gpkg,
+        config.get("boundaries"),
+        crs=pyogrio.read_info(gpkg, layer="curb")["crs"],
+    )
+    lines = gpd.read_file(gpkg, layer="curb", mask=area)
     polys = generate_polygons(lines, ext_dist, buff_width)
 
     polys.to_file(gpkg, layer="curb_buffer", driver="GPKG")
@@ -20,6 +20,122 @@ Follows the primary scope defined in the README:
 import argparse
 import logging
 import sys
+from pathlib import Path
+
+import pandas as pd
+import pyogrio
+
+from stp.core.config import with_defaults
+from stp.core.parallel import configured_workers
+from stp.ops.attribute import load_or_build_index
+from stp.ops.centerline import sidewalk_centerlines
+from stp.ops.erase import pairwise_erase
+from stp.ops.linear import place_points
+from stp.ops.nodes import (
+    DEFAULT_GRID,
+    DEFAULT_INTERSECTION_BUFFER,
+    DEFAULT_MIN_DEGREE,
+    intersection_buffers,
+)
+from stp.ops.raster import DEFAULT_CLASSES, raster_to_polygons
+from stp.ops.signs import (
+    DEFAULT_CURB_SHIFT,
+    SNAP_DISTANCE,
+    clean_signs,
+    no_standing_segments,
+    snap_signs,
+)
+from stp.ops.snap import SNAP_ID, snap_points
+from stp.ops.union import dissolve_to_frame, union_polygons
+from stp.pipeline.cache import DEFAULT_CACHE_DIR, StageCache
+from stp.pipeline.dag import PROCESS, Stage, run_graph, select_stages
+from stp.pipeline.delta import (
+    CHANGES_LAYER,
+    clear_changes,
+    dirty_region,
+    dirty_tiles,
+)
+from stp.pipeline.scheduler import (
+    DEFAULT_HALO,
+    DEFAULT_TILE_SIZE,
+    TILE_ID,
+    boundary_tiles,
+    grid_tiles,
+    is_stitched,
+    run_tiles,
+)
+from stp.pipeline.study_area import apply_study_area, study_mask
+from stp.pipeline.trace import DEFAULT_TRACE_DIR, RunTrace
+from stp.storage.file_storage import (
+    export_spatial_layer,
+    list_spatial_layers,
+    read_spatial_layer,
+)
+
+DEFAULT_GPKG = Path("Data") / "shapefiles" / "project_data.gpkg"
+DEFAULT_BOUNDARY_INDEX = Path("Data") / "cache" / "boundary_index.pkl"
+DEFAULT_SPACING = 25.0
+DEFAULT_HYDRANT_BUFFER = 3.0
+DEFAULT_TILE_DIR = Path("Data") / "tiles"
+
+# Layers stitched back from the tiles after a tiled run
+TILED_OUTPUTS = [
+    "sidewalk_plantable",
+    "no_standing",
+    "planting_points",
+    "planting_points_attributed",
+]
+
+# "_ready" layers from the original workflow (see scrap.md)
+NO_PLANT_LAYERS = [
+    "nyzd_ready",
+    "dep_gi_assets_ready",
+    "curb_cuts_ready",
+    "subway_lines_ready",
+    "workorders_ready",
+    "treeandsite_ready",
+    "grass_shrub_ready",
+    "hydrants_ready",
+    "intersections_ready",
+]
+
+
+def _gpkg(params):
+    """Return the GeoPackage the pipeline reads from and writes to."""
+    return Path(params.get("gpkg", DEFAULT_GPKG))
+
+
+def _stages(params, names=None):
+    """Return :data:`STAGES` (or those in *names*) for *params*.
+
+    ``join_and_export`` gets the configured ``boundaries`` layers as
+    inputs, so the graph orders it after whatever produces them.
+    """
+    join = ("planting_points", *(params.get("boundaries") or {}))
+    stages = [
+        s._replace(inputs=join) if s.name == "join_and_export" else s
+        for s in STAGES
+    ]
+    if names is not None:
+        stages = [s for s in stages if s.name in names]
+    return stages
+
+
+def _read(params, layer):
+    """Read *layer* from the pipeline GeoPackage.
+
+    With a ``study_area``, only features within the tile halo of it are
+    read (an R-tree filtered read), so buffers at its edge stay whole.
+    With a ``precision`` grid, coordinates are snapped to it on the way
+    in, repairing any geometry the snapping makes invalid.
+    """
+    halo = params.get("tiles", {}).get("halo", DEFAULT_HALO)
+    gdf = read_spatial_layer(
+        _gpkg(params), layer, mask=study_mask(params, halo)
+    )
+    if params.get("precision"):
+        gdf = gdf.set_geometry(gdf.geometry.set_precision(params["precision"]))
+    return gdf
 
 
 def parse_args():  # noqa: D103
@@ -35,6 +151,43 @@ def parse_args():  # noqa: D103
     parser.add_argument(
         "--config", required=True, help="Path to config YAML file"
     )
+    parser.add_argument(
+        "--tiled",
+        action="store_true",
+        help="Run the spatial stages per tile (see 'tiles' in the config)",
+    )
+    parser.add_argument(
+        "--tile",
+        action="append",
+        dest="tile_ids",
+        help="Rerun only this tile id (repeatable, implies --tiled)",
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        help="Run only these stages; '+name' adds its upstream stages "
+        "and 'name+' its downstream ones",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Run every stage even if its outputs are cached",
+    )
+    parser.add_argument(
+        "--cache-status",
+        action="store_true",
+        help="Print which stages would be reused from the cache and exit",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Rerun only the tiles touched by logged source changes",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a cProfile dump per stage next to the run trace",
+    )
     return parser.parse_args()
 
 
@@ -42,6 +195,9 @@ def load_parameters(config_path):  # noqa: D103
     """
     Load pipeline parameters from a YAML config file.
 
+    The file is merged over the packaged defaults.yaml, so settings it
+    leaves out keep their default values.
+
     Args:
         config_path (str): Path to config file
 
@@ -52,7 +208,7 @@ def load_parameters(config_path):  # noqa: D103
 
     with open(config_path) as fh:
         params = yaml.safe_load(fh)
-    return params
+    return with_defaults(params)
 
 
 def download_sources(params):  # noqa: D103
@@ -88,81 +244,399 @@ def clean_datasets(params):  # noqa: D103
     pass
 
 
-def apply_spatial_ops(params):  # noqa: D103
+def snap_hydrants(params):  # noqa: D103
     """
-    Apply buffers, filters, and custom scripts.
+    Apply buffers: fire hydrants.
+
+    Snaps ``hydrants`` to the nearest ``sidewalk`` edge and writes their
+    ``hydrants.buffer`` foot buffers to ``hydrants_ready``.
 
     Args:
         params (dict): Pipeline parameters
     """
-    # TODO: implement spatial operations
-    pass
+    gpkg = _gpkg(params)
+    if not {"hydrants", "sidewalk"} <= set(list_spatial_layers(gpkg)):
+        logging.warning("Skipping hydrants, no hydrants/sidewalk layers")
+        return
+    opts = params.get("hydrants", {})
+    sidewalk = _read(params, "sidewalk")
+    hydrants = snap_points(
+        _read(params, "hydrants").to_crs(sidewalk.crs),
+        sidewalk,
+        opts.get("max_distance"),
+    )
+    hydrants = hydrants[hydrants[SNAP_ID] >= 0]
+    hydrants = hydrants.set_geometry(
+        hydrants.buffer(opts.get("buffer", DEFAULT_HYDRANT_BUFFER))
+    )
+    export_spatial_layer(hydrants, "hydrants_ready", gpkg)
+
+
+def buffer_intersections(params):  # noqa: D103
+    """
+    Apply buffers: street intersections.
+
+    Buffers each true intersection of ``street_center`` once into
+    ``intersections_ready``.
+
+    Args:
+        params (dict): Pipeline parameters
+    """
+    gpkg = _gpkg(params)
+    if "street_center" not in list_spatial_layers(gpkg):
+        logging.warning("Skipping intersections, no street_center layer")
+        return
+    opts = params.get("intersections", {})
+    streets = _read(params, "street_center")
+    # Addressed streets only, as in the original model
+    if "L_LOW_HN" in streets:
+        low = streets["L_LOW_HN"].fillna("").astype(str).str.strip()
+        streets = streets[low != ""]
+    buffers = intersection_buffers(
+        streets,
+        opts.get("buffer", DEFAULT_INTERSECTION_BUFFER),
+        opts.get("min_degree", DEFAULT_MIN_DEGREE),
+        opts.get("grid", DEFAULT_GRID),
+    )
+    export_spatial_layer(buffers, "intersections_ready", gpkg)
+
+
+def vectorize_land_cover(params):  # noqa: D103
+    """
+    Apply filters: grass and shrub land cover.
+
+    When ``land_cover.path`` is set, the grass/shrub classes of that
+    raster are vectorized into ``grass_shrub_ready`` (only the windows
+    around the ``study_area``, if one is set).
+
+    Args:
+        params (dict): Pipeline parameters
+    """
+    cover = params.get("land_cover", {})
+    if not cover.get("path"):
+        return
+    halo = params.get("tiles", {}).get("halo", DEFAULT_HALO)
+    area = study_mask(params, halo)
+    raster_to_polygons(
+        Path(cover["path"]),
+        _gpkg(params),
+        "grass_shrub_ready",
+        cover.get("classes", DEFAULT_CLASSES),
+        bbox=None if area is None else area.bounds,
+        workers=configured_workers(params),
+    )
 
 
 def build_sidewalk_polylines(params):  # noqa: D103
     """
     Create mutable and immutable sidewalk polylines.
 
+    Collapses the ``sidewalk`` polygons to centerlines and writes them
+    twice: ``sidewalk_immutable`` for sign/parking rules and
+    ``sidewalk_mutable`` for clipping.
+
     Args:
         params (dict): Pipeline parameters
     """
-    # TODO: implement polyline creation
-    pass
+    gpkg = _gpkg(params)
+    if "sidewalk" not in list_spatial_layers(gpkg):
+        logging.warning("Skipping polylines, no sidewalk layer in %s", gpkg)
+        return
+    opts = params.get("centerline", {})
+    lines = sidewalk_centerlines(
+        _read(params, "sidewalk"),
+        workers=configured_workers(params),
+        **opts,
+    )
+    export_spatial_layer(lines, "sidewalk_immutable", gpkg)
+    export_spatial_layer(lines, "sidewalk_mutable", gpkg)
 
 
 def merge_no_plant_zones(params):  # noqa: D103
     """
     Merge polygons where plantings cannot occur.
 
+    Unions every available layer in ``no_plant_layers`` with the tiled
+    union engine and writes the single-part result to ``no_plant_zones``.
+
     Args:
         params (dict): Pipeline parameters
     """
-    # TODO: implement merge logic
-    pass
+    gpkg = _gpkg(params)
+    available = set(list_spatial_layers(gpkg))
+    frames = [
+        _read(params, name)
+        for name in params.get("no_plant_layers", NO_PLANT_LAYERS)
+        if name in available
+    ]
+    if not frames:
+        logging.warning("No do-not-plant layers found in %s", gpkg)
+        return
+    geoms = pd.concat([gdf.geometry for gdf in frames], ignore_index=True)
+    merged = union_polygons(
+        geoms,
+        workers=configured_workers(params),
+        grid_size=params.get("precision"),
+    )
+    export_spatial_layer(
+        dissolve_to_frame(merged, crs=frames[0].crs), "no_plant_zones", gpkg
+    )
 
 
 def clip_sidewalk(params):  # noqa: D103
     """
     Clip do-not-plant zones with sidewalk polyline.
 
+    Erases ``no_plant_zones`` from ``sidewalk_mutable`` and writes the
+    remaining plantable linework to ``sidewalk_plantable``.
+
     Args:
         params (dict): Pipeline parameters
     """
-    # TODO: implement clipping
-    pass
+    gpkg = _gpkg(params)
+    available = set(list_spatial_layers(gpkg))
+    missing = {"sidewalk_mutable", "no_plant_zones"} - available
+    if missing:
+        logging.warning("Skipping clip, missing layers: %s", sorted(missing))
+        return
+    sidewalk = _read(params, "sidewalk_mutable")
+    zones = _read(params, "no_plant_zones")
+    plantable = pairwise_erase(
+        sidewalk,
+        zones,
+        workers=configured_workers(params),
+        grid_size=params.get("precision"),
+    )
+    export_spatial_layer(plantable, "sidewalk_plantable", gpkg)
 
 
 def process_parking_and_signs(params):  # noqa: D103
     """
     Build parking zones and classify rules, and process MTA zones.
 
+    Cleans the ``street_sign`` records, snaps them to
+    ``sidewalk_immutable`` and writes the sign-split, flagged segments to
+    ``no_standing``; signs with no sidewalk within reach go to
+    ``sign_errors``. Options come from the ``signs`` parameters.
+
     Args:
         params (dict): Pipeline parameters
     """
-    # TODO: implement parking and sign logic
-    pass
+    gpkg = _gpkg(params)
+    opts = params.get("signs", {})
+    layer = opts.get("layer", "street_sign")
+    available = set(list_spatial_layers(gpkg))
+    missing = {layer, "sidewalk_immutable"} - available
+    if missing:
+        logging.warning("Skipping signs, missing layers: %s", sorted(missing))
+        return
+    lines = _read(params, "sidewalk_immutable")
+    signs = clean_signs(
+        _read(params, layer),
+        opts.get("desc_field", "sign_description"),
+        opts.get("side_field", "side_of_street"),
+        opts.get("curb_shift", DEFAULT_CURB_SHIFT),
+    ).to_crs(lines.crs)
+    snapped, orphans = snap_signs(
+        signs, lines, opts.get("max_distance", SNAP_DISTANCE)
+    )
+    if len(orphans):
+        logging.info("%d signs without a sidewalk", len(orphans))
+        export_spatial_layer(orphans, "sign_errors", gpkg)
+    export_spatial_layer(
+        no_standing_segments(lines, snapped), "no_standing", gpkg
+    )
 
 
 def generate_planting_locations(params):  # noqa: D103
     """
     Generate potential planting locations within allowed areas.
 
+    Places candidate points every ``spacing`` feet along
+    ``sidewalk_plantable`` with the linear-referencing engine, which also
+    settles conflicts between lines closer than ``buffer_dist``, and
+    writes them to ``planting_points``. With a ``study_area``, points in
+    the halo around it are dropped.
+
     Args:
         params (dict): Pipeline parameters
     """
-    # TODO: implement location generation
-    pass
+    gpkg = _gpkg(params)
+    if "sidewalk_plantable" not in list_spatial_layers(gpkg):
+        logging.warning("Skipping points, no sidewalk_plantable in %s", gpkg)
+        return
+    lines = _read(params, "sidewalk_plantable")
+    points = place_points(
+        lines,
+        params.get("spacing", DEFAULT_SPACING),
+        buffer_dist=params.get("buffer_dist"),
+    )
+    area = study_mask(params)
+    if area is not None:
+        points = points[points.intersects(area)]
+    export_spatial_layer(points, "planting_points", gpkg)
 
 
 def join_and_export(params):  # noqa: D103
     """
     Join planting points with sidewalk attributes and export.
 
+    Tags every point in ``planting_points`` with the key fields of each
+    layer in ``boundaries`` using a cached :class:`BoundaryIndex`, and
+    writes ``planting_points_attributed``. Raises ``ValueError`` when
+    the config clears ``boundaries``.
+
     Args:
         params (dict): Pipeline parameters
     """
-    # TODO: implement join and export
-    pass
+    gpkg = _gpkg(params)
+    if "planting_points" not in list_spatial_layers(gpkg):
+        logging.warning("Skipping join, no planting_points in %s", gpkg)
+        return
+    boundaries = params.get("boundaries")
+    if not boundaries:
+        raise ValueError("No boundary layers configured under 'boundaries'")
+    points = _read(params, "planting_points")
+    index = load_or_build_index(
+        params.get("boundary_index", DEFAULT_BOUNDARY_INDEX),
+        gpkg,
+        boundaries,
+        crs=points.crs,
+    )
+    joined = points.join(index.attribute(points))
+    export_spatial_layer(joined, "planting_points_attributed", gpkg)
+
+
+def _tiles(params):
+    """Return the tiles described by the ``tiles`` parameters (only those
+    overlapping the ``study_area``, if one is set)."""
+    gpkg = _gpkg(params)
+    opts = params.get("tiles", {})
+    by = opts.get("by", "grid")
+    if by == "grid":
+        info = pyogrio.read_info(
+            gpkg, layer="sidewalk", force_total_bounds=True
+        )
+        tiles = grid_tiles(
+            info["total_bounds"],
+            opts.get("size", DEFAULT_TILE_SIZE),
+            crs=info["crs"],
+        )
+    else:
+        tiles = boundary_tiles(read_spatial_layer(gpkg, by), opts["field"])
+    area = study_mask(params)
+    if area is not None:
+        tiles = tiles[tiles.intersects(area)]
+    return tiles
+
+
+def run_tiled(params, only=None, stages=None):
+    """
+    Run the spatial stages tile by tile and stitch the outputs.
+
+    Each tile reads its inputs within a halo of ``tiles.halo`` feet (the
+    largest buffer), runs the selected :data:`TILED_STAGES` in a worker
+    and hands back only the features whose representative point is in
+    the tile.
+
+    Args:
+        params (dict): Pipeline parameters
+        only (list): Tile ids to rerun, default every unfinished tile
+        stages (list): Stage specs, see :func:`select_stages`
+    """
+    opts = params.get("tiles", {})
+    chain = _stages(params, TILED_STAGES)
+    if stages:
+        chain = select_stages(chain, stages)
+    outputs = opts.get("outputs", TILED_OUTPUTS)
+    failed = run_tiles(
+        [s.func for s in chain],
+        params,
+        _tiles(params),
+        outputs,
+        work_dir=Path(opts.get("work_dir", DEFAULT_TILE_DIR)),
+        halo=opts.get("halo", DEFAULT_HALO),
+        retries=opts.get("retries", 1),
+        only=only,
+        workers=configured_workers(params),
+    )
+    if failed:
+        logging.error(
+            "Tiles not finished: %s (rerun with --tile)", sorted(failed)
+        )
+        raise SystemExit(1)
+    # The stitched layers no longer hold what the stage cache put there
+    StageCache(
+        params.get("cache_dir", DEFAULT_CACHE_DIR), _gpkg(params)
+    ).invalidate(outputs)
+
+
+def run_delta(params, stages=None):
+    """
+    Rerun only the tiles touched by the logged source changes.
+
+    The ``source_changes`` recorded at download time are grown by the
+    ``delta.grow`` buffer distance of their layer (the tile halo by
+    default) and by the source ``sidewalk`` polygons they reach (each
+    holds the line placed along it; the lines themselves are not
+    stitched back); the tiles overlapping that region are rerun and
+    swapped into the stitched outputs. Without
+    earlier tiled outputs (a citywide run, or tile results cleared from
+    ``tiles.work_dir``) every tile runs.
+
+    Args:
+        params (dict): Pipeline parameters
+        stages (list): Stage specs, see :func:`select_stages`
+    """
+    gpkg = _gpkg(params)
+    available = set(list_spatial_layers(gpkg))
+    if CHANGES_LAYER not in available:
+        logging.info("No source changes logged in %s", gpkg)
+        return
+    opts = params.get("delta", {})
+    tiling = params.get("tiles", {})
+    tiles = _tiles(params)
+    if not is_stitched(
+        tiles,
+        Path(tiling.get("work_dir", DEFAULT_TILE_DIR)),
+        gpkg,
+        tiling.get("outputs", TILED_OUTPUTS),
+    ):
+        logging.info("No earlier tiled run, running every tile")
+        run_tiled(params, list(tiles[TILE_ID]), stages)
+    else:
+        lines = None
+        if "sidewalk" in available:
+            lines = read_spatial_layer(gpkg, "sidewalk")
+        halo = tiling.get("halo", DEFAULT_HALO)
+        region = dirty_region(
+            read_spatial_layer(gpkg, CHANGES_LAYER),
+            opts.get("grow", halo),
+            lines,
+        )
+        only = dirty_tiles(tiles, region)
+        logging.info("Changes touch %d tiles: %s", len(only), only)
+        if only:
+            run_tiled(params, only, stages)
+    clear_changes(gpkg)
+
+
+def show_cache_status(params, stages=None):
+    """
+    Print whether each stage would be reused from the stage cache.
+
+    Args:
+        params (dict): Pipeline parameters
+        stages (list): Stage specs, see :func:`select_stages`
+    """
+    chosen = _stages(params)
+    if stages:
+        chosen = select_stages(chosen, stages)
+    cache = StageCache(
+        params.get("cache_dir", DEFAULT_CACHE_DIR), _gpkg(params)
+    )
+    for name, key, status in cache.status(chosen, params):
+        print(f"{name:<30} {status:<5} {key or ''}")
 
 
 def main():  # noqa: D103
@@ -171,6 +645,12 @@ def main():  # noqa: D103
     """
     args = parse_args()
     params = load_parameters(args.config)
+    if params.get("study_area"):
+        gpkg = _gpkg(params)
+        crs = None
+        if "sidewalk" in list_spatial_layers(gpkg):
+            crs = pyogrio.read_info(gpkg, layer="sidewalk")["crs"]
+        params = apply_study_area(params, gpkg, crs)
 
     # Set up logging
     logging.basicConfig(
@@ -179,19 +659,85 @@ def main():  # noqa: D103
         stream=sys.stdout,
     )
 
+    if args.cache_status:
+        show_cache_status(params, args.stages)
+        return
+
     logging.info("Starting STP pipeline")
-    download_sources(params)
-    convert_to_geojson(params)
-    clean_datasets(params)
-    apply_spatial_ops(params)
-    build_sidewalk_polylines(params)
-    merge_no_plant_zones(params)
-    clip_sidewalk(params)
-    process_parking_and_signs(params)
-    generate_planting_locations(params)
-    join_and_export(params)
+    trace = RunTrace(
+        params.get("trace_dir", DEFAULT_TRACE_DIR), profile=args.profile
+    )
+    stages = _stages(params)
+    citywide = [s for s in stages if s.name not in TILED_STAGES]
+    try:
+        if args.delta:
+            run_graph(citywide, params, workers=1, trace=trace)
+            run_delta(params, args.stages)
+        elif args.tiled or args.tile_ids:
+            run_graph(citywide, params, workers=1, trace=trace)
+            run_tiled(params, args.tile_ids, args.stages)
+        else:
+            if args.stages:
+                stages = select_stages(stages, args.stages)
+            cache = None if args.no_cache else StageCache(
+                params.get("cache_dir", DEFAULT_CACHE_DIR), _gpkg(params)
+            )
+            run_graph(
+                stages,
+                params,
+                workers=params.get("stage_workers"),
+                cache=cache,
+                trace=trace,
+            )
+    finally:
+        paths = trace.write()
+        logging.info(
+            "Run report %s, trace %s", paths["report"], paths["trace"]
+        )
     logging.info("STP pipeline completed successfully")
 
 
+# Stage graph: artifacts are GeoPackage layers, plus "downloads",
+# "geojson" and "sources" to order the preparation steps. CPU-bound stages
+# run in processes; "params" lists the parameters each cached stage uses.
+# The boundary inputs of join_and_export are added by _stages().
+STAGES = [
+    Stage("download_sources", download_sources, (), ("downloads",)),
+    Stage("convert_to_geojson", convert_to_geojson, ("downloads",),
+          ("geojson",)),
+    Stage("clean_datasets", clean_datasets, ("geojson",), ("sources",)),
+    Stage("snap_hydrants", snap_hydrants,
+          ("sources", "hydrants", "sidewalk"), ("hydrants_ready",),
+          params=("hydrants",)),
+    Stage("buffer_intersections", buffer_intersections,
+          ("sources", "street_center"), ("intersections_ready",),
+          params=("intersections",)),
+    # The raster lives outside the GeoPackage, so this one is not cached
+    Stage("vectorize_land_cover", vectorize_land_cover, ("sources",),
+          ("grass_shrub_ready",), PROCESS),
+    Stage("build_sidewalk_polylines", build_sidewalk_polylines,
+          ("sources", "sidewalk"), ("sidewalk_immutable", "sidewalk_mutable"),
+          PROCESS, params=("centerline",)),
+    Stage("merge_no_plant_zones", merge_no_plant_zones,
+          ("sources", *NO_PLANT_LAYERS), ("no_plant_zones",), PROCESS,
+          params=("no_plant_layers",)),
+    Stage("clip_sidewalk", clip_sidewalk,
+          ("sidewalk_mutable", "no_plant_zones"), ("sidewalk_plantable",),
+          PROCESS, params=()),
+    Stage("process_parking_and_signs", process_parking_and_signs,
+          ("sources", "street_sign", "sidewalk_immutable"),
+          ("no_standing", "sign_errors"), PROCESS, params=("signs",)),
+    Stage("generate_planting_locations", generate_planting_locations,
+          ("sidewalk_plantable",), ("planting_points",), PROCESS,
+          params=("spacing", "buffer_dist")),
+    Stage("join_and_export", join_and_export,
+          ("planting_points",), ("planting_points_attributed",),
+          params=("boundaries",)),
+]
+
+# Stages that only need data near each feature, so they can run per tile
+TILED_STAGES = {s.name for s in STAGES[3:]}
+
+
 if __name__ == "__main__":  # noqa: G004
     main()
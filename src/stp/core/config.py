@@ -55,13 +55,14 @@ def _merge(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
     return result
 
 
+# Shipped inside the package, so installed copies find it too
+DEFAULTS_PATH = Path(__file__).resolve().parents[1] / "defaults.yaml"
+
+
 @lru_cache(maxsize=1)
 def _load_defaults() -> Dict[str, Any]:
     """Load defaults.yaml once and cache it for fast subsequent access."""
-    # Locate the repo root relative to this file
-    root = Path(__file__).resolve().parents[2]
-    path = root / "config" / "defaults.yaml"
-    with open(path, encoding="utf-8") as f:
+    with open(DEFAULTS_PATH, encoding="utf-8") as f:
         # Safe-load YAML; return empty dict if file is empty
         return yaml.safe_load(f) or {}
 
@@ -87,6 +88,11 @@ def load_config() -> Dict[str, Any]:
     return _merge(defaults, overrides)
 
 
+def with_defaults(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Return *params* deep-merged over defaults.yaml (params win)."""
+    return _merge(_load_defaults(), params or {})
+
+
 def get_setting(
     key: str,
     default: Any | None = None,
@@ -131,4 +137,10 @@ def get_constant(key: str, default: Any | None = None) -> Any:
     return default if value is None else value
 
 
-__all__ = ["load_user_config", "load_config", "get_setting", "get_constant"]
+__all__ = [
+    "load_user_config",
+    "load_config",
+    "with_defaults",
+    "get_setting",
+    "get_constant",
+]
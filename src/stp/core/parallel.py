@@ -0,0 +1,309 @@
+"""Process-pool helpers for chunked geometry work."""
+
+from __future__ import annotations
+
+import math
+import os
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextlib import ExitStack, contextmanager
+from multiprocessing.shared_memory import SharedMemory
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+import shapely
+
+from .tiles import group_by_tile, tile_keys, tile_size_for
+
+__all__ = [
+    "default_workers",
+    "configured_workers",
+    "with_workers",
+    "worker_pool",
+    "map_chunks",
+    "iter_chunks",
+    "SharedGeometries",
+    "read_shared",
+    "spatial_chunks",
+    "map_shared",
+    "map_geometries",
+]
+
+DEFAULT_CHUNK = 5000
+
+
+def default_workers() -> int:
+    """Return the worker count used when none is configured."""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def configured_workers(params: dict) -> Optional[int]:
+    """Return ``parallel.workers`` from pipeline *params* (``None`` unset)."""
+    return (params.get("parallel") or {}).get("workers")
+
+
+def with_workers(params: dict, workers: int) -> dict:
+    """Return a copy of *params* with ``parallel.workers`` set."""
+    return dict(
+        params, parallel=dict(params.get("parallel") or {}, workers=workers)
+    )
+
+
+@contextmanager
+def worker_pool(workers: Optional[int] = None) -> Iterator[Optional[Executor]]:
+    """Yield a process pool, or ``None`` when only one worker is wanted."""
+    count = default_workers() if workers is None else int(workers)
+    if count <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=count) as pool:
+        yield pool
+
+
+def map_chunks(
+    func: Callable[..., Any],
+    chunks: Sequence[tuple],
+    pool: Optional[Executor] = None,
+) -> List[Any]:
+    """Return ``func(*chunk)`` for every chunk, in chunk order.
+
+    Runs inline when there is no pool or only one chunk, so small inputs
+    never pay for pickling geometries across processes.
+    """
+    if pool is None or len(chunks) <= 1:
+        return [func(*chunk) for chunk in chunks]
+    futures = [pool.submit(func, *chunk) for chunk in chunks]
+    return [fut.result() for fut in futures]
+
+
+def iter_chunks(
+    func: Callable[..., Any],
+    chunks: Sequence[tuple],
+    pool: Optional[Executor] = None,
+) -> Iterator[Any]:
+    """Yield ``func(*chunk)`` results as they finish, in any order.
+
+    Lets callers stream results out instead of holding every chunk's
+    output at once.
+    """
+    if pool is None or len(chunks) <= 1:
+        for chunk in chunks:
+            yield func(*chunk)
+        return
+    futures = [pool.submit(func, *chunk) for chunk in chunks]
+    for fut in as_completed(futures):
+        yield fut.result()
+
+
+def _pack(geoms: np.ndarray) -> Tuple[np.ndarray, bytes]:
+    """Return ``(offsets, blob)``: every geometry's WKB back to back."""
+    wkb = shapely.to_wkb(geoms)
+    sizes = np.fromiter(
+        (0 if b is None else len(b) for b in wkb), np.int64, len(wkb)
+    )
+    offsets = np.zeros(len(wkb) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return offsets, b"".join(b for b in wkb if b is not None)
+
+
+def _create(geoms: np.ndarray) -> SharedMemory:
+    """Return a new shared block holding *geoms* as offsets plus WKB."""
+    offsets, blob = _pack(geoms)
+    head = offsets.nbytes
+    shm = SharedMemory(create=True, size=max(head + len(blob), 1))
+    shm.buf[:head] = offsets.tobytes()
+    shm.buf[head:head + len(blob)] = blob
+    return shm
+
+
+class SharedGeometries:
+    """Geometries encoded once as WKB in a shared memory block.
+
+    The block holds the WKB offsets followed by the WKB itself. Workers
+    pass :attr:`handle` to :func:`read_shared` to decode just their rows
+    straight from the block, so no geometry is pickled. Use it as a
+    context manager; the block is freed on exit.
+    """
+
+    def __init__(self, geoms: Sequence) -> None:
+        geoms = np.asarray(geoms, dtype=object)
+        self._shm = _create(geoms)
+        self.handle: Tuple[str, int] = (self._shm.name, len(geoms) + 1)
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedGeometries":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def read_shared(handle: Tuple[str, int], rows: np.ndarray) -> np.ndarray:
+    """Return the geometries at *rows* of a :class:`SharedGeometries`."""
+    name, count = handle
+    shm = SharedMemory(name=name)
+    try:
+        head = count * 8
+        offsets = np.frombuffer(shm.buf, dtype=np.int64, count=count)
+        starts = offsets[rows]
+        ends = offsets[np.asarray(rows) + 1]
+        del offsets
+        data = shm.buf[head:]
+        try:
+            wkb = np.empty(len(starts), dtype=object)
+            for i, (start, end) in enumerate(zip(starts, ends)):
+                if end > start:
+                    wkb[i] = data[start:end].tobytes()
+        finally:
+            data.release()
+    finally:
+        shm.close()
+    return shapely.from_wkb(wkb)
+
+
+def spatial_chunks(
+    geoms: np.ndarray, chunk_size: int = DEFAULT_CHUNK
+) -> List[np.ndarray]:
+    """Return row positions of *geoms* cut into chunks of nearby rows.
+
+    Rows are ordered tile by tile before cutting, so each chunk covers a
+    compact area; missing or empty geometries go in the last chunks.
+    """
+    geoms = np.asarray(geoms, dtype=object)
+    if len(geoms) == 0:
+        return []
+    valid = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+    rows = np.flatnonzero(valid)
+    size = tile_size_for(geoms[rows], chunk_size)
+    groups = group_by_tile(tile_keys(geoms[rows], size)).values()
+    order = np.concatenate(
+        [rows[g] for g in groups] + [np.flatnonzero(~valid)]
+    )
+    return np.array_split(order, math.ceil(len(order) / chunk_size))
+
+
+class _SharedResult(NamedTuple):
+    """A worker's geometry array, left in a shared block for the parent."""
+
+    handle: Tuple[str, int]
+
+
+def _share_result(value: Any) -> Any:
+    """Move geometry arrays in *value* (or its items) to shared blocks."""
+    if isinstance(value, tuple):
+        return tuple(_share_result(v) for v in value)
+    if isinstance(value, np.ndarray) and value.dtype == object:
+        shm = _create(value)
+        shm.close()
+        return _SharedResult((shm.name, len(value) + 1))
+    return value
+
+
+def _take_result(value: Any) -> Any:
+    """Decode and free the shared blocks :func:`_share_result` made."""
+    if isinstance(value, tuple) and not isinstance(value, _SharedResult):
+        return tuple(_take_result(v) for v in value)
+    if isinstance(value, _SharedResult):
+        name, count = value.handle
+        geoms = read_shared(value.handle, np.arange(count - 1))
+        SharedMemory(name=name).unlink()
+        return geoms
+    return value
+
+
+def _shared_task(
+    func: Callable[..., Any],
+    handles: Tuple[Tuple[str, int], ...],
+    task: tuple,
+) -> Any:
+    """Run *func* on the shared rows in *task*; share geometry results."""
+    rows, args = task[:len(handles)], task[len(handles):]
+    inputs = [read_shared(h, r) for h, r in zip(handles, rows)]
+    return _share_result(func(*inputs, *args))
+
+
+def map_shared(
+    func: Callable[..., Any],
+    arrays: Sequence[Sequence],
+    tasks: Sequence[tuple],
+    pool: Optional[Executor] = None,
+) -> List[Any]:
+    """Return ``func(*(a[rows] for a, rows), *args)`` per task, in order.
+
+    Each task starts with one row array per array in *arrays*, followed
+    by extra arguments. With a process *pool*, every array is written
+    once to a :class:`SharedGeometries` block and workers decode only
+    their rows; geometry arrays they return (alone or in a tuple) come
+    back through shared blocks too, so no geometry is pickled either
+    way. Runs inline without a pool or with a single task.
+    """
+    arrays = [np.asarray(a, dtype=object) for a in arrays]
+    count = len(arrays)
+    if pool is None or len(tasks) <= 1:
+        return [
+            func(*(a[r] for a, r in zip(arrays, t[:count])), *t[count:])
+            for t in tasks
+        ]
+    with ExitStack() as stack:
+        handles = tuple(
+            stack.enter_context(SharedGeometries(a)).handle for a in arrays
+        )
+        futures = [
+            pool.submit(_shared_task, func, handles, task) for task in tasks
+        ]
+        return [_take_result(fut.result()) for fut in futures]
+
+
+def map_geometries(
+    func: Callable[..., Any],
+    geoms: Sequence,
+    *args: Any,
+    workers: Optional[int] = None,
+    mode: str = "process",
+    chunk_size: int = DEFAULT_CHUNK,
+) -> np.ndarray:
+    """Return ``func(geoms[rows], *args)`` over spatial chunks, in row order.
+
+    *func* takes a geometry array and returns one value per geometry
+    (geometries or numbers). In ``"process"`` mode the chunks go through
+    :func:`map_shared`, so neither the input nor geometry results are
+    pickled. ``"thread"`` mode skips serialisation
+    entirely and relies on shapely releasing the GIL. *args* are sent
+    with every chunk, so keep them small.
+    """
+    geoms = np.asarray(geoms, dtype=object)
+    count = default_workers() if workers is None else int(workers)
+    chunks = spatial_chunks(geoms, chunk_size)
+    if count <= 1 or len(chunks) <= 1:
+        return np.asarray(func(geoms, *args))
+    if mode == "thread":
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            parts = list(pool.map(lambda rows: func(geoms[rows], *args),
+                                  chunks))
+    elif mode == "process":
+        with worker_pool(count) as pool:
+            parts = map_shared(
+                func, (geoms,), [(rows, *args) for rows in chunks], pool
+            )
+    else:
+        raise ValueError(f"Unknown mode {mode!r}; use 'process' or 'thread'")
+    out = np.empty(len(geoms), dtype=np.asarray(parts[0]).dtype)
+    for rows, part in zip(chunks, parts):
+        out[rows] = part
+    return out
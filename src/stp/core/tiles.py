@@ -0,0 +1,95 @@
+"""Grid tiling helpers used to split geometry work into spatial chunks."""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+import shapely
+
+__all__ = ["tile_size_for", "tile_keys", "group_by_tile", "hilbert_keys"]
+
+DEFAULT_PER_TILE = 2000
+HILBERT_LEVEL = 16
+
+
+def tile_size_for(
+    geoms: np.ndarray, per_tile: int = DEFAULT_PER_TILE
+) -> float:
+    """Return a square tile size holding roughly *per_tile* geometries."""
+    if len(geoms) == 0:
+        return 1.0
+    minx, miny, maxx, maxy = shapely.total_bounds(geoms)
+    area = max(maxx - minx, 1.0) * max(maxy - miny, 1.0)
+    n_tiles = max(1, math.ceil(len(geoms) / max(per_tile, 1)))
+    return math.sqrt(area / n_tiles)
+
+
+def tile_keys(geoms: np.ndarray, tile_size: float) -> np.ndarray:
+    """Return ``(n, 2)`` integer grid keys from each geometry's bbox centre."""
+    bounds = shapely.bounds(geoms)
+    cx = (bounds[:, 0] + bounds[:, 2]) / 2.0
+    cy = (bounds[:, 1] + bounds[:, 3]) / 2.0
+    keys = np.empty((len(geoms), 2), dtype=np.int64)
+    keys[:, 0] = np.floor(cx / tile_size)
+    keys[:, 1] = np.floor(cy / tile_size)
+    return keys
+
+
+def group_by_tile(keys: np.ndarray) -> Dict[Tuple[int, int], np.ndarray]:
+    """Return ``{(ix, iy): row positions}`` for grid *keys*."""
+    if len(keys) == 0:
+        return {}
+    uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    order = np.argsort(inverse, kind="stable")
+    splits = np.cumsum(np.bincount(inverse))[:-1]
+    groups: List[np.ndarray] = np.split(order, splits)
+    return {
+        (int(ix), int(iy)): rows for (ix, iy), rows in zip(uniq, groups)
+    }
+
+
+def hilbert_keys(
+    geoms: np.ndarray, bounds=None, level: int = HILBERT_LEVEL
+) -> np.ndarray:
+    """Return the Hilbert-curve index of each geometry's bbox centre.
+
+    Centres are snapped to a ``2**level`` grid over *bounds* (default:
+    the extent of *geoms*). Sorting by the keys keeps nearby features
+    together; missing or empty geometries get the largest key.
+    """
+    geoms = np.asarray(geoms, dtype=object)
+    keys = np.full(len(geoms), np.iinfo(np.int64).max, dtype=np.int64)
+    valid = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+    if not valid.any():
+        return keys
+    box = shapely.bounds(geoms[valid])
+    minx, miny, maxx, maxy = (
+        shapely.total_bounds(geoms[valid]) if bounds is None else bounds
+    )
+    side = 2 ** level
+
+    def cells(lo: np.ndarray, hi: np.ndarray, start, end) -> np.ndarray:
+        scale = (side - 1) / max(end - start, 1e-12)
+        centre = (lo + hi) / 2.0
+        return np.clip(((centre - start) * scale).astype(np.int64),
+                       0, side - 1)
+
+    x = cells(box[:, 0], box[:, 2], minx, maxx)
+    y = cells(box[:, 1], box[:, 3], miny, maxy)
+    d = np.zeros(len(x), dtype=np.int64)
+    s = side // 2
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx) ^ ry)
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s //= 2
+    keys[valid] = d
+    return keys
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from io import BytesIO
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
 
 import geopandas as gpd
 
@@ -15,12 +15,27 @@ from ..settings import DEFAULT_EPSG
 __all__ = ["fetch_arcgis_vector", "fetch_arcgis_table"]
 
 
-def _build_query_url(service_url: str, as_geojson: bool = True) -> str:
-    """Return an ArcGIS REST query URL for *service_url*."""
+def _build_query_url(
+    service_url: str,
+    as_geojson: bool = True,
+    bbox: Optional[Sequence[float]] = None,
+    bbox_epsg: Optional[int] = None,
+) -> str:
+    """Return an ArcGIS REST query URL for *service_url*.
+
+    With *bbox* (in *bbox_epsg*, default the service's own CRS) the
+    server only returns features intersecting that envelope.
+    """
     base = service_url.rstrip("/")
     if not base.lower().endswith("query"):
         base = f"{base}/query"
     params = "where=1%%3D1&outFields=*&returnGeometry=true"
+    if bbox is not None:
+        params += "&geometry=" + ",".join(f"{v:.6f}" for v in bbox)
+        params += "&geometryType=esriGeometryEnvelope"
+        params += "&spatialRel=esriSpatialRelIntersects"
+        if bbox_epsg is not None:
+            params += f"&inSR={bbox_epsg}"
     if as_geojson:
         params += "&outSR=4326&f=geojson"
     else:
@@ -30,9 +45,12 @@ def _build_query_url(service_url: str, as_geojson: bool = True) -> str:
 
 def fetch_arcgis_vector(
     service_url: str,
+    bbox: Optional[Sequence[float]] = None,
+    bbox_epsg: Optional[int] = None,
 ) -> List[Tuple[str, gpd.GeoDataFrame, int, int]]:
-    """Fetch vector data from an ArcGIS FeatureServer layer."""
-    url = _build_query_url(service_url, as_geojson=True)
+    """Fetch vector data from an ArcGIS FeatureServer layer, optionally
+    only the features within *bbox* (e.g. the study area's bounds)."""
+    url = _build_query_url(service_url, True, bbox, bbox_epsg)
     data = http_client.fetch_bytes(url)
     gdf = gpd.read_file(BytesIO(data))
     epsg = gdf.crs.to_epsg() or DEFAULT_EPSG
@@ -0,0 +1,56 @@
+"""Native geoprocessing operators replacing the arcpy prototypes."""
+
+from .union import union_polygons, dissolve_to_frame
+from .erase import erase_geometries, pairwise_erase
+from .overlay import planar_overlay
+from .attribute import BoundaryIndex, load_or_build_index
+from .centerline import sidewalk_centerlines, skeletonize
+from .points import generate_points
+from .prune import conflict_pairs, rank_dominant_prune
+from .linear import (
+    exclusion_intervals,
+    free_intervals,
+    line_substrings,
+    merge_intervals,
+    place_points,
+)
+from .exclusions import ExclusionIndex
+from .snap import snap_points
+from .nodes import centerline_nodes, intersection_buffers
+from .raster import raster_to_polygons, raster_windows
+from .signs import (
+    classify_signs,
+    clean_signs,
+    no_standing_segments,
+    snap_signs,
+)
+
+__all__ = [
+    "union_polygons",
+    "dissolve_to_frame",
+    "pairwise_erase",
+    "erase_geometries",
+    "planar_overlay",
+    "BoundaryIndex",
+    "load_or_build_index",
+    "sidewalk_centerlines",
+    "skeletonize",
+    "generate_points",
+    "conflict_pairs",
+    "rank_dominant_prune",
+    "exclusion_intervals",
+    "merge_intervals",
+    "free_intervals",
+    "line_substrings",
+    "place_points",
+    "ExclusionIndex",
+    "snap_points",
+    "centerline_nodes",
+    "intersection_buffers",
+    "raster_to_polygons",
+    "raster_windows",
+    "classify_signs",
+    "clean_signs",
+    "snap_signs",
+    "no_standing_segments",
+]
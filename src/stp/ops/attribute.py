@@ -0,0 +1,179 @@
+"""Bulk point-in-polygon attribution against boundary layers."""
+
+from __future__ import annotations
+
+import logging
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import Dict, Mapping, Sequence
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from .overlay import _field_labels
+
+__all__ = ["BoundaryIndex", "layer_stamps", "load_or_build_index"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 250_000
+
+
+class BoundaryIndex:
+    """Prepared polygons and an STRtree per boundary layer.
+
+    Build once, then call :meth:`attribute` for any number of point sets;
+    every layer's key fields are returned for every point in one pass.
+    """
+
+    def __init__(
+        self,
+        layers: Mapping[str, gpd.GeoDataFrame],
+        keep_fields: Mapping[str, Sequence[str]],
+    ) -> None:
+        self.keep_fields = {
+            name: list(keep_fields.get(name, [])) for name in layers
+        }
+        self.crs = next(iter(layers.values())).crs if layers else None
+        self.stamps: Dict[str, str] = {}
+        self._geoms: Dict[str, np.ndarray] = {}
+        self._attrs: Dict[str, pd.DataFrame] = {}
+        self._trees: Dict[str, shapely.STRtree] = {}
+        for name, gdf in layers.items():
+            self._geoms[name] = np.asarray(gdf.geometry.values, dtype=object)
+            self._attrs[name] = gdf[self.keep_fields[name]].reset_index(
+                drop=True
+            )
+        self._prepare()
+
+    def _prepare(self) -> None:
+        """Prepare geometries and build one STRtree per layer."""
+        for name, geoms in self._geoms.items():
+            shapely.prepare(geoms)
+            self._trees[name] = shapely.STRtree(geoms)
+
+    @classmethod
+    def from_gpkg(
+        cls,
+        gpkg_path: Path,
+        keep_fields: Mapping[str, Sequence[str]],
+        crs=None,
+    ) -> "BoundaryIndex":
+        """Build the index from the boundary layers in a GeoPackage."""
+        layers = {}
+        for name, fields in keep_fields.items():
+            gdf = gpd.read_file(gpkg_path, layer=name)
+            if crs is not None:
+                gdf = gdf.to_crs(crs)
+            layers[name] = gdf[list(fields) + [gdf.geometry.name]]
+        index = cls(layers, keep_fields)
+        index.stamps = layer_stamps(gpkg_path, list(keep_fields))
+        return index
+
+    def attribute(
+        self, points, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> pd.DataFrame:
+        """Return boundary key fields for each point in *points*.
+
+        Points are processed in batches: the STRtree gives bbox candidates
+        and a vectorized ``intersects`` against the prepared polygons
+        settles them. A point on a shared edge takes the first polygon.
+        """
+        framed = isinstance(points, (pd.Series, pd.DataFrame))
+        index = points.index if framed else None
+        pts = np.asarray(getattr(points, "geometry", points), dtype=object)
+        owners = {
+            name: np.full(len(pts), -1, dtype=np.int64)
+            for name in self._trees
+        }
+        for start in range(0, len(pts), batch_size):
+            batch = pts[start:start + batch_size]
+            for name, tree in self._trees.items():
+                pt_idx, poly_idx = tree.query(batch)
+                hit = shapely.intersects(
+                    self._geoms[name][poly_idx], batch[pt_idx]
+                )
+                pt_idx, poly_idx = pt_idx[hit], poly_idx[hit]
+                # reversed so the first candidate per point is written last
+                owners[name][start + pt_idx[::-1]] = poly_idx[::-1]
+
+        labels = _field_labels(list(self._trees), self.keep_fields)
+        columns = {}
+        for name, rows in owners.items():
+            attrs = self._attrs[name]
+            for field in self.keep_fields[name]:
+                columns[labels[name, field]] = (
+                    attrs[field].reindex(rows).to_numpy()
+                )
+        return pd.DataFrame(columns, index=index)
+
+    def save(self, path: Path) -> None:
+        """Persist geometries and attributes (the trees are rebuilt)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "crs": self.crs,
+            "keep_fields": self.keep_fields,
+            "stamps": self.stamps,
+            "layers": {
+                name: (shapely.to_wkb(geoms), self._attrs[name])
+                for name, geoms in self._geoms.items()
+            },
+        }
+        with open(path, "wb") as fh:
+            pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: Path) -> "BoundaryIndex":
+        """Load an index written by :meth:`save`."""
+        with open(path, "rb") as fh:
+            payload = pickle.load(fh)
+        index = cls.__new__(cls)
+        index.crs = payload["crs"]
+        index.keep_fields = payload["keep_fields"]
+        index.stamps = payload.get("stamps", {})
+        index._geoms, index._attrs, index._trees = {}, {}, {}
+        for name, (wkb, attrs) in payload["layers"].items():
+            index._geoms[name] = shapely.from_wkb(wkb)
+            index._attrs[name] = attrs
+        index._prepare()
+        return index
+
+
+def layer_stamps(gpkg_path: Path, names: Sequence[str]) -> Dict[str, str]:
+    """Return ``gpkg_contents.last_change`` for each layer in *names*.
+
+    GeoPackage keeps a per-table change timestamp, so writing other layers
+    to the same file does not invalidate indexes built from these ones.
+    """
+    with sqlite3.connect(str(gpkg_path)) as conn:
+        rows = conn.execute(
+            "SELECT table_name, last_change FROM gpkg_contents"
+        ).fetchall()
+    wanted = set(names)
+    return {name: stamp for name, stamp in rows if name in wanted}
+
+
+def load_or_build_index(
+    cache_path: Path,
+    gpkg_path: Path,
+    keep_fields: Mapping[str, Sequence[str]],
+    crs=None,
+) -> BoundaryIndex:
+    """Return the cached index unless the boundary layers or fields changed."""
+    cache_path = Path(cache_path)
+    fields = {name: list(f) for name, f in keep_fields.items()}
+    if cache_path.exists():
+        index = BoundaryIndex.load(cache_path)
+        if (
+            index.keep_fields == fields
+            and index.stamps == layer_stamps(gpkg_path, list(fields))
+        ):
+            return index
+    logger.info("Building boundary index from %s", gpkg_path)
+    index = BoundaryIndex.from_gpkg(gpkg_path, fields, crs=crs)
+    index.save(cache_path)
+    return index
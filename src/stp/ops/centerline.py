@@ -0,0 +1,195 @@
+"""Sidewalk centerlines from a Voronoi medial axis (CollapseHydroPolygon)."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from ..core.parallel import map_chunks, worker_pool
+from ..core.tiles import (
+    DEFAULT_PER_TILE,
+    group_by_tile,
+    tile_keys,
+    tile_size_for,
+)
+
+__all__ = ["skeletonize", "sidewalk_centerlines"]
+
+DEFAULT_DENSIFY = 2.0
+DEFAULT_SPUR_LENGTH = 15.0
+MAX_PRUNE_PASSES = 10
+
+
+def _regroup(parts: np.ndarray, owner: np.ndarray, size: int) -> np.ndarray:
+    """Return one line-merged geometry per owner from exploded *parts*."""
+    out = np.full(size, None, dtype=object)
+    if len(parts):
+        present, dense = np.unique(owner, return_inverse=True)
+        order = np.argsort(dense, kind="stable")
+        multi = shapely.multilinestrings(parts[order], indices=dense[order])
+        out[present] = shapely.line_merge(multi)
+    return out
+
+
+def _prune_spurs(lines: np.ndarray, spur_length: float) -> np.ndarray:
+    """Drop dangling branches shorter than *spur_length*, then re-merge.
+
+    A branch is dangling when one of its ends is not shared with any other
+    branch of the same skeleton. Lone branches are kept, so a narrow
+    sidewalk never loses its only centerline.
+    """
+    for _ in range(MAX_PRUNE_PASSES):
+        parts, owner = shapely.get_parts(lines, return_index=True)
+        if len(parts) == 0:
+            break
+        ends = np.vstack([
+            shapely.get_coordinates(shapely.get_point(parts, 0)),
+            shapely.get_coordinates(shapely.get_point(parts, -1)),
+        ])
+        keys = np.column_stack([np.tile(owner, 2), np.round(ends, 6)])
+        _, inverse, counts = np.unique(
+            keys, axis=0, return_inverse=True, return_counts=True
+        )
+        degree = counts[inverse.ravel()].reshape(2, -1)
+        dangling = (degree == 1).sum(axis=0)
+        spur = (dangling == 1) & (shapely.length(parts) < spur_length)
+        if not spur.any():
+            break
+        lines = _regroup(parts[~spur], owner[~spur], len(lines))
+    return lines
+
+
+def _medial_edges(
+    polys: np.ndarray, densify: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the Voronoi edges lying inside each polygon, and their owner.
+
+    Voronoi edges of the densified boundary vertices come from the
+    Delaunay dual: every triangle edge shared by two triangles becomes the
+    segment between their circumcentres. This is several times faster
+    than GEOS' own Voronoi builder and keeps the whole batch in NumPy.
+    """
+    seeds = shapely.extract_unique_points(shapely.segmentize(polys, densify))
+    tris, owner = shapely.get_parts(
+        shapely.delaunay_triangles(seeds), return_index=True
+    )
+    if len(tris) == 0:
+        return tris, owner
+    rings = shapely.get_exterior_ring(tris)
+    xy = shapely.get_coordinates(rings).reshape(-1, 4, 2)
+    a, b, c = xy[:, 0], xy[:, 1], xy[:, 2]
+    d = 2.0 * (
+        a[:, 0] * (b[:, 1] - c[:, 1])
+        + b[:, 0] * (c[:, 1] - a[:, 1])
+        + c[:, 0] * (a[:, 1] - b[:, 1])
+    )
+    sa, sb, sc = (a ** 2).sum(1), (b ** 2).sum(1), (c ** 2).sum(1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ux = (sa * (b[:, 1] - c[:, 1]) + sb * (c[:, 1] - a[:, 1])
+              + sc * (a[:, 1] - b[:, 1])) / d
+        uy = (sa * (c[:, 0] - b[:, 0]) + sb * (a[:, 0] - c[:, 0])
+              + sc * (b[:, 0] - a[:, 0])) / d
+    centres = np.column_stack([ux, uy])
+
+    # Key every triangle edge by owner and its sorted end coordinates
+    n = len(tris)
+    starts = xy[:, :3].reshape(-1, 2)
+    ends = xy[:, [1, 2, 0]].reshape(-1, 2)
+    flip = (starts[:, 0] > ends[:, 0]) | (
+        (starts[:, 0] == ends[:, 0]) & (starts[:, 1] > ends[:, 1])
+    )
+    lo = np.where(flip[:, None], ends, starts)
+    hi = np.where(flip[:, None], starts, ends)
+    keys = np.column_stack([np.repeat(owner, 3), lo, hi])
+    tri_of_edge = np.repeat(np.arange(n), 3)
+    order = np.lexsort(keys.T[::-1])
+    keys, tri_of_edge = keys[order], tri_of_edge[order]
+    shared = np.flatnonzero((keys[1:] == keys[:-1]).all(axis=1))
+    left, right = tri_of_edge[shared], tri_of_edge[shared + 1]
+    edge_owner = owner[left]
+
+    # Cheap point tests first; only survivors become geometries
+    shapely.prepare(polys)
+    p, q = centres[left], centres[right]
+    with np.errstate(invalid="ignore"):
+        keep = shapely.contains_xy(
+            polys[edge_owner], p[:, 0], p[:, 1]
+        ) & shapely.contains_xy(polys[edge_owner], q[:, 0], q[:, 1])
+    segments = shapely.linestrings(np.stack([p[keep], q[keep]], axis=1))
+    edge_owner = edge_owner[keep]
+    inside = shapely.contains(polys[edge_owner], segments)
+    return segments[inside], edge_owner[inside]
+
+
+def skeletonize(
+    polygons: np.ndarray,
+    densify: float = DEFAULT_DENSIFY,
+    spur_length: float = DEFAULT_SPUR_LENGTH,
+) -> np.ndarray:
+    """Return a medial-axis centerline for every polygon in *polygons*.
+
+    Boundaries are densified to *densify* spacing and the Voronoi edges of
+    their vertices are computed for the whole batch at once; edges lying
+    inside their polygon approximate the medial axis, which is
+    line-merged, pruned of short spurs and lightly simplified.
+    """
+    polygons = np.asarray(polygons, dtype=object)
+    out = np.full(len(polygons), None, dtype=object)
+    ok = ~(shapely.is_missing(polygons) | shapely.is_empty(polygons))
+    if not ok.any():
+        return out
+    polys = polygons[ok]
+    parts, owner = _medial_edges(polys, densify)
+    lines = _regroup(parts, owner, len(polys))
+    lines = _prune_spurs(lines, spur_length)
+    out[ok] = shapely.simplify(lines, densify / 2.0)
+    return out
+
+
+def _skeleton_chunk(
+    polygons: np.ndarray, densify: float, spur_length: float
+) -> np.ndarray:
+    """Process-pool entry point for :func:`skeletonize`."""
+    return skeletonize(polygons, densify, spur_length)
+
+
+def sidewalk_centerlines(
+    sidewalks: gpd.GeoDataFrame,
+    *,
+    densify: float = DEFAULT_DENSIFY,
+    spur_length: float = DEFAULT_SPUR_LENGTH,
+    per_tile: int = DEFAULT_PER_TILE,
+    workers: Optional[int] = None,
+) -> gpd.GeoDataFrame:
+    """Return single-part centerlines of *sidewalks* with their attributes.
+
+    Polygons are grouped into spatial chunks and skeletonized per chunk in
+    a process pool. Distances are in CRS units (feet in EPSG:2263).
+    """
+    geoms = np.asarray(sidewalks.geometry.values, dtype=object)
+    result = np.full(len(geoms), None, dtype=object)
+    ok = np.flatnonzero(
+        ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+    )
+    if len(ok):
+        tile_size = tile_size_for(geoms[ok], per_tile)
+        tiles = group_by_tile(tile_keys(geoms[ok], tile_size))
+        groups = [ok[rows] for rows in tiles.values()]
+        with worker_pool(workers) as pool:
+            lines = map_chunks(
+                _skeleton_chunk,
+                [(geoms[rows], densify, spur_length) for rows in groups],
+                pool,
+            )
+        for rows, chunk in zip(groups, lines):
+            result[rows] = chunk
+
+    out = sidewalks.copy()
+    out[out.geometry.name] = gpd.GeoSeries(
+        result, index=sidewalks.index, crs=sidewalks.crs
+    )
+    out = out.loc[~(shapely.is_missing(result) | shapely.is_empty(result))]
+    return out.explode(index_parts=False, ignore_index=True)
@@ -0,0 +1,278 @@
+"""Persistent measure-space index of do-not-plant intervals."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .linear import exclusion_intervals, merge_intervals
+
+__all__ = ["ExclusionIndex"]
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exclusions (
+    id INTEGER PRIMARY KEY,
+    segment_id INTEGER NOT NULL,
+    from_m REAL NOT NULL,
+    to_m REAL NOT NULL,
+    reason TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS exclusions_reason ON exclusions (reason);
+CREATE VIRTUAL TABLE IF NOT EXISTS exclusions_rtree USING rtree (
+    id, seg_lo, seg_hi, from_m, to_m
+);
+CREATE TABLE IF NOT EXISTS exclusion_sources (
+    reason TEXT PRIMARY KEY,
+    stamp TEXT
+);
+"""
+
+Intervals = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _rows(segment_id, from_m, to_m) -> list:
+    """Return ``(segment, from, to)`` tuples of plain Python numbers."""
+    return list(zip(
+        np.asarray(segment_id, dtype=np.int64).tolist(),
+        np.asarray(from_m, dtype=float).tolist(),
+        np.asarray(to_m, dtype=float).tolist(),
+    ))
+
+
+class ExclusionIndex:
+    """Exclusions stored as ``(segment_id, from_m, to_m, reason)`` rows.
+
+    Rows live in SQLite with an R*Tree over segment and measure, so
+    overlap queries are interval-tree lookups and refreshing one source
+    layer (a *reason*) only rewrites that layer's rows.
+    """
+
+    def __init__(self, path=":memory:") -> None:
+        self.path = path
+        self._conn = sqlite3.connect(str(path))
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "ExclusionIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _stage_segments(self, segments: Sequence[int]) -> None:
+        """Load *segments* into the temporary ``wanted`` filter table."""
+        with self._conn:
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS wanted "
+                "(segment_id INTEGER PRIMARY KEY)"
+            )
+            self._conn.execute("DELETE FROM wanted")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO wanted VALUES (?)",
+                [(int(s),) for s in segments],
+            )
+
+    def _insert(self, reason: str, rows: list) -> None:
+        """Write ``(segment, from, to)`` *rows*; the caller commits."""
+        start = self._conn.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM exclusions"
+        ).fetchone()[0]
+        ids = range(start, start + len(rows))
+        self._conn.executemany(
+            "INSERT INTO exclusions VALUES (?, ?, ?, ?, ?)",
+            [(i, s, a, b, reason) for i, (s, a, b) in zip(ids, rows)],
+        )
+        self._conn.executemany(
+            "INSERT INTO exclusions_rtree VALUES (?, ?, ?, ?, ?)",
+            [(i, s, s, a, b) for i, (s, a, b) in zip(ids, rows)],
+        )
+
+    def _delete(self, where: str, reason: str) -> list:
+        """Drop the rows of *reason* matching *where*; the caller commits.
+
+        Returns the ``(id, segment_id)`` rows removed.
+        """
+        rows = self._conn.execute(
+            f"SELECT id, segment_id FROM exclusions WHERE {where}",
+            (reason,),
+        ).fetchall()
+        ids = [(r[0],) for r in rows]
+        self._conn.executemany(
+            "DELETE FROM exclusions_rtree WHERE id = ?", ids
+        )
+        self._conn.executemany("DELETE FROM exclusions WHERE id = ?", ids)
+        return rows
+
+    def insert(
+        self,
+        reason: str,
+        segment_id: np.ndarray,
+        from_m: np.ndarray,
+        to_m: np.ndarray,
+    ) -> None:
+        """Add intervals for *reason*."""
+        with self._conn:
+            self._insert(reason, _rows(segment_id, from_m, to_m))
+
+    def delete(
+        self, reason: str, segments: Optional[Sequence[int]] = None
+    ) -> np.ndarray:
+        """Remove rows of *reason* (on *segments* only, if given).
+
+        Returns the segment ids that lost at least one interval.
+        """
+        where = "reason = ?"
+        if segments is not None:
+            self._stage_segments(segments)
+            where += " AND segment_id IN (SELECT segment_id FROM wanted)"
+        with self._conn:
+            rows = self._delete(where, reason)
+        return np.unique(np.array([r[1] for r in rows], dtype=np.int64))
+
+    def replace(
+        self,
+        reason: str,
+        segment_id: np.ndarray,
+        from_m: np.ndarray,
+        to_m: np.ndarray,
+        stamp: Optional[str] = None,
+    ) -> np.ndarray:
+        """Swap all rows of *reason* for new ones; return touched segments.
+
+        Touched segments are those whose intervals for *reason* differ
+        between the old and new rows, i.e. the only ones whose placement
+        can change. Rows and *stamp* are swapped in one transaction, so
+        a failure leaves the old rows and stamp in place.
+        """
+        rows = _rows(segment_id, from_m, to_m)
+        old = Counter(self._conn.execute(
+            "SELECT segment_id, from_m, to_m FROM exclusions "
+            "WHERE reason = ?",
+            (reason,),
+        ).fetchall())
+        new = Counter(rows)
+        changed = (old - new) + (new - old)
+        with self._conn:
+            self._delete("reason = ?", reason)
+            self._insert(reason, rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO exclusion_sources VALUES (?, ?)",
+                (reason, stamp),
+            )
+        return np.unique(
+            np.array([row[0] for row in changed], dtype=np.int64)
+        )
+
+    def update_layer(
+        self,
+        reason: str,
+        lines: np.ndarray,
+        geoms: np.ndarray,
+        clearance: float = 0.0,
+        stamp: Optional[str] = None,
+        *,
+        ids: Sequence[int],
+    ) -> np.ndarray:
+        """Project *geoms* onto *lines* and :meth:`replace` *reason*.
+
+        *ids* holds each line's value in a stable integer id column of
+        the sidewalk layer; rows are keyed on it, so they stay on the
+        right segment when the layer is rewritten or re-sorted. When
+        *stamp* matches the one stored for *reason* nothing is
+        recomputed and no segment is returned.
+        """
+        if stamp is not None and stamp == self.stamp(reason):
+            return np.empty(0, dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        line, start, end = exclusion_intervals(lines, geoms, clearance)
+        touched = self.replace(reason, ids[line], start, end, stamp=stamp)
+        logger.info(
+            "Exclusions %s: %d intervals, %d segments touched",
+            reason, len(line), len(touched),
+        )
+        return touched
+
+    def stamp(self, reason: str) -> Optional[str]:
+        """Return the source stamp stored with *reason*, if any."""
+        row = self._conn.execute(
+            "SELECT stamp FROM exclusion_sources WHERE reason = ?", (reason,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def reasons(self) -> list:
+        """Return the reasons present in the index."""
+        rows = self._conn.execute(
+            "SELECT DISTINCT reason FROM exclusions ORDER BY reason"
+        )
+        return [r[0] for r in rows]
+
+    def query(
+        self, segment_id: int, from_m: float = -np.inf, to_m: float = np.inf
+    ) -> pd.DataFrame:
+        """Return rows on *segment_id* overlapping ``[from_m, to_m]``."""
+        lo = max(from_m, -1e38)
+        hi = min(to_m, 1e38)
+        # The R*Tree stores float32 bounds rounded outwards, so candidates
+        # are re-checked against the exact values in the main table
+        return pd.read_sql_query(
+            "SELECT e.segment_id, e.from_m, e.to_m, e.reason "
+            "FROM exclusions_rtree r JOIN exclusions e ON e.id = r.id "
+            "WHERE r.seg_lo <= ? AND r.seg_hi >= ? "
+            "AND r.from_m <= ? AND r.to_m >= ? "
+            "AND e.segment_id = ? AND e.from_m <= ? AND e.to_m >= ? "
+            "ORDER BY e.from_m",
+            self._conn,
+            params=(segment_id, segment_id, hi, lo, segment_id, hi, lo),
+        )
+
+    def intervals(
+        self,
+        segments: Optional[Sequence[int]] = None,
+        reasons: Optional[Sequence[str]] = None,
+        merge: bool = True,
+        ids: Optional[Sequence[int]] = None,
+    ) -> Intervals:
+        """Return ``(segment, from, to)`` arrays, merged per segment.
+
+        With *ids* (the current id of each line), segment ids are turned
+        into positions in that order and rows of other segments are
+        dropped, so the result plugs straight into
+        :func:`~stp.ops.linear.place_points`.
+        """
+        sql = "SELECT segment_id, from_m, to_m FROM exclusions"
+        clauses, args = [], []
+        if segments is not None:
+            self._stage_segments(segments)
+            clauses.append("segment_id IN (SELECT segment_id FROM wanted)")
+        if reasons is not None:
+            clauses.append("reason IN (%s)" % ",".join("?" * len(reasons)))
+            args += list(reasons)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        rows = np.array(self._conn.execute(sql, args).fetchall(), dtype=float)
+        rows = rows.reshape(-1, 3)
+        seg = rows[:, 0].astype(np.int64)
+        if ids is not None:
+            pos = pd.Index(np.asarray(ids, dtype=np.int64)).get_indexer(seg)
+            keep = pos >= 0
+            rows, seg = rows[keep], pos[keep]
+        out = (seg, rows[:, 1], rows[:, 2])
+        return merge_intervals(*out) if merge else out
+
+    @classmethod
+    def open(cls, path: Path) -> "ExclusionIndex":
+        """Open (or create) an index stored at *path*."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return cls(path)
@@ -0,0 +1,333 @@
+"""Linear-referencing placement of planting points along sidewalk lines."""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from .points import PARENT_FID, PARENT_LEN
+from .prune import BUFFER_SLACK, conflict_pairs
+
+__all__ = [
+    "exclusion_intervals",
+    "merge_intervals",
+    "free_intervals",
+    "line_substrings",
+    "place_points",
+]
+
+logger = logging.getLogger(__name__)
+
+MAX_PASSES = 10
+# Measure tolerance so a point exactly on an interval edge is allowed
+EPS = 1e-9
+# Margin around a losing point's measure so re-placement must move it
+MARGIN = 1e-6
+
+Intervals = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _empty() -> Intervals:
+    return (
+        np.empty(0, dtype=np.int64),
+        np.empty(0, dtype=float),
+        np.empty(0, dtype=float),
+    )
+
+
+def exclusion_intervals(
+    lines: np.ndarray, exclusions: np.ndarray, clearance: float = 0.0
+) -> Intervals:
+    """Return ``(line, start, end)`` measures covered by *exclusions*.
+
+    Exclusions are grown by *clearance*, matched to lines with an STRtree
+    and intersected pairwise; every vertex of each intersection piece is
+    located on its line and the piece becomes one ``[min, max]`` interval.
+    """
+    lines = np.asarray(lines, dtype=object)
+    exclusions = np.asarray(exclusions, dtype=object)
+    if len(lines) == 0 or len(exclusions) == 0:
+        return _empty()
+    if clearance > 0:
+        exclusions = shapely.buffer(exclusions, clearance)
+    tree = shapely.STRtree(exclusions)
+    li, ei = tree.query(lines, predicate="intersects")
+    if len(li) == 0:
+        return _empty()
+    pieces, owner = shapely.get_parts(
+        shapely.intersection(lines[li], exclusions[ei]), return_index=True
+    )
+    coords, piece = shapely.get_coordinates(pieces, return_index=True)
+    if len(coords) == 0:
+        return _empty()
+    line = li[owner[piece]]
+    measure = shapely.line_locate_point(
+        lines[line], shapely.points(coords)
+    )
+    starts = np.flatnonzero(np.r_[True, piece[1:] != piece[:-1]])
+    return (
+        line[starts],
+        np.minimum.reduceat(measure, starts),
+        np.maximum.reduceat(measure, starts),
+    )
+
+
+def merge_intervals(
+    line: np.ndarray, start: np.ndarray, end: np.ndarray
+) -> Intervals:
+    """Return overlapping intervals merged per line, sorted by measure."""
+    if len(line) == 0:
+        return _empty()
+    order = np.lexsort((start, line))
+    line, start, end = line[order], start[order], end[order]
+    reach = pd.Series(end).groupby(line).cummax().to_numpy()
+    fresh = np.r_[
+        True,
+        (line[1:] != line[:-1]) | (start[1:] > reach[:-1] + EPS),
+    ]
+    runs = np.flatnonzero(fresh)
+    return line[runs], start[runs], np.maximum.reduceat(end, runs)
+
+
+def free_intervals(lengths: np.ndarray, intervals: Intervals) -> Intervals:
+    """Return the stretches of each ``[0, length]`` not in *intervals*.
+
+    Stretches are sorted by line and measure; a stretch whose start lies
+    past its end is empty and is kept so every line has the same layout.
+    """
+    n = len(lengths)
+    line, start, end = merge_intervals(*intervals)
+    ids = np.arange(n)
+    gap_line = np.concatenate([ids, line])
+    gap_start = np.concatenate([np.zeros(n), end])
+    gap_end_line = np.concatenate([line, ids])
+    gap_end = np.concatenate([start, lengths])
+    order = np.lexsort((gap_start, gap_line))
+    gap_line, gap_start = gap_line[order], gap_start[order]
+    gap_end = gap_end[np.lexsort((gap_end, gap_end_line))]
+    gap_start = np.maximum(gap_start, 0.0)
+    gap_end = np.minimum(gap_end, lengths[gap_line])
+    return gap_line, gap_start, gap_end
+
+
+def line_substrings(
+    lines: np.ndarray, start: np.ndarray, end: np.ndarray
+) -> np.ndarray:
+    """Return the part of each line between measures *start* and *end*.
+
+    A vectorized ``shapely.ops.substring``: interior vertices are found by
+    one ``searchsorted`` over every line's cumulative vertex measures laid
+    end to end, and the interpolated end points are added around them.
+    Pieces with ``end <= start`` come back as ``None``.
+    """
+    lines = np.asarray(lines, dtype=object)
+    lengths = np.nan_to_num(shapely.length(lines))
+    start = np.clip(start, 0.0, lengths)
+    end = np.clip(end, 0.0, lengths)
+    out = np.full(len(lines), None, dtype=object)
+    ok = np.flatnonzero(end > start)
+    if len(ok) == 0:
+        return out
+    lines, start, end = lines[ok], start[ok], end[ok]
+    coords, owner = shapely.get_coordinates(lines, return_index=True)
+    step = np.r_[0.0, np.hypot(*np.diff(coords, axis=0).T)]
+    step[np.r_[True, owner[1:] != owner[:-1]]] = 0.0
+    base = np.cumsum(shapely.length(lines)) - shapely.length(lines)
+    measure = np.cumsum(step)
+    # Offset each line's start so vertex measures stay monotone overall
+    first = np.searchsorted(owner, np.arange(len(lines)))
+    measure += base[owner] - measure[first][owner]
+    lo = np.searchsorted(measure, base + start, side="right")
+    hi = np.searchsorted(measure, base + end, side="left")
+    inner = np.maximum(hi - lo, 0)
+
+    count = inner + 2
+    head = np.cumsum(count) - count
+    xy = np.empty((count.sum(), 2))
+    xy[head] = shapely.get_coordinates(
+        shapely.line_interpolate_point(lines, start)
+    )
+    xy[head + count - 1] = shapely.get_coordinates(
+        shapely.line_interpolate_point(lines, end)
+    )
+    piece = np.repeat(np.arange(len(lines)), inner)
+    k = np.arange(len(piece)) - np.repeat(np.cumsum(inner) - inner, inner)
+    xy[head[piece] + 1 + k] = coords[lo[piece] + k]
+    out[ok] = shapely.linestrings(
+        xy, indices=np.repeat(np.arange(len(lines)), count)
+    )
+    return out
+
+
+def _place(
+    lengths: np.ndarray, intervals: Intervals, spacing: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(line, measure)`` for greedy placement on each line.
+
+    The free stretches between merged intervals are filled left to right,
+    each point at least *spacing* past the previous one on the same line;
+    the last run of every line is then centred in its leftover slack.
+    Lines are processed together, one stretch rank at a time.
+    """
+    n = len(lengths)
+    gap_line, gap_start, gap_end = free_intervals(lengths, intervals)
+    rank = np.arange(len(gap_line)) - np.searchsorted(gap_line, gap_line)
+
+    last = np.full(n, -np.inf)
+    run_line, run_first, run_count, run_room = [], [], [], []
+    for k in range(rank.max() + 1 if len(rank) else 0):
+        sel = rank == k
+        owner, lo, hi = gap_line[sel], gap_start[sel], gap_end[sel]
+        first = np.maximum(lo, last[owner] + spacing)
+        count = np.where(
+            first <= hi + EPS,
+            np.floor((hi - first) / spacing + EPS).astype(np.int64) + 1,
+            0,
+        )
+        placed = count > 0
+        owner, first, count = owner[placed], first[placed], count[placed]
+        last[owner] = first + (count - 1) * spacing
+        run_line.append(owner)
+        run_first.append(first)
+        run_count.append(count)
+        run_room.append(hi[placed] - last[owner])
+    if not run_line:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    run_line = np.concatenate(run_line)
+    run_first = np.concatenate(run_first)
+    run_count = np.concatenate(run_count)
+    run_room = np.concatenate(run_room)
+
+    # Later runs were appended later, so the last hit per line wins
+    final = np.zeros(len(run_line), dtype=bool)
+    _, tail = np.unique(run_line[::-1], return_index=True)
+    final[len(run_line) - 1 - tail] = True
+    run_first = run_first + np.where(final, run_room / 2.0, 0.0)
+
+    line = np.repeat(run_line, run_count)
+    offset = np.repeat(np.cumsum(run_count) - run_count, run_count)
+    step = np.arange(len(line)) - offset
+    measure = np.repeat(run_first, run_count) + step * spacing
+    order = np.lexsort((measure, line))
+    return line[order], measure[order]
+
+
+def place_points(
+    lines,
+    spacing: float,
+    exclusions=None,
+    *,
+    clearance: float = 0.0,
+    buffer_dist: Optional[float] = None,
+    max_passes: int = MAX_PASSES,
+    intervals: Optional[Intervals] = None,
+) -> gpd.GeoDataFrame:
+    """Return planting points every *spacing* units along *lines*.
+
+    Placement is one-dimensional: *exclusions* (grown by *clearance*) are
+    projected onto each line as measure intervals and points are placed
+    greedily in the free stretches, so no intermediate geometry is built.
+    Points from different lines closer than *buffer_dist* (defaults to
+    *spacing*), such as at corners, are settled by rank like
+    :func:`rank_dominant_prune`: the winner's reach becomes an interval on
+    the losing line and only losing lines are re-placed. Precomputed
+    ``(line, start, end)`` *intervals*, e.g. from an
+    :class:`~stp.ops.exclusions.ExclusionIndex`, are added to the
+    projected ones. Points carry the ``PARENT_FID`` and ``PARENT_LEN``
+    rank fields.
+    """
+    series = lines.geometry if isinstance(lines, gpd.GeoDataFrame) else lines
+    if not isinstance(series, gpd.GeoSeries):
+        series = gpd.GeoSeries(series)
+    if buffer_dist is None:
+        buffer_dist = spacing
+    reach = buffer_dist - BUFFER_SLACK
+    geoms = np.asarray(series.values, dtype=object)
+    lengths = np.nan_to_num(shapely.length(geoms))
+    projected = _empty()
+    if exclusions is not None:
+        ex = getattr(exclusions, "geometry", exclusions)
+        projected = exclusion_intervals(
+            geoms, np.asarray(ex, dtype=object), clearance
+        )
+    if intervals is not None:
+        projected = tuple(
+            np.concatenate([a, np.asarray(b, dtype=a.dtype)])
+            for a, b in zip(projected, intervals)
+        )
+    intervals = projected
+
+    pt_line, pt_measure = _place(lengths, intervals, spacing)
+    pt_geom = shapely.line_interpolate_point(geoms[pt_line], pt_measure)
+    fresh = np.arange(len(pt_line))
+    for n_pass in range(1, max_passes + 2):
+        if len(fresh) == 0:
+            break
+        a, b = conflict_pairs(pt_geom, reach, fresh)
+        cross = pt_line[a] != pt_line[b]
+        a, b = a[cross], b[cross]
+        if len(a) == 0:
+            break
+        la, lb = lengths[pt_line[a]], lengths[pt_line[b]]
+        a_wins = (la > lb) | ((la == lb) & (pt_line[a] < pt_line[b]))
+        winner = np.where(a_wins, a, b)
+        loser = np.where(a_wins, b, a)
+        if n_pass > max_passes:
+            logger.warning(
+                "Dropping %d points still in conflict after %d passes",
+                len(np.unique(loser)), max_passes,
+            )
+            keep = np.ones(len(pt_line), dtype=bool)
+            keep[loser] = False
+            pt_line, pt_measure = pt_line[keep], pt_measure[keep]
+            pt_geom = pt_geom[keep]
+            break
+
+        # Winner reach on the losing line, always covering the loser
+        target = pt_line[loser]
+        centre = shapely.line_locate_point(geoms[target], pt_geom[winner])
+        offset = shapely.distance(geoms[target], pt_geom[winner])
+        half = np.sqrt(np.clip(reach ** 2 - offset ** 2, 0.0, None))
+        hit = pt_measure[loser]
+        intervals = (
+            np.concatenate([intervals[0], target]),
+            np.concatenate(
+                [intervals[1], np.minimum(centre - half, hit - MARGIN)]
+            ),
+            np.concatenate(
+                [intervals[2], np.maximum(centre + half, hit + MARGIN)]
+            ),
+        )
+
+        redo = np.unique(target)
+        mask = np.isin(intervals[0], redo)
+        local = np.searchsorted(redo, intervals[0][mask])
+        sub = (local, intervals[1][mask], intervals[2][mask])
+        new_line, new_measure = _place(lengths[redo], sub, spacing)
+        new_line = redo[new_line]
+        keep = ~np.isin(pt_line, redo)
+        fresh = np.arange(keep.sum(), keep.sum() + len(new_line))
+        pt_line = np.concatenate([pt_line[keep], new_line])
+        pt_measure = np.concatenate([pt_measure[keep], new_measure])
+        pt_geom = np.concatenate([
+            pt_geom[keep],
+            shapely.line_interpolate_point(geoms[new_line], new_measure),
+        ])
+        logger.info(
+            "Placement pass %d: %d conflicts, %d lines re-placed",
+            n_pass, len(winner), len(redo),
+        )
+
+    return gpd.GeoDataFrame(
+        {
+            PARENT_FID: series.index.to_numpy()[pt_line],
+            PARENT_LEN: lengths[pt_line],
+        },
+        geometry=pt_geom,
+        crs=series.crs,
+    )
@@ -0,0 +1,56 @@
+"""Street-centerline node graph and intersection buffers."""
+
+from __future__ import annotations
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+__all__ = ["centerline_nodes", "intersection_buffers"]
+
+DEFAULT_GRID = 1.0
+DEFAULT_MIN_DEGREE = 3
+DEFAULT_INTERSECTION_BUFFER = 40.0
+DEGREE = "DEGREE"
+
+
+def centerline_nodes(lines, grid: float = DEFAULT_GRID) -> gpd.GeoDataFrame:
+    """Return the unique end nodes of *lines* with their ``DEGREE``.
+
+    Both ends of every line part are snapped to a *grid* so ends that
+    nearly touch share a node; a node's degree is the number of line ends
+    on it (a closed loop counts twice).
+    """
+    series = lines.geometry if isinstance(lines, gpd.GeoDataFrame) else lines
+    if not isinstance(series, gpd.GeoSeries):
+        series = gpd.GeoSeries(series)
+    parts = shapely.get_parts(np.asarray(series.values, dtype=object))
+    parts = parts[shapely.get_num_coordinates(parts) >= 2]
+    ends = np.vstack([
+        shapely.get_coordinates(shapely.get_point(parts, 0)),
+        shapely.get_coordinates(shapely.get_point(parts, -1)),
+    ])
+    cells = np.round(ends / grid).astype(np.int64)
+    _, inverse, degree = np.unique(
+        cells, axis=0, return_inverse=True, return_counts=True
+    )
+    inverse = inverse.ravel()
+    # Average the ends that fell in each cell for the node location
+    xy = np.zeros((len(degree), 2))
+    np.add.at(xy, inverse, ends)
+    xy /= degree[:, None]
+    return gpd.GeoDataFrame(
+        {DEGREE: degree}, geometry=shapely.points(xy), crs=series.crs
+    )
+
+
+def intersection_buffers(
+    lines,
+    distance: float = DEFAULT_INTERSECTION_BUFFER,
+    min_degree: int = DEFAULT_MIN_DEGREE,
+    grid: float = DEFAULT_GRID,
+) -> gpd.GeoDataFrame:
+    """Return one *distance* buffer per node of degree >= *min_degree*."""
+    nodes = centerline_nodes(lines, grid)
+    nodes = nodes[nodes[DEGREE] >= min_degree].reset_index(drop=True)
+    return nodes.set_geometry(nodes.buffer(distance))
@@ -0,0 +1,218 @@
+"""Attribute-preserving planar overlay of many polygon layers."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from ..core.parallel import map_shared, worker_pool
+from ..core.tiles import DEFAULT_PER_TILE, tile_size_for
+
+__all__ = ["planar_overlay"]
+
+
+def _overlay_tile(
+    bounds: Tuple[float, float, float, float],
+    layers: List[Tuple[np.ndarray, np.ndarray]],
+    grid_size: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return faces of one tile and the source row of each layer per face.
+
+    *layers* holds ``(geometries, row_ids)`` per input layer, already
+    limited to the tile. The noded linework of every clipped polygon plus
+    the tile frame is polygonized once; a point on each face then looks
+    up its polygon in every layer. ``-1`` marks "no polygon in layer".
+    """
+    frame = shapely.box(*bounds)
+    clipped = []
+    rings = [shapely.boundary(frame)]
+    for geoms, _ in layers:
+        parts = shapely.clip_by_rect(geoms, *bounds)
+        clipped.append(parts)
+        rings.extend(shapely.boundary(parts[~shapely.is_empty(parts)]))
+    noded = shapely.union_all(rings, grid_size=grid_size)
+    faces = shapely.get_parts(shapely.polygonize([noded]))
+    if len(faces) == 0:
+        return faces, np.empty((0, len(layers)), dtype=np.int64)
+    probes = shapely.point_on_surface(faces)
+    owners = np.full((len(faces), len(layers)), -1, dtype=np.int64)
+    for col, (parts, (_, rows)) in enumerate(zip(clipped, layers)):
+        if len(parts) == 0:
+            continue
+        tree = shapely.STRtree(parts)
+        face_idx, part_idx = tree.query(probes, predicate="within")
+        # Overlapping polygons within one layer: first match wins
+        first = np.unique(face_idx, return_index=True)[1]
+        owners[face_idx[first], col] = rows[part_idx[first]]
+    keep = (owners >= 0).any(axis=1)
+    return faces[keep], owners[keep]
+
+
+def _overlay_rows(
+    geoms: np.ndarray,
+    bounds: Tuple[float, float, float, float],
+    layer_of: np.ndarray,
+    rows: np.ndarray,
+    count: int,
+    grid_size: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Run :func:`_overlay_tile` on *geoms* drawn from all layers at once.
+
+    *layer_of* and *rows* give each geometry's layer and its row in that
+    layer, so one shared array can serve every layer.
+    """
+    layers = [
+        (geoms[layer_of == col], rows[layer_of == col])
+        for col in range(count)
+    ]
+    return _overlay_tile(bounds, layers, grid_size)
+
+
+def _merge_seams(
+    faces: np.ndarray,
+    owners: np.ndarray,
+    edges: np.ndarray,
+    grid_size: Optional[float] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Dissolve faces split by tile edges back together.
+
+    Only faces flagged in *edges* are touched; those sharing the same
+    owner tuple are unioned and exploded, so identical but non-adjacent
+    faces stay separate.
+    """
+    if not edges.any():
+        return faces, owners
+    inner_faces, inner_owners = faces[~edges], owners[~edges]
+    seam_owners = owners[edges]
+    seam_faces = faces[edges]
+    uniq, inverse = np.unique(seam_owners, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    merged, merged_owners = [], []
+    for group in range(len(uniq)):
+        parts = shapely.get_parts(
+            shapely.union_all(
+                seam_faces[inverse == group], grid_size=grid_size
+            )
+        )
+        merged.append(parts)
+        merged_owners.append(np.repeat(uniq[group][None, :], len(parts), 0))
+    return (
+        np.concatenate([inner_faces] + merged),
+        np.concatenate([inner_owners] + merged_owners),
+    )
+
+
+def planar_overlay(
+    layers: Mapping[str, gpd.GeoDataFrame],
+    keep_fields: Mapping[str, Sequence[str]],
+    *,
+    tile_size: Optional[float] = None,
+    per_tile: int = DEFAULT_PER_TILE,
+    workers: Optional[int] = None,
+    grid_size: Optional[float] = None,
+) -> gpd.GeoDataFrame:
+    """Return the union of all *layers* with their key attributes per face.
+
+    This is the ``Union_analysis`` of the original workflow done in one
+    pass: the study area is tiled, every tile is noded and polygonized in
+    a worker, and each face records the row it falls in for every layer.
+    ``keep_fields`` maps layer name to the columns carried onto faces;
+    a column name used by more than one layer is prefixed with the layer
+    name. All layers must share one CRS. With *grid_size*, linework is
+    noded on that precision grid.
+    """
+    names = list(layers)
+    crs = layers[names[0]].crs if names else None
+    arrays = [
+        np.asarray(layers[name].geometry.values, dtype=object)
+        for name in names
+    ]
+    everything = np.concatenate(arrays) if arrays else np.empty(0, object)
+    everything = everything[
+        ~(shapely.is_missing(everything) | shapely.is_empty(everything))
+    ]
+    if len(everything) == 0:
+        return gpd.GeoDataFrame(geometry=[], crs=crs)
+    if tile_size is None:
+        tile_size = tile_size_for(everything, per_tile)
+
+    trees = [shapely.STRtree(arr) for arr in arrays]
+    starts = np.cumsum([0] + [len(arr) for arr in arrays])
+    tiles = [
+        (ix * tile_size, iy * tile_size,
+         (ix + 1) * tile_size, (iy + 1) * tile_size)
+        for ix, iy in _covering_tiles(everything, tile_size)
+    ]
+    chunks = []
+    for bounds in tiles:
+        frame = shapely.box(*bounds)
+        hits = [
+            np.sort(tree.query(frame, predicate="intersects"))
+            for tree in trees
+        ]
+        if any(len(rows) for rows in hits):
+            chunks.append((
+                np.concatenate([s + r for s, r in zip(starts, hits)]),
+                bounds,
+                np.repeat(np.arange(len(hits)), [len(r) for r in hits]),
+                np.concatenate(hits),
+                len(hits),
+                grid_size,
+            ))
+
+    # Every layer goes into one shared array; each tile takes its rows
+    with worker_pool(workers) as pool:
+        results = map_shared(
+            _overlay_rows, (np.concatenate(arrays),), chunks, pool
+        )
+
+    faces = np.concatenate([f for f, _ in results])
+    owners = np.concatenate([o for _, o in results])
+    fb = shapely.bounds(faces)
+    eps = tile_size * 1e-9
+    on_x = np.abs(np.remainder(fb[:, [0, 2]] / tile_size + 0.5, 1) - 0.5)
+    on_y = np.abs(np.remainder(fb[:, [1, 3]] / tile_size + 0.5, 1) - 0.5)
+    edges = ((on_x * tile_size) < eps).any(axis=1) | (
+        (on_y * tile_size) < eps
+    ).any(axis=1)
+    faces, owners = _merge_seams(faces, owners, edges, grid_size)
+
+    columns: Dict[str, np.ndarray] = {}
+    labels = _field_labels(names, keep_fields)
+    for col, name in enumerate(names):
+        src = layers[name].reset_index(drop=True)
+        idx = owners[:, col]
+        for field in keep_fields.get(name, []):
+            values = src[field].reindex(np.where(idx >= 0, idx, -1))
+            columns[labels[name, field]] = values.to_numpy()
+    return gpd.GeoDataFrame(columns, geometry=faces, crs=crs)
+
+
+def _field_labels(
+    names: Sequence[str], keep_fields: Mapping[str, Sequence[str]]
+) -> Dict[Tuple[str, str], str]:
+    """Return output column names, prefixing fields shared by layers."""
+    seen = [f for name in names for f in keep_fields.get(name, [])]
+    return {
+        (name, field): field if seen.count(field) == 1 else f"{name}_{field}"
+        for name in names
+        for field in keep_fields.get(name, [])
+    }
+
+
+def _covering_tiles(
+    geoms: np.ndarray, tile_size: float
+) -> List[Tuple[int, int]]:
+    """Return grid keys of every tile touched by a bbox in *geoms*."""
+    bounds = shapely.bounds(geoms)
+    lo = np.floor(bounds[:, :2] / tile_size).astype(np.int64)
+    hi = np.floor(bounds[:, 2:] / tile_size).astype(np.int64)
+    keys = set()
+    for (x0, y0), (x1, y1) in zip(lo, hi):
+        for ix in range(x0, x1 + 1):
+            for iy in range(y0, y1 + 1):
+                keys.add((ix, iy))
+    return sorted(keys)
@@ -0,0 +1,152 @@
+"""In-memory rank-dominant pruning of conflicting planting points."""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional, Tuple
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from .points import PARENT_FID, PARENT_LEN, generate_points
+
+__all__ = ["conflict_pairs", "rank_dominant_prune"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_LENGTH = 3.0
+# Winner buffers are shrunk slightly so a point exactly *distance* away
+# from the winner is not erased (matches the ArcGIS prototype)
+BUFFER_SLACK = 0.01
+
+
+def conflict_pairs(
+    points: np.ndarray,
+    distance: float,
+    subset: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return unique pairs ``(i, j)``, ``i < j``, of points within *distance*.
+
+    With *subset*, only pairs involving those point positions are found,
+    which is all that is needed after regenerating a few lines.
+    """
+    tree = shapely.STRtree(points)
+    probe = np.arange(len(points)) if subset is None else subset
+    qi, qj = tree.query(points[probe], predicate="dwithin", distance=distance)
+    qi = probe[qi]
+    a, b = np.minimum(qi, qj), np.maximum(qi, qj)
+    pairs = np.unique(np.column_stack([a, b])[a != b], axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _cut_lines(
+    lines: np.ndarray, cutters: np.ndarray, owner: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(ids, trimmed)``: each owning line minus its cutters."""
+    order = np.argsort(owner, kind="stable")
+    uniq, starts = np.unique(owner[order], return_index=True)
+    merged = np.array(
+        [
+            shapely.union_all(group)
+            for group in np.split(cutters[order], starts[1:])
+        ],
+        dtype=object,
+    )
+    return uniq, shapely.difference(lines[uniq], merged)
+
+
+def rank_dominant_prune(
+    lines: gpd.GeoDataFrame,
+    spacing: float,
+    buffer_dist: Optional[float] = None,
+    *,
+    min_length: float = DEFAULT_MIN_LENGTH,
+    max_iterations: Optional[int] = None,
+) -> Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
+    """Return ``(points, lines)`` with no two points from different lines
+    closer than *buffer_dist* (defaults to *spacing*).
+
+    Conflicting pairs come from one STRtree ``dwithin`` bulk query and are
+    settled by rank: the point on the longer parent line wins, ties go to
+    the lower point id. Each losing line is trimmed by the winners'
+    buffers and only those lines get new points; the loop repeats on the
+    new points alone until nothing conflicts. Trimmed parts shorter than
+    *min_length* are dropped. Output lines keep their source attributes;
+    ``PARENT_FID`` on the points refers to the output line index.
+    """
+    if buffer_dist is None:
+        buffer_dist = spacing
+    line_geom = np.asarray(lines.geometry.values, dtype=object)
+    line_src = np.arange(len(line_geom))
+    alive = np.ones(len(line_geom), dtype=bool)
+
+    def _points(ids: np.ndarray):
+        pts = generate_points(
+            gpd.GeoSeries(line_geom[ids], index=ids), spacing
+        )
+        return (
+            np.asarray(pts.geometry.values, dtype=object),
+            pts[PARENT_FID].to_numpy(dtype=np.int64),
+            pts[PARENT_LEN].to_numpy(),
+        )
+
+    pt_geom, pt_line, pt_len = _points(line_src)
+    fresh = np.arange(len(pt_geom))
+    iteration = 0
+    while len(fresh):
+        iteration += 1
+        if max_iterations is not None and iteration > max_iterations:
+            logger.warning("Max iterations reached with conflicts left")
+            break
+        a, b = conflict_pairs(pt_geom, buffer_dist, fresh)
+        cross = pt_line[a] != pt_line[b]
+        a, b = a[cross], b[cross]
+        if len(a) == 0:
+            break
+        a_wins = pt_len[a] >= pt_len[b]
+        winner = np.where(a_wins, a, b)
+        loser = np.where(a_wins, b, a)
+
+        buffers = shapely.buffer(pt_geom[winner], buffer_dist - BUFFER_SLACK)
+        cut_ids, trimmed = _cut_lines(line_geom, buffers, pt_line[loser])
+        shrunk = shapely.length(trimmed) < shapely.length(
+            line_geom[cut_ids]
+        ) - 1e-9
+
+        # Losers on lines the buffers could not shorten are simply dropped
+        drop = np.zeros(len(pt_geom), dtype=bool)
+        drop[loser[np.isin(pt_line[loser], cut_ids[~shrunk])]] = True
+
+        cut_ids, trimmed = cut_ids[shrunk], trimmed[shrunk]
+        alive[cut_ids] = False
+        parts, owner = shapely.get_parts(trimmed, return_index=True)
+        keep = shapely.length(parts) >= min_length
+        new_ids = np.arange(len(line_geom), len(line_geom) + keep.sum())
+        line_geom = np.concatenate([line_geom, parts[keep]])
+        line_src = np.concatenate([line_src, line_src[cut_ids[owner[keep]]]])
+        alive = np.concatenate([alive, np.ones(len(new_ids), dtype=bool)])
+
+        stay = ~drop & alive[pt_line]
+        new_geom, new_line, new_len = _points(new_ids)
+        fresh = np.arange(stay.sum(), stay.sum() + len(new_geom))
+        pt_geom = np.concatenate([pt_geom[stay], new_geom])
+        pt_line = np.concatenate([pt_line[stay], new_line])
+        pt_len = np.concatenate([pt_len[stay], new_len])
+        logger.info(
+            "Prune pass %d: %d conflicts, %d lines trimmed",
+            iteration, len(winner), len(cut_ids),
+        )
+
+    ids = np.flatnonzero(alive)
+    out_lines = lines.iloc[line_src[ids]].copy()
+    out_lines.index = ids
+    out_lines[out_lines.geometry.name] = gpd.GeoSeries(
+        line_geom[ids], index=ids, crs=lines.crs
+    )
+    out_points = gpd.GeoDataFrame(
+        {PARENT_FID: pt_line, PARENT_LEN: pt_len},
+        geometry=pt_geom,
+        crs=lines.crs,
+    )
+    return out_points, out_lines
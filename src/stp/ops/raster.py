@@ -0,0 +1,187 @@
+"""Tiled, streaming raster-to-polygon conversion for land-cover inputs.
+
+Needs the optional ``rasterio`` package, imported only when used.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from ..core.parallel import iter_chunks, worker_pool
+from ..storage.file_storage import export_spatial_layer
+from .union import union_polygons
+
+__all__ = ["raster_windows", "raster_to_polygons"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 4096
+# Grass/Shrub in the 2017 NYC 6-inch land cover
+DEFAULT_CLASSES = (2,)
+DEFAULT_ATTRS = {"Pit_Type": "EP/LP"}
+
+Window = Tuple[int, int, int, int]
+
+
+def _rasterio():
+    """Import rasterio or explain how to get it."""
+    try:
+        import rasterio
+        import rasterio.features  # noqa: F401
+        import rasterio.windows  # noqa: F401
+    except ImportError as err:  # pragma: no cover - depends on env
+        raise ImportError(
+            "raster conversion needs rasterio (pip install rasterio)"
+        ) from err
+    return rasterio
+
+
+def raster_windows(
+    path: Path, size: int = DEFAULT_WINDOW, bbox=None
+) -> List[Window]:
+    """Return ``(row_off, col_off, height, width)`` windows tiling *path*,
+    only those overlapping *bbox* (in the raster's CRS) when given."""
+    rasterio = _rasterio()
+    with rasterio.open(path) as src:
+        height, width = src.height, src.width
+        rows, cols = (0, height), (0, width)
+        if bbox is not None:
+            win = rasterio.windows.from_bounds(*bbox, transform=src.transform)
+            rows = (math.floor(win.row_off),
+                    math.ceil(win.row_off + win.height))
+            cols = (math.floor(win.col_off),
+                    math.ceil(win.col_off + win.width))
+    return [
+        (row, col, min(size, height - row), min(size, width - col))
+        for row in range(0, height, size)
+        for col in range(0, width, size)
+        if row < rows[1] and row + size > rows[0]
+        and col < cols[1] and col + size > cols[0]
+    ]
+
+
+def _vectorize_window(
+    path: Path, window: Window, classes: Sequence[int], band: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``(wkb, value, on_seam)`` for target classes in *window*.
+
+    Only one window is ever read, so memory stays bounded by the window
+    size. Polygons reaching the window edge are flagged as seam parts.
+    """
+    rasterio = _rasterio()
+    row, col, height, width = window
+    win = rasterio.windows.Window(col, row, width, height)
+    with rasterio.open(path) as src:
+        data = src.read(band, window=win)
+        transform = src.window_transform(win)
+        left, bottom, right, top = rasterio.windows.bounds(
+            win, src.transform
+        )
+        res = max(abs(src.res[0]), abs(src.res[1]))
+    mask = np.isin(data, classes)
+    if not mask.any():
+        empty = np.empty(0, dtype=object)
+        return empty, np.empty(0, dtype=data.dtype), np.empty(0, dtype=bool)
+    shapes = list(
+        rasterio.features.shapes(data, mask=mask, transform=transform)
+    )
+    geoms = np.array(
+        [shapely.geometry.shape(geom) for geom, _ in shapes], dtype=object
+    )
+    values = np.array([value for _, value in shapes], dtype=data.dtype)
+    bounds = shapely.bounds(geoms)
+    tol = res / 2.0
+    on_seam = (
+        (bounds[:, 0] <= left + tol)
+        | (bounds[:, 1] <= bottom + tol)
+        | (bounds[:, 2] >= right - tol)
+        | (bounds[:, 3] >= top - tol)
+    )
+    return shapely.to_wkb(geoms), values, on_seam
+
+
+def raster_to_polygons(
+    path: Path,
+    gpkg_path: Path,
+    layer: str,
+    classes: Sequence[int] = DEFAULT_CLASSES,
+    *,
+    attrs: Optional[Mapping[str, object]] = None,
+    band: int = 1,
+    window: int = DEFAULT_WINDOW,
+    bbox=None,
+    workers: Optional[int] = None,
+) -> int:
+    """Vectorize *classes* of a raster into *layer*, window by window.
+
+    Windows are read and polygonized in a process pool; polygons clear of
+    their window edge are appended to the layer as soon as the window
+    finishes, and only seam polygons are kept back to be merged per class
+    once all windows are done. *layer* is replaced even when nothing is
+    found. Every feature gets the constant *attrs*
+    (``Pit_Type`` by default). With *bbox*, only windows overlapping it
+    are read. Returns the number of features written.
+    """
+    rasterio = _rasterio()
+    attrs = DEFAULT_ATTRS if attrs is None else dict(attrs)
+    with rasterio.open(path) as src:
+        crs = src.crs
+    windows = raster_windows(path, window, bbox)
+
+    written = 0
+
+    def _frame(geoms: np.ndarray) -> gpd.GeoDataFrame:
+        return gpd.GeoDataFrame(
+            {
+                name: pd.Series(
+                    [value] * len(geoms), dtype=pd.Series([value]).dtype
+                )
+                for name, value in attrs.items()
+            },
+            geometry=gpd.GeoSeries(geoms, crs=crs),
+        )
+
+    def _write(geoms: np.ndarray) -> None:
+        nonlocal written
+        if len(geoms) == 0:
+            return
+        export_spatial_layer(_frame(geoms), layer, gpkg_path, mode="a")
+        written += len(geoms)
+
+    # Start from an empty layer, so a run finding nothing leaves no stale
+    # polygons from an earlier run behind
+    export_spatial_layer(
+        _frame(np.empty(0, dtype=object)), layer, gpkg_path
+    )
+
+    seams: Dict[int, List[np.ndarray]] = {}
+    with worker_pool(workers) as pool:
+        chunks = [(path, win, tuple(classes), band) for win in windows]
+        for wkb, values, on_seam in iter_chunks(
+            _vectorize_window, chunks, pool
+        ):
+            geoms = shapely.from_wkb(wkb)
+            _write(geoms[~on_seam])
+            for value in np.unique(values[on_seam]):
+                hit = on_seam & (values == value)
+                seams.setdefault(int(value), []).append(geoms[hit])
+
+    # Pixel-aligned seam parts form a coverage per class
+    for parts in seams.values():
+        merged = union_polygons(
+            np.concatenate(parts), coverage=True, workers=workers
+        )
+        _write(shapely.get_parts(merged))
+    logger.info(
+        "Vectorized %d windows of %s into %d polygons",
+        len(windows), path, written,
+    )
+    return written
@@ -0,0 +1,206 @@
+"""No-standing segmentation of sidewalk lines from parking sign records."""
+
+from __future__ import annotations
+
+import logging
+from typing import Sequence, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from .linear import free_intervals, line_substrings
+from .snap import MEASURE, SNAP_ID, snap_points
+
+__all__ = [
+    "classify_signs",
+    "clean_signs",
+    "snap_signs",
+    "no_standing_segments",
+]
+
+logger = logging.getLogger(__name__)
+
+SIGN_EPSG = 2263
+SNAP_DISTANCE = 60.0
+SIGN_GAP = 1.5
+FLAG_DISTANCE = 2.0
+MIN_SEGMENT = 0.05
+DEFAULT_CURB_SHIFT = 5.0
+SKIP_TYPES = ("NPARK",)
+SIDEWALK_ID = "SW_ID"
+
+KEYWORDS = "NO STANDING|NO PARKING|HMP|TAXI|HOTEL|LOADING|PASSENGER"
+SHIFTS = {"N": (0, 1), "S": (0, -1), "E": (1, 0), "W": (-1, 0)}
+ARROW_TO_COMPASS = {
+    "E<-": "north", "E->": "south",
+    "W<-": "south", "W->": "north",
+    "N<-": "west", "N->": "east",
+    "S<-": "east", "S->": "west",
+}
+
+
+def classify_signs(text: pd.Series) -> pd.Series:
+    """Return a short code describing each sign description."""
+    txt = text.astype(str).str.upper()
+    curbside = txt.str.contains("TAXI|HOTEL|LOADING|PASSENGER")
+    return pd.Series(
+        np.select(
+            [
+                txt.str.contains("NO STANDING", regex=False),
+                txt.str.contains("NO PARKING", regex=False),
+                txt.str.contains("HMP", regex=False),
+                curbside,
+            ],
+            ["NSTAND", "NPARK", "HMP", "CURBSIDE"],
+            "OTHER",
+        ),
+        index=text.index,
+    )
+
+
+def _parse_arrows(text: pd.Series) -> pd.Series:
+    """Return ``<->``, ``->`` or ``<-`` from the arrow glyphs in *text*."""
+    txt = text.astype(str).str.upper()
+    arrow = np.select(
+        [
+            txt.str.contains("<->", regex=False),
+            txt.str.contains("->", regex=False),
+            txt.str.contains("<-", regex=False),
+        ],
+        ["<->", "->", "<-"],
+        "",
+    )
+    return pd.Series(arrow, index=text.index).replace("", None)
+
+
+def clean_signs(
+    records: pd.DataFrame,
+    desc_field: str = "sign_description",
+    side_field: str = "side_of_street",
+    curb_shift: float = DEFAULT_CURB_SHIFT,
+) -> gpd.GeoDataFrame:
+    """Return sign points filtered, classified and shifted to the sidewalk.
+
+    Keeps records on a known side with a relevant description, a valid
+    coordinate and an arrow, dedupes them on a 0.1 ft grid, then moves
+    each point *curb_shift* feet towards its side of the street.
+    """
+    df = records.copy()
+    side = df[side_field].astype(str).str.strip().str.upper().str[0]
+    df[side_field] = side.where(side.isin(list("NSEW")))
+    x = pd.to_numeric(df["sign_x_coord"], errors="coerce")
+    y = pd.to_numeric(df["sign_y_coord"], errors="coerce")
+    keep = (
+        df[side_field].notna()
+        & df[desc_field].astype(str).str.upper().str.contains(KEYWORDS)
+        & x.notna()
+        & y.notna()
+    )
+    df, x, y = df[keep], x[keep], y[keep]
+    dupe = pd.DataFrame({"x": x.round(1), "y": y.round(1)}).duplicated()
+    df, x, y = df[~dupe], x[~dupe], y[~dupe]
+
+    df["parsed_arrow"] = _parse_arrows(df[desc_field])
+    df = df[df["parsed_arrow"].notna()].copy()
+    df["sign_type"] = classify_signs(df[desc_field])
+    dx = df[side_field].map({k: v[0] for k, v in SHIFTS.items()})
+    dy = df[side_field].map({k: v[1] for k, v in SHIFTS.items()})
+    compass = (df[side_field] + df["parsed_arrow"]).map(ARROW_TO_COMPASS)
+    df["COMPASS"] = compass.where(df["parsed_arrow"] != "<->", "both")
+    geometry = shapely.points(
+        x[df.index] + dx * curb_shift, y[df.index] + dy * curb_shift
+    )
+    return gpd.GeoDataFrame(
+        df.reset_index(drop=True),
+        geometry=np.asarray(geometry),
+        crs=SIGN_EPSG,
+    )
+
+
+def snap_signs(
+    signs: gpd.GeoDataFrame,
+    sidewalks: gpd.GeoDataFrame,
+    max_distance: float = SNAP_DISTANCE,
+) -> Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
+    """Return ``(snapped, orphans)``: signs moved onto their nearest line.
+
+    Uses :func:`~stp.ops.snap.snap_points`; ``SW_ID`` is the sidewalk's
+    position in *sidewalks* and ``MEASURE`` the distance along it.
+    """
+    snapped = snap_points(signs, sidewalks, max_distance).rename(
+        columns={SNAP_ID: SIDEWALK_ID}
+    )
+    orphan = snapped[SIDEWALK_ID].to_numpy() < 0
+    return snapped[~orphan], signs[orphan]
+
+
+def no_standing_segments(
+    sidewalks: gpd.GeoDataFrame,
+    signs: gpd.GeoDataFrame,
+    *,
+    gap: float = SIGN_GAP,
+    flag_distance: float = FLAG_DISTANCE,
+    min_length: float = MIN_SEGMENT,
+    skip_types: Sequence[str] = SKIP_TYPES,
+) -> gpd.GeoDataFrame:
+    """Split signed sidewalks at each sign and flag no-standing segments.
+
+    *signs* come from :func:`snap_signs`. Every line with a sign is cut in
+    measure space around ``MEASURE ± gap``; each piece is paired with the
+    signs within *flag_distance* and gets ``no_stand`` when a sign points
+    towards it (``COMPASS``) or both ways. Pieces keep the sidewalk
+    attributes plus ``no_stand`` (max over signs) and ``sign_type``
+    (alphabetically first). Signs of *skip_types* are ignored.
+    """
+    signs = signs[~signs["sign_type"].isin(skip_types)]
+    ids = np.unique(signs[SIDEWALK_ID].to_numpy(dtype=np.int64))
+    geoms = np.asarray(sidewalks.geometry.values, dtype=object)[ids]
+    lengths = shapely.length(geoms)
+    local = np.searchsorted(ids, signs[SIDEWALK_ID].to_numpy())
+    measure = signs[MEASURE].to_numpy()
+    line, lo, hi = free_intervals(
+        lengths, (local, measure - gap, measure + gap)
+    )
+    keep = hi - lo >= min_length
+    line, lo, hi = line[keep], lo[keep], hi[keep]
+    pieces = line_substrings(geoms[line], lo, hi)
+
+    sign_geoms = np.asarray(signs.geometry.values, dtype=object)
+    tree = shapely.STRtree(pieces)
+    si, pi = tree.query(
+        sign_geoms, predicate="dwithin", distance=flag_distance
+    )
+    centre = shapely.centroid(pieces[pi])
+    dx = shapely.get_x(centre) - shapely.get_x(sign_geoms[si])
+    dy = shapely.get_y(centre) - shapely.get_y(sign_geoms[si])
+    side = np.where(
+        np.abs(dx) >= np.abs(dy),
+        np.where(dx > 0, "east", "west"),
+        np.where(dy > 0, "north", "south"),
+    )
+    compass = signs["COMPASS"].to_numpy()[si]
+    # Sorted type codes, so MIN(code) is the alphabetically first type
+    types, code = np.unique(
+        signs["sign_type"].to_numpy(dtype=str), return_inverse=True
+    )
+    pairs = pd.DataFrame({
+        "piece": pi,
+        "no_stand": ((compass == "both") | (side == compass)).astype(int),
+        "type_code": code[si],
+    })
+    stats = pairs.groupby("piece").agg(
+        no_stand=("no_stand", "max"), type_code=("type_code", "min")
+    )
+    stats["sign_type"] = types[stats.pop("type_code").to_numpy()]
+
+    out = sidewalks.iloc[ids[line]].reset_index(drop=True)
+    out[out.geometry.name] = gpd.GeoSeries(pieces, crs=sidewalks.crs)
+    out = out.join(stats)
+    out["no_stand"] = out["no_stand"].fillna(0).astype(int)
+    logger.info(
+        "Split %d signed sidewalks into %d segments (%d no-standing)",
+        len(ids), len(out), int(out["no_stand"].sum()),
+    )
+    return out
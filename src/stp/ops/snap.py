@@ -0,0 +1,66 @@
+"""Point-to-line snapping for hydrants, signs and work orders."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+__all__ = ["snap_points"]
+
+SNAP_ID = "SNAP_ID"
+SNAP_DIST = "SNAP_DIST"
+MEASURE = "MEASURE"
+
+
+def _as_lines(geoms: np.ndarray) -> np.ndarray:
+    """Return *geoms* with polygons replaced by their boundaries."""
+    polygonal = np.isin(
+        shapely.get_type_id(geoms),
+        [shapely.GeometryType.POLYGON, shapely.GeometryType.MULTIPOLYGON],
+    )
+    out = geoms.copy()
+    out[polygonal] = shapely.boundary(geoms[polygonal])
+    return out
+
+
+def snap_points(
+    points: gpd.GeoDataFrame,
+    targets,
+    max_distance: Optional[float] = None,
+) -> gpd.GeoDataFrame:
+    """Return *points* moved to the nearest location on *targets*.
+
+    One STRtree ``query_nearest`` pairs every point with its nearest
+    target within *max_distance*; vectorized ``line_locate_point`` and
+    ``line_interpolate_point`` then move them all at once. Polygon
+    targets snap to their boundary. Adds ``SNAP_ID`` (position in
+    *targets*, -1 when nothing is in reach), ``SNAP_DIST`` and
+    ``MEASURE``; unmatched points keep their geometry.
+    """
+    geoms = np.asarray(getattr(targets, "geometry", targets), dtype=object)
+    lines = _as_lines(geoms)
+    pts = np.asarray(points.geometry.values, dtype=object)
+    tree = shapely.STRtree(lines)
+    (pi, li), dist = tree.query_nearest(
+        pts, max_distance=max_distance, return_distance=True,
+        all_matches=False,
+    )
+    snap_id = np.full(len(pts), -1, dtype=np.int64)
+    snap_dist = np.full(len(pts), np.nan)
+    measure = np.full(len(pts), np.nan)
+    moved = pts.copy()
+    snap_id[pi], snap_dist[pi] = li, dist
+    measure[pi] = shapely.line_locate_point(lines[li], pts[pi])
+    moved[pi] = shapely.line_interpolate_point(lines[li], measure[pi])
+
+    out = points.copy()
+    out[SNAP_ID] = snap_id
+    out[SNAP_DIST] = snap_dist
+    out[MEASURE] = measure
+    out[out.geometry.name] = gpd.GeoSeries(
+        moved, index=points.index, crs=points.crs
+    )
+    return out
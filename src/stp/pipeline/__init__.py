@@ -0,0 +1,34 @@
+"""Pipeline orchestration: stage graph, caching, tiling and scheduling."""
+
+from .cache import StageCache
+from .dag import Stage, run_graph, select_stages, stage_graph
+from .delta import (
+    change_set,
+    clear_changes,
+    dirty_region,
+    dirty_tiles,
+    record_changes,
+)
+from .scheduler import boundary_tiles, grid_tiles, run_tiles
+from .study_area import apply_study_area, resolve_study_area, study_mask
+from .trace import RunTrace
+
+__all__ = [
+    "Stage",
+    "stage_graph",
+    "select_stages",
+    "run_graph",
+    "StageCache",
+    "change_set",
+    "record_changes",
+    "clear_changes",
+    "dirty_region",
+    "dirty_tiles",
+    "RunTrace",
+    "grid_tiles",
+    "boundary_tiles",
+    "run_tiles",
+    "resolve_study_area",
+    "apply_study_area",
+    "study_mask",
+]
@@ -0,0 +1,196 @@
+"""Content-addressed cache of stage outputs for incremental re-runs."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..storage.file_storage import (
+    export_spatial_layer,
+    list_spatial_layers,
+    read_spatial_layer,
+    storage_lock,
+)
+
+__all__ = ["StageCache", "code_version", "layer_hash"]
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path("Data") / "cache" / "stages"
+HIT = "hit"
+MISS = "miss"
+RUN = "run"
+
+# Parameters applied to every read (the study-area mask is grown by the
+# tile halo), so they change every stage's output
+GLOBAL_PARAMS = ("study_area", "precision", "tiles")
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """Return a hash of every module in the ``stp`` package."""
+    root = Path(__file__).resolve().parents[1]
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def layer_hash(gpkg_path: Path, layer: str) -> Optional[str]:
+    """Return a hash of every row of *layer*, or ``None`` if it is absent.
+
+    Rows are read straight from SQLite, so geometries are hashed as
+    stored without being parsed.
+    """
+    if not Path(gpkg_path).exists():
+        return None
+    digest = hashlib.sha256()
+    with storage_lock(), sqlite3.connect(str(gpkg_path)) as conn:
+        found = conn.execute(
+            "SELECT 1 FROM gpkg_contents WHERE table_name = ?", (layer,)
+        ).fetchone()
+        if not found:
+            return None
+        rows = conn.execute(f'SELECT * FROM "{layer}"')
+        digest.update(repr([col[0] for col in rows.description]).encode())
+        for row in rows:
+            digest.update(repr(row).encode())
+    return digest.hexdigest()[:16]
+
+
+class StageCache:
+    """Stage outputs stored under *root*, keyed by what produced them.
+
+    A stage's key hashes its name, its parameter subset
+    (``Stage.params``) plus :data:`GLOBAL_PARAMS`, the code version and
+    the identity of each input: the key of the cached stage that produced
+    it, or the content hash of the layer in *gpkg* otherwise. Stages with
+    ``params=None`` are never cached. ``state.json`` records which key
+    each layer in *gpkg* holds, so a hit only copies layers back when a
+    different run overwrote them.
+    """
+
+    def __init__(self, root: Path, gpkg: Path) -> None:
+        self.root = Path(root)
+        self.gpkg = Path(gpkg)
+        self._state_path = self.root / "state.json"
+        self._state: Dict[str, str] = {}
+        if self._state_path.exists():
+            self._state = json.loads(self._state_path.read_text())
+        self._produced: Dict[str, str] = {}
+        # Layers nobody upstream writes keep their hash for the whole run
+        self._hashes: Dict[str, str] = {}
+        self.log: List[Tuple[str, Optional[str], str]] = []
+
+    def _entry(self, stage, key: str) -> Path:
+        return self.root / stage.name / f"{key}.gpkg"
+
+    def _input_id(self, name: str) -> str:
+        if name in self._produced:
+            return self._produced[name]
+        if name not in self._hashes:
+            self._hashes[name] = layer_hash(self.gpkg, name) or "-"
+        return self._hashes[name]
+
+    def key(self, stage, params: dict) -> Optional[str]:
+        """Return the cache key of *stage* now, or ``None`` if uncached."""
+        if stage.params is None:
+            return None
+        head = [
+            CACHE_VERSION,
+            stage.name,
+            code_version(),
+            {name: params.get(name) for name in stage.params},
+            {name: params.get(name) for name in GLOBAL_PARAMS},
+            {name: self._input_id(name) for name in stage.inputs},
+        ]
+        text = json.dumps(head, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+    def _mark(self, stage, key: str, layers: Sequence[str]) -> None:
+        for out in stage.outputs:
+            self._produced[out] = f"{key}:{out}"
+        for layer in layers:
+            self._state[layer] = key
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._state_path.write_text(json.dumps(self._state, indent=2))
+
+    def invalidate(self, layers: Sequence[str]) -> None:
+        """Forget which key *layers* hold after a run outside the cache
+        (tiled or delta) rewrote them, so a later hit copies them back."""
+        dropped = [layer for layer in layers if layer in self._state]
+        for layer in dropped:
+            del self._state[layer]
+        if dropped:
+            self._state_path.write_text(json.dumps(self._state, indent=2))
+
+    def restore(self, stage, key: Optional[str]) -> bool:
+        """Put the cached outputs of *key* in place; ``False`` on a miss."""
+        if key is None:
+            self.log.append((stage.name, None, RUN))
+            return False
+        entry = self._entry(stage, key)
+        manifest = entry.with_suffix(".json")
+        if not manifest.exists():
+            # The stage will rewrite its outputs, so forget what they held
+            for out in stage.outputs:
+                self._state.pop(out, None)
+            self.log.append((stage.name, key, MISS))
+            return False
+        layers = json.loads(manifest.read_text())["layers"]
+        for layer in layers:
+            if self._state.get(layer) != key:
+                export_spatial_layer(
+                    read_spatial_layer(entry, layer), layer, self.gpkg
+                )
+        self._mark(stage, key, layers)
+        self.log.append((stage.name, key, HIT))
+        return True
+
+    def store(self, stage, key: Optional[str]) -> None:
+        """Copy the outputs *stage* just wrote into the cache as *key*."""
+        if key is None:
+            return
+        entry = self._entry(stage, key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        present = set(list_spatial_layers(self.gpkg))
+        layers = [out for out in stage.outputs if out in present]
+        for layer in layers:
+            export_spatial_layer(
+                read_spatial_layer(self.gpkg, layer), layer, entry
+            )
+        entry.with_suffix(".json").write_text(json.dumps({
+            "stage": stage.name,
+            "layers": layers,
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }, indent=2))
+        self._mark(stage, key, layers)
+
+    def status(self, stages: Sequence, params: dict) -> List[tuple]:
+        """Return ``(stage, key, hit/miss/run)`` without running anything.
+
+        *stages* must be in dependency order. Keys of downstream stages
+        follow from upstream keys, so the prediction is exact for cached
+        stages; uncached ones always ``run``.
+        """
+        produced = dict(self._produced)
+        report = []
+        for stage in stages:
+            key = self.key(stage, params)
+            if key is None:
+                report.append((stage.name, None, RUN))
+                continue
+            hit = self._entry(stage, key).with_suffix(".json").exists()
+            report.append((stage.name, key, HIT if hit else MISS))
+            for out in stage.outputs:
+                self._produced[out] = f"{key}:{out}"
+        self._produced = produced
+        return report
@@ -0,0 +1,273 @@
+"""Run pipeline stages as a dependency graph of named inputs/outputs."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import (
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from ..core.parallel import (
+    configured_workers,
+    default_workers,
+    with_workers,
+)
+from ..storage.file_storage import set_storage_lock
+from .cache import HIT, StageCache
+from .trace import RunTrace, measure
+
+__all__ = ["Stage", "stage_graph", "select_stages", "run_graph"]
+
+logger = logging.getLogger(__name__)
+
+THREAD = "thread"
+PROCESS = "process"
+
+
+class Stage(NamedTuple):
+    """A pipeline step and the named artifacts (layers) it reads/writes.
+
+    ``kind`` is ``"thread"`` for I/O-bound stages and ``"process"`` for
+    CPU-bound ones; process stages need a module-level ``func``.
+    ``params`` names the parameters that change its output; stages
+    without it are never cached.
+    """
+
+    name: str
+    func: Callable[[dict], None]
+    inputs: tuple = ()
+    outputs: tuple = ()
+    kind: str = THREAD
+    params: Optional[tuple] = None
+
+
+def stage_graph(stages: Sequence[Stage]) -> Dict[str, Set[str]]:
+    """Return ``{stage: upstream stages}`` linking inputs to producers.
+
+    Inputs nobody in *stages* produces are taken as already on disk.
+    Raises ``ValueError`` for an artifact with two producers or a cycle.
+    """
+    producer: Dict[str, str] = {}
+    for stage in stages:
+        for out in stage.outputs:
+            if out in producer:
+                raise ValueError(
+                    f"{out!r} is produced by {producer[out]!r} and "
+                    f"{stage.name!r}"
+                )
+            producer[out] = stage.name
+    graph = {
+        s.name: {producer[i] for i in s.inputs if i in producer} - {s.name}
+        for s in stages
+    }
+    _order(graph)
+    return graph
+
+
+def _order(graph: Dict[str, Set[str]]) -> List[str]:
+    """Return the stages of *graph* in dependency order."""
+    done: List[str] = []
+    left = dict(graph)
+    while left:
+        ready = [n for n, up in left.items() if not up - set(done)]
+        if not ready:
+            raise ValueError(f"Stage cycle among {sorted(left)}")
+        done += ready
+        for name in ready:
+            del left[name]
+    return done
+
+
+def _related(graph: Dict[str, Set[str]], name: str, up: bool) -> Set[str]:
+    """Return every stage upstream (or downstream) of *name*."""
+    edges = graph if up else {
+        n: {m for m, ups in graph.items() if n in ups} for n in graph
+    }
+    seen: Set[str] = set()
+    todo = [name]
+    while todo:
+        for nxt in edges[todo.pop()] - seen:
+            seen.add(nxt)
+            todo.append(nxt)
+    return seen
+
+
+def select_stages(
+    stages: Sequence[Stage], spec: Sequence[str]
+) -> List[Stage]:
+    """Return the subgraph of *stages* chosen by *spec*.
+
+    Each entry is a stage name; ``+name`` adds everything it depends on
+    and ``name+`` everything that depends on it.
+    """
+    graph = stage_graph(stages)
+    chosen: Set[str] = set()
+    for item in spec:
+        name = item.strip("+")
+        if name not in graph:
+            raise ValueError(f"Unknown stage {name!r}")
+        chosen.add(name)
+        if item.startswith("+"):
+            chosen |= _related(graph, name, up=True)
+        if item.endswith("+"):
+            chosen |= _related(graph, name, up=False)
+    return [s for s in stages if s.name in chosen]
+
+
+def _critical_path(
+    graph: Dict[str, Set[str]], seconds: Dict[str, float]
+) -> float:
+    """Return the longest chain of stage times through *graph*."""
+    finish: Dict[str, float] = {}
+    for name in _order(graph):
+        start = max((finish[u] for u in graph[name]), default=0.0)
+        finish[name] = start + seconds.get(name, 0.0)
+    return max(finish.values(), default=0.0)
+
+
+def run_graph(
+    stages: Sequence[Stage],
+    params: dict,
+    workers: Optional[int] = None,
+    cache: Optional[StageCache] = None,
+    trace: Optional[RunTrace] = None,
+) -> Dict[str, float]:
+    """Run *stages* as soon as their inputs exist; return stage seconds.
+
+    A stage is submitted the moment its last producer finishes, thread
+    stages to a thread pool and process stages to a process pool, so
+    independent branches overlap. GeoPackage access is serialized with a
+    shared lock while the pools run, and each stage gets its share of the
+    ``parallel.workers`` budget for its own pools. With a *cache*, stages
+    whose key is cached are restored instead of run (0 seconds); with a
+    *trace*, every stage's record (see
+    :func:`~stp.pipeline.trace.measure`) is kept. On a failure no new
+    stage starts, running ones finish and the first error is raised.
+    """
+    graph = stage_graph(stages)
+    by_name = {s.name: s for s in stages}
+    count = default_workers() if workers is None else int(workers)
+    profile_dir = trace.profile_dir if trace else None
+    seconds: Dict[str, float] = {}
+    wall = time.perf_counter()
+
+    def _restore(stage: Stage) -> Tuple[bool, Optional[str]]:
+        """Return whether *stage* came from the cache, and its key."""
+        key = cache.key(stage, params) if cache else None
+        if not (cache and cache.restore(stage, key)):
+            return False, key
+        logger.info("Stage %s cached", stage.name)
+        seconds[stage.name] = 0.0
+        if trace:
+            trace.cached(stage.name)
+        return True, key
+
+    def _done(stage: Stage, key: Optional[str], record: dict) -> None:
+        seconds[stage.name] = record["wall"]
+        logger.info("Stage %s done (%.1fs)", stage.name, record["wall"])
+        if trace:
+            trace.add(record)
+        if cache:
+            cache.store(stage, key)
+
+    if count <= 1:
+        for name in _order(graph):
+            stage = by_name[name]
+            hit, key = _restore(stage)
+            if hit:
+                continue
+            logger.info("Stage %s started", name)
+            _done(stage, key, measure(name, stage.func, params, profile_dir))
+    else:
+        _run_pools(graph, by_name, params, count, profile_dir, _restore, _done)
+    logger.info(
+        "Ran %d stages in %.1fs (stage total %.1fs, critical path %.1fs)",
+        len(seconds),
+        time.perf_counter() - wall,
+        sum(seconds.values()),
+        _critical_path(graph, seconds),
+    )
+    if cache:
+        hits = sum(1 for _, _, status in cache.log if status == HIT)
+        logger.info("Cache: %d hits, %d run", hits, len(cache.log) - hits)
+    return seconds
+
+
+def _run_pools(
+    graph: Dict[str, Set[str]],
+    by_name: Dict[str, Stage],
+    params: dict,
+    count: int,
+    profile_dir,
+    restore: Callable[[Stage], Tuple[bool, Optional[str]]],
+    done: Callable[[Stage, Optional[str], dict], None],
+) -> None:
+    # Stages open their own worker pools for unions, erases and overlays;
+    # share one core budget between the stages that can run at once
+    budget = configured_workers(params)
+    budget = default_workers() if budget is None else int(budget)
+    params = with_workers(params, max(1, budget // count))
+    lock = multiprocessing.get_context().Lock()
+    set_storage_lock(lock)
+    threads = ThreadPoolExecutor(max_workers=count)
+    processes = ProcessPoolExecutor(
+        max_workers=count, initializer=set_storage_lock, initargs=(lock,)
+    )
+    running: Dict[Future, Tuple[str, Optional[str]]] = {}
+    waiting = dict(graph)
+    finished: Set[str] = set()
+    error: Optional[BaseException] = None
+    try:
+        while waiting or running:
+            # Cache hits finish at once and may make more stages ready
+            ready = True
+            while ready and error is None:
+                ready = [n for n, up in waiting.items() if not up - finished]
+                for name in ready:
+                    stage = by_name[name]
+                    del waiting[name]
+                    hit, key = restore(stage)
+                    if hit:
+                        finished.add(name)
+                        continue
+                    pool = processes if stage.kind == PROCESS else threads
+                    logger.info("Stage %s started", name)
+                    fut = pool.submit(
+                        measure, name, stage.func, params, profile_dir
+                    )
+                    running[fut] = (name, key)
+            if not running:
+                break
+            complete, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in complete:
+                name, key = running.pop(fut)
+                try:
+                    record = fut.result()
+                except Exception as err:  # noqa: BLE001 - re-raised below
+                    logger.error("Stage %s failed: %s", name, err)
+                    error = error or err
+                    continue
+                done(by_name[name], key, record)
+                finished.add(name)
+    finally:
+        threads.shutdown()
+        processes.shutdown()
+        set_storage_lock(None)
+    if error is not None:
+        raise error
@@ -0,0 +1,162 @@
+"""Change sets of source layers and the dirty regions they imply."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import List, Mapping, Optional, Union
+
+import fiona
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from ..storage.file_storage import (
+    export_spatial_layer,
+    list_spatial_layers,
+    read_spatial_layer,
+    storage_lock,
+)
+from .scheduler import DEFAULT_HALO, TILE_ID
+
+__all__ = [
+    "change_set",
+    "record_changes",
+    "clear_changes",
+    "dirty_region",
+    "dirty_tiles",
+]
+
+logger = logging.getLogger(__name__)
+
+CHANGES_LAYER = "source_changes"
+LAYER = "LAYER"
+FEATURE_ID = "FEATURE_ID"
+CHANGE = "CHANGE"
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+
+def _changed_rows(old: pd.DataFrame, new: pd.DataFrame) -> np.ndarray:
+    """Return which aligned rows differ in any attribute or geometry."""
+    geom = old.geometry.name
+    moved = shapely.to_wkb(np.asarray(old.geometry.values)) != shapely.to_wkb(
+        np.asarray(new.geometry.values)
+    )
+    cols = [c for c in old.columns if c != geom and c in new.columns]
+    a = old[cols].reset_index(drop=True)
+    b = new[cols].reset_index(drop=True)
+    same = (a == b) | (a.isna() & b.isna())
+    differs = ~same.all(axis=1).to_numpy()
+    return moved | differs | (len(cols) != len(new.columns) - 1)
+
+
+def change_set(
+    old: gpd.GeoDataFrame, new: gpd.GeoDataFrame, key: str
+) -> gpd.GeoDataFrame:
+    """Return the features inserted, updated or deleted from *old* to *new*.
+
+    Features are matched on *key*. Each change row holds the feature id,
+    ``CHANGE`` and the bounding box of the feature as it was and as it is,
+    so a move dirties both places.
+    """
+    if old.crs is not None and new.crs is not None:
+        old = old.to_crs(new.crs)
+    old = old.set_index(key, drop=False)
+    new = new.set_index(key, drop=False)
+    gone = old.index.difference(new.index)
+    added = new.index.difference(old.index)
+    both = old.index.intersection(new.index)
+    changed = both[_changed_rows(old.loc[both], new.loc[both])]
+
+    def boxes(frame: gpd.GeoDataFrame, ids) -> np.ndarray:
+        geoms = np.asarray(frame.geometry.loc[ids].values, dtype=object)
+        return shapely.envelope(geoms)
+
+    both_boxes = shapely.envelope(
+        shapely.union(boxes(old, changed), boxes(new, changed))
+    )
+    geoms = np.concatenate([
+        boxes(new, added), both_boxes, boxes(old, gone)
+    ])
+    kinds = (
+        [INSERT] * len(added) + [UPDATE] * len(changed) + [DELETE] * len(gone)
+    )
+    ids = list(added) + list(changed) + list(gone)
+    return gpd.GeoDataFrame(
+        {FEATURE_ID: pd.Series(ids, dtype=object).astype(str), CHANGE: kinds},
+        geometry=geoms,
+        crs=new.crs,
+    )
+
+
+def record_changes(
+    gpkg_path: Path, layer: str, new: gpd.GeoDataFrame, key: str
+) -> gpd.GeoDataFrame:
+    """Replace *layer* with *new* and log the change set for it.
+
+    Meant for the download step: the changes are appended to the
+    ``source_changes`` layer (with ``LAYER``) until a delta run has
+    consumed them. A layer seen for the first time is all inserts. The
+    layer is written in spatial order so tile reads stay local.
+    """
+    if layer in list_spatial_layers(gpkg_path):
+        old = read_spatial_layer(gpkg_path, layer)
+    else:
+        old = new.iloc[:0]
+    changes = change_set(old, new, key)
+    export_spatial_layer(new, layer, gpkg_path, sort=True)
+    if len(changes):
+        changes.insert(0, LAYER, layer)
+        mode = "a" if CHANGES_LAYER in list_spatial_layers(gpkg_path) else "w"
+        export_spatial_layer(changes, CHANGES_LAYER, gpkg_path, mode=mode)
+    logger.info(
+        "%s: %s", layer, changes[CHANGE].value_counts().to_dict() or "same"
+    )
+    return changes
+
+
+def clear_changes(gpkg_path: Path) -> None:
+    """Drop the logged change sets once a delta run has applied them."""
+    if CHANGES_LAYER in list_spatial_layers(gpkg_path):
+        with storage_lock():
+            fiona.remove(str(gpkg_path), layer=CHANGES_LAYER)
+
+
+def dirty_region(
+    changes: gpd.GeoDataFrame,
+    grow: Union[float, Mapping[str, float]] = DEFAULT_HALO,
+    lines: Optional[gpd.GeoDataFrame] = None,
+):
+    """Return the area whose outputs the *changes* can affect.
+
+    Every change box is grown by its layer's buffer distance (*grow* per
+    ``LAYER``, or one distance for all). Placement along a sidewalk line
+    depends on the whole line, so with *lines* the region also takes in
+    the full extent of every line it touches.
+    """
+    if not len(changes):
+        return shapely.Polygon()
+    if isinstance(grow, Mapping):
+        dist = changes[LAYER].map(grow).fillna(DEFAULT_HALO).to_numpy()
+    else:
+        dist = np.full(len(changes), float(grow))
+    geoms = np.asarray(changes.geometry.values, dtype=object)
+    region = shapely.union_all(shapely.buffer(geoms, dist, join_style="mitre"))
+    if lines is not None and len(lines):
+        tree = shapely.STRtree(np.asarray(lines.geometry.values))
+        hit = tree.query(region, predicate="intersects")
+        if len(hit):
+            extents = shapely.envelope(tree.geometries.take(hit))
+            region = shapely.union(region, shapely.union_all(extents))
+    return region
+
+
+def dirty_tiles(tiles: gpd.GeoDataFrame, region) -> List[str]:
+    """Return the ids of *tiles* that overlap *region*."""
+    if shapely.is_empty(region):
+        return []
+    hit = shapely.intersects(np.asarray(tiles.geometry.values), region)
+    return tiles.loc[hit, TILE_ID].tolist()
@@ -0,0 +1,261 @@
+"""Run pipeline stages tile by tile with halo margins and stitch results."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import traceback
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pyogrio
+import shapely
+
+from ..core.parallel import iter_chunks, with_workers, worker_pool
+from ..storage.file_storage import (
+    export_spatial_layer,
+    list_spatial_layers,
+    read_spatial_layer,
+    storage_lock,
+)
+
+__all__ = ["grid_tiles", "boundary_tiles", "run_tiles", "is_stitched"]
+
+logger = logging.getLogger(__name__)
+
+TILE_ID = "TILE_ID"
+# Largest buffer in the chain (subway lines), in feet
+DEFAULT_HALO = 80.0
+DEFAULT_TILE_SIZE = 10_000.0
+DONE_SUFFIX = ".done"
+
+Stage = Callable[[dict], None]
+
+
+def grid_tiles(
+    bounds: Sequence[float], size: float = DEFAULT_TILE_SIZE, crs=None
+) -> gpd.GeoDataFrame:
+    """Return square tiles of *size* covering *bounds*."""
+    minx, miny, maxx, maxy = bounds
+    xs = np.arange(minx, maxx, size)
+    ys = np.arange(miny, maxy, size)
+    gx, gy = np.meshgrid(xs, ys, indexing="ij")
+    gx, gy = gx.ravel(), gy.ravel()
+    boxes = shapely.box(gx, gy, gx + size, gy + size)
+    ids = [f"{i}_{j}" for i, j in zip(
+        ((gx - minx) // size).astype(int), ((gy - miny) // size).astype(int)
+    )]
+    return gpd.GeoDataFrame({TILE_ID: ids}, geometry=boxes, crs=crs)
+
+
+def boundary_tiles(
+    boundaries: gpd.GeoDataFrame, field: str
+) -> gpd.GeoDataFrame:
+    """Return one tile per value of *field* (boroughs, districts, ...)."""
+    tiles = boundaries.dissolve(by=field).reset_index()
+    tiles[TILE_ID] = tiles[field].astype(str)
+    return tiles[[TILE_ID, tiles.geometry.name]]
+
+
+def _owner(tiles: gpd.GeoDataFrame, geoms: np.ndarray) -> np.ndarray:
+    """Return the position of the first tile covering each geometry's
+    representative point, or -1."""
+    points = shapely.point_on_surface(geoms)
+    cores = np.asarray(tiles.geometry.values, dtype=object)
+    tree = shapely.STRtree(cores)
+    pi, ti = tree.query(points, predicate="covered_by")
+    owner = np.full(len(geoms), -1, dtype=np.int64)
+    # reversed so the lowest tile position per point is written last
+    owner[pi[::-1]] = ti[::-1]
+    return owner
+
+
+def _tile_path(work_dir: Path, tile_id: str) -> Path:
+    return Path(work_dir) / f"tile_{tile_id}.gpkg"
+
+
+def _run_tile(
+    tile_id: str,
+    core_wkb: bytes,
+    source: Path,
+    work_dir: Path,
+    params: dict,
+    stages: Sequence[Stage],
+    halo: float,
+) -> Tuple[str, Optional[str]]:
+    """Run *stages* on the inputs around one tile; return any error.
+
+    Every source layer is read only within the tile bounds grown by
+    *halo*, so a worker never holds more than its own neighbourhood.
+    The tile's GeoPackage is rebuilt from scratch on every attempt and a
+    marker file is written once all stages have succeeded.
+    """
+    path = _tile_path(work_dir, tile_id)
+    done = path.with_suffix(DONE_SUFFIX)
+    try:
+        for stale in (path, done):
+            if stale.exists():
+                stale.unlink()
+        minx, miny, maxx, maxy = shapely.from_wkb(core_wkb).bounds
+        bbox = (minx - halo, miny - halo, maxx + halo, maxy + halo)
+        for layer in list_spatial_layers(source):
+            gdf = read_spatial_layer(source, layer, bbox=bbox)
+            if len(gdf):
+                export_spatial_layer(gdf, layer, path)
+        tile_params = dict(
+            with_workers(params, 1),
+            gpkg=str(path),
+            boundary_index=str(path.with_suffix(".boundary.pkl")),
+        )
+        for stage in stages:
+            stage(tile_params)
+        done.touch()
+        return tile_id, None
+    except Exception:  # noqa: BLE001 - reported back per tile
+        return tile_id, traceback.format_exc()
+
+
+def _drop_tiles(target: Path, layer: str, tile_ids: Sequence[str]) -> None:
+    """Delete the features of *tile_ids* from a stitched *layer*."""
+    marks = ",".join("?" * len(tile_ids))
+    with storage_lock(), sqlite3.connect(str(target)) as conn:
+        conn.execute(
+            f'DELETE FROM "{layer}" WHERE "{TILE_ID}" IN ({marks})',
+            list(tile_ids),
+        )
+
+
+def _stitch(
+    tiles: gpd.GeoDataFrame,
+    work_dir: Path,
+    target: Path,
+    layers: List[str],
+    only: Optional[Sequence[str]] = None,
+) -> None:
+    """Append each tile's share of *layers* to *target*, one tile at a
+    time; a feature belongs to the tile holding its representative
+    point, so features seen by several halos are written once.
+
+    Stitched features carry ``TILE_ID``. With *only*, layers already
+    stitched keep every other tile's features and just those tiles are
+    swapped for their new output.
+    """
+    present = set(list_spatial_layers(target))
+    for layer in layers:
+        mode = "w"
+        ids = tiles[TILE_ID]
+        if only is not None and layer in present:
+            columns = pyogrio.read_info(target, layer=layer)["fields"]
+            if TILE_ID in columns:
+                _drop_tiles(target, layer, list(only))
+                ids = ids[ids.isin(only)]
+                mode = "a"
+        for pos, tile_id in ids.items():
+            path = _tile_path(work_dir, tile_id)
+            if layer not in list_spatial_layers(path):
+                continue
+            gdf = read_spatial_layer(path, layer)
+            if gdf.crs is not None and tiles.crs is not None:
+                gdf = gdf.to_crs(tiles.crs)
+            own = _owner(tiles, np.asarray(gdf.geometry.values)) == pos
+            if own.any():
+                gdf = gdf[own].assign(**{TILE_ID: tile_id})
+                export_spatial_layer(gdf, layer, target, mode=mode)
+                mode = "a"
+
+
+def is_stitched(
+    tiles: gpd.GeoDataFrame,
+    work_dir: Path,
+    target: Path,
+    outputs: Sequence[str],
+) -> bool:
+    """Return whether *outputs* in *target* were stitched from *tiles*.
+
+    That is, every output present carries ``TILE_ID`` and every tile
+    still has its finished result in *work_dir*, so single tiles can be
+    rerun and swapped in.
+    """
+    present = set(list_spatial_layers(target))
+    layers = [layer for layer in outputs if layer in present]
+    if not layers:
+        return False
+    for layer in layers:
+        if TILE_ID not in pyogrio.read_info(target, layer=layer)["fields"]:
+            return False
+    return all(
+        _tile_path(work_dir, t).with_suffix(DONE_SUFFIX).exists()
+        for t in tiles[TILE_ID]
+    )
+
+
+def run_tiles(
+    stages: Sequence[Stage],
+    params: dict,
+    tiles: gpd.GeoDataFrame,
+    outputs: Sequence[str],
+    *,
+    work_dir: Path,
+    halo: float = DEFAULT_HALO,
+    retries: int = 1,
+    only: Optional[Sequence[str]] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, str]:
+    """Run the stage chain per tile in a process pool and stitch outputs.
+
+    *stages* must be module-level functions taking the params dict. Each
+    tile works on its own GeoPackage under *work_dir*; tiles that already
+    finished (marker file present) are skipped, so re-running after a
+    failure only redoes the unfinished tiles, and *only* reruns just the
+    given tile ids. Failed tiles are retried up to *retries* times. Once
+    every tile has finished, *outputs* are stitched back into the params
+    GeoPackage (with *only*, just those tiles' features are replaced in
+    outputs stitched before). Returns ``{tile_id: traceback}`` for
+    unfinished tiles; nothing is stitched in that case.
+    """
+    source = Path(params["gpkg"])
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    tiles = tiles.reset_index(drop=True)
+    if tiles.crs is None and list_spatial_layers(source):
+        first = list_spatial_layers(source)[0]
+        tiles = tiles.set_crs(pyogrio.read_info(source, layer=first)["crs"])
+    cores = dict(zip(tiles[TILE_ID], shapely.to_wkb(tiles.geometry.values)))
+
+    def finished(tile_id: str) -> bool:
+        done = _tile_path(work_dir, tile_id).with_suffix(DONE_SUFFIX)
+        return done.exists()
+
+    if only is not None:
+        pending = [t for t in tiles[TILE_ID] if t in set(only)]
+    else:
+        pending = [t for t in tiles[TILE_ID] if not finished(t)]
+    failed: Dict[str, str] = {}
+    with worker_pool(workers) as pool:
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            logger.info(
+                "Running %d tiles (attempt %d)", len(pending), attempt + 1
+            )
+            chunks = [
+                (t, cores[t], source, work_dir, params, tuple(stages), halo)
+                for t in pending
+            ]
+            failed = {}
+            for tile_id, error in iter_chunks(_run_tile, chunks, pool):
+                if error is not None:
+                    logger.warning("Tile %s failed:\n%s", tile_id, error)
+                    failed[tile_id] = error
+            pending = sorted(failed)
+    unfinished = {
+        t: failed.get(t, "not run")
+        for t in tiles[TILE_ID]
+        if not finished(t)
+    }
+    if unfinished:
+        return unfinished
+    _stitch(tiles, work_dir, source, list(outputs), only)
+    return {}
@@ -0,0 +1,110 @@
+"""Study area: the district, polygon or bbox a run is limited to."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Mapping, Optional, Sequence
+
+import geopandas as gpd
+import shapely
+
+from ..storage.file_storage import read_spatial_layer
+
+__all__ = ["resolve_study_area", "apply_study_area", "study_mask"]
+
+STUDY_AREA = "study_area"
+
+
+def _boundary(
+    read: Callable[[str], gpd.GeoDataFrame],
+    layer: str,
+    value,
+    field: Optional[str],
+    boundaries: Mapping[str, Sequence[str]],
+) -> gpd.GeoSeries:
+    """Return the features of *layer* whose *field* equals *value*."""
+    if field is None:
+        if not boundaries.get(layer):
+            raise ValueError(f"No key field known for boundary {layer!r}")
+        field = boundaries[layer][0]
+    gdf = read(layer)
+    hit = gdf[gdf[field].astype(str) == str(value)]
+    if hit.empty:
+        raise ValueError(f"No {layer} feature with {field} = {value!r}")
+    return hit.geometry
+
+
+def resolve_study_area(
+    spec,
+    gpkg_path: Path,
+    boundaries: Optional[Mapping[str, Sequence[str]]] = None,
+    crs=None,
+    reader: Optional[Callable[[str], gpd.GeoDataFrame]] = None,
+):
+    """Return the study-area geometry for *spec*, or ``None`` without one.
+
+    *spec* is ``"layer:value"`` or ``{"layer", "value", "field"}`` (the
+    matching features of a boundary layer in *gpkg_path*; the field
+    defaults to the layer's first key field in *boundaries*), a WKT
+    string, or ``[minx, miny, maxx, maxy]``. A mapping with ``wkt`` or
+    ``bbox`` may add the ``crs`` its coordinates are in. The result is
+    in *crs* when given. *reader* (layer name to GeoDataFrame) replaces
+    reading boundary layers from *gpkg_path*, e.g. for PostGIS.
+    """
+    if not spec:
+        return None
+    boundaries = boundaries or {}
+    src_crs = None
+    if isinstance(spec, str) and ":" in spec and "(" not in spec:
+        layer, value = spec.split(":", 1)
+        spec = {"layer": layer, "value": value}
+    if isinstance(spec, Mapping) and "layer" in spec:
+        if reader is None:
+            def reader(layer):
+                return read_spatial_layer(gpkg_path, layer)
+        geoms = _boundary(
+            reader, spec["layer"], spec["value"], spec.get("field"),
+            boundaries,
+        )
+        src_crs = geoms.crs
+        area = shapely.union_all(geoms.values)
+    else:
+        if isinstance(spec, Mapping):
+            src_crs = spec.get("crs")
+            spec = spec.get("wkt", spec.get("bbox"))
+        if isinstance(spec, str):
+            area = shapely.from_wkt(spec)
+        else:
+            area = shapely.box(*spec)
+    if crs is not None and src_crs is not None:
+        area = gpd.GeoSeries([area], crs=src_crs).to_crs(crs).iloc[0]
+    return area
+
+
+def apply_study_area(params: dict, gpkg_path: Path, crs=None) -> dict:
+    """Return *params* with ``study_area`` resolved to WKT in *crs*.
+
+    Done once per run, so stages (and their cache keys) see one plain
+    geometry whichever form the config used.
+    """
+    area = resolve_study_area(
+        params.get(STUDY_AREA), gpkg_path, params.get("boundaries"), crs
+    )
+    if area is None:
+        return params
+    return dict(params, **{STUDY_AREA: area.wkt})
+
+
+@lru_cache(maxsize=8)
+def _from_wkt(wkt: str):
+    return shapely.from_wkt(wkt)
+
+
+def study_mask(params: dict, grow: float = 0.0):
+    """Return the resolved study area grown by *grow*, or ``None``."""
+    wkt = params.get(STUDY_AREA)
+    if not wkt:
+        return None
+    area = _from_wkt(wkt)
+    return area.buffer(grow, join_style="mitre") if grow else area
@@ -0,0 +1,287 @@
+"""Per-stage timing, memory and I/O records with JSON/Chrome-trace export."""
+
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..storage.file_storage import row_counters
+
+__all__ = [
+    "RunTrace",
+    "measure",
+    "peak_rss",
+    "current_rss",
+    "child_cpu",
+    "io_bytes",
+]
+
+DEFAULT_TRACE_DIR = Path("Data") / "traces"
+MB = 1024 * 1024
+
+
+def _win_memory():  # pragma: no cover - platform specific
+    """Return the Windows memory counters of this process, or ``None``."""
+    import ctypes
+    from ctypes import wintypes
+
+    class _Counters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = _Counters()
+    counters.cb = ctypes.sizeof(counters)
+    ok = ctypes.windll.psapi.GetProcessMemoryInfo(
+        ctypes.windll.kernel32.GetCurrentProcess(),
+        ctypes.byref(counters),
+        counters.cb,
+    )
+    return counters if ok else None
+
+
+def peak_rss() -> Optional[int]:
+    """Return the peak resident memory of this process in bytes."""
+    if sys.platform == "win32":  # pragma: no cover - platform specific
+        counters = _win_memory()
+        return counters.PeakWorkingSetSize if counters else None
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - platform specific
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss() -> Optional[int]:
+    """Return the resident memory of this process right now, in bytes."""
+    if sys.platform == "win32":  # pragma: no cover - platform specific
+        counters = _win_memory()
+        return counters.WorkingSetSize if counters else None
+    try:
+        with open("/proc/self/statm") as fh:
+            pages = int(fh.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def child_cpu() -> float:
+    """Return the CPU seconds used by finished child processes."""
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+class _RssSampler:
+    """Tracks the highest :func:`current_rss` while a stage runs.
+
+    ``ru_maxrss`` only ever grows, so it cannot tell one stage's peak
+    from an earlier, larger one; sampling can. Where the current RSS is
+    unknown (macOS), :attr:`peak` falls back to the process peak.
+    """
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.start = current_rss()
+        self.peak = self.start
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> None:
+        rss = current_rss()
+        if rss is not None:
+            self.peak = max(self.peak or 0, rss)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "_RssSampler":
+        if self.start is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.start is None:
+            self.peak = peak_rss()
+            return
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def io_bytes() -> Tuple[Optional[int], Optional[int]]:
+    """Return ``(read, written)`` bytes of file I/O by this process."""
+    if sys.platform == "win32":  # pragma: no cover - platform specific
+        import ctypes
+
+        class _Io(ctypes.Structure):
+            _fields_ = [(name, ctypes.c_ulonglong) for name in (
+                "ReadOperationCount", "WriteOperationCount",
+                "OtherOperationCount", "ReadTransferCount",
+                "WriteTransferCount", "OtherTransferCount",
+            )]
+
+        counters = _Io()
+        ok = ctypes.windll.kernel32.GetProcessIoCounters(
+            ctypes.windll.kernel32.GetCurrentProcess(),
+            ctypes.byref(counters),
+        )
+        if not ok:
+            return None, None
+        return counters.ReadTransferCount, counters.WriteTransferCount
+    try:
+        with open("/proc/self/io") as fh:
+            fields = dict(line.split(": ") for line in fh.read().splitlines())
+    except OSError:
+        return None, None
+    return int(fields["rchar"]), int(fields["wchar"])
+
+
+def _delta(after: Optional[int], before: Optional[int]) -> Optional[int]:
+    return None if after is None or before is None else after - before
+
+
+def measure(
+    name: str,
+    func: Callable[[dict], None],
+    params: dict,
+    profile_dir: Optional[Path] = None,
+) -> dict:
+    """Run ``func(params)`` and return its trace record.
+
+    CPU time is the calling thread's plus that of the worker processes
+    the stage started and shut down (``cpu_children``). Peak RSS is the
+    highest resident memory sampled while the stage ran, and
+    ``rss_delta`` what it kept on return. Memory, I/O bytes and child
+    CPU are for the whole process, so thread stages running side by
+    side share them. Rows come from the GeoPackage helpers used by this
+    thread. With *profile_dir*, a cProfile dump ``<name>.prof`` is
+    written there.
+    """
+    rows_before = row_counters()
+    read0, written0 = io_bytes()
+    cpu0 = time.thread_time()
+    children0 = child_cpu()
+    start = time.time()
+    profiler = cProfile.Profile() if profile_dir is not None else None
+    with _RssSampler() as rss:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            func(params)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                Path(profile_dir).mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(
+                    str(Path(profile_dir) / f"{name}.prof")
+                )
+    end = time.time()
+    read1, written1 = io_bytes()
+    rows_after = row_counters()
+    children = child_cpu() - children0
+    return {
+        "stage": name,
+        "start": start,
+        "wall": end - start,
+        "cpu": time.thread_time() - cpu0 + children,
+        "cpu_children": children,
+        "peak_rss": rss.peak,
+        "rss_delta": _delta(current_rss(), rss.start),
+        "rows_in": rows_after[0] - rows_before[0],
+        "rows_out": rows_after[1] - rows_before[1],
+        "bytes_read": _delta(read1, read0),
+        "bytes_written": _delta(written1, written0),
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "cached": False,
+    }
+
+
+class RunTrace:
+    """Collects stage records of one run and writes the reports.
+
+    Set *profile* to have every stage run under cProfile, with one
+    ``.prof`` file per stage in a folder next to the reports.
+    """
+
+    def __init__(
+        self, out_dir: Path = DEFAULT_TRACE_DIR, profile: bool = False
+    ) -> None:
+        self.out_dir = Path(out_dir)
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.started = time.time()
+        self.records: List[dict] = []
+        self.profile_dir = (
+            self.out_dir / f"{self.run_id}_profile" if profile else None
+        )
+
+    def add(self, record: dict) -> None:
+        """Keep one stage record."""
+        self.records.append(record)
+
+    def cached(self, name: str) -> None:
+        """Record a stage served from the stage cache."""
+        self.add({
+            "stage": name, "start": time.time(), "wall": 0.0, "cpu": 0.0,
+            "pid": os.getpid(), "tid": threading.get_ident(), "cached": True,
+        })
+
+    def report(self) -> dict:
+        """Return the run summary and its stage records."""
+        return {
+            "run_id": self.run_id,
+            "wall": time.time() - self.started,
+            "stage_total": sum(r["wall"] for r in self.records),
+            "cache_hits": sum(r["cached"] for r in self.records),
+            "peak_rss_mb": max(
+                (r.get("peak_rss") or 0 for r in self.records), default=0
+            ) / MB,
+            "stages": self.records,
+        }
+
+    def chrome_trace(self) -> dict:
+        """Return the records as Chrome-trace events (Perfetto loads it)."""
+        events = []
+        for rec in self.records:
+            args = {k: v for k, v in rec.items() if k not in ("stage",)}
+            events.append({
+                "name": rec["stage"],
+                "cat": "cache" if rec["cached"] else "stage",
+                "ph": "X",
+                "ts": (rec["start"] - self.started) * 1e6,
+                "dur": rec["wall"] * 1e6,
+                "pid": rec["pid"],
+                "tid": rec["tid"],
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self) -> Dict[str, Path]:
+        """Write ``<run>_report.json`` and ``<run>_trace.json``."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        paths = {
+            "report": self.out_dir / f"{self.run_id}_report.json",
+            "trace": self.out_dir / f"{self.run_id}_trace.json",
+        }
+        paths["report"].write_text(json.dumps(self.report(), indent=2))
+        paths["trace"].write_text(json.dumps(self.chrome_trace()))
+        return paths
@@ -1,18 +1,62 @@
 """File-based GeoDataFrame helpers."""
 
+from __future__ import annotations
+
+import threading
+from contextlib import nullcontext
 from pathlib import Path
 
+import fiona
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 
+from ..core.tiles import hilbert_keys
+
 __all__ = [
     "get_geopackage_path",
     "sanitize_layer_name",
     "export_spatial_layer",
+    "read_spatial_layer",
+    "spatial_sort",
+    "export_parquet_layer",
+    "read_parquet_layer",
+    "list_spatial_layers",
     "reproject_all_layers",
+    "set_storage_lock",
+    "storage_lock",
+    "row_counters",
 ]
 
 LAYER_NAME_MAX_LENGTH = 60
+PARQUET_ROW_GROUP = 50_000
+
+# GeoPackages take one writer at a time; concurrent stages share a lock
+_STORAGE_LOCK = None
+
+
+# Rows read/written by this thread, for per-stage instrumentation
+_ROWS = threading.local()
+
+
+def row_counters() -> tuple:
+    """Return ``(rows read, rows written)`` by the calling thread so far."""
+    return getattr(_ROWS, "read", 0), getattr(_ROWS, "written", 0)
+
+
+def set_storage_lock(lock) -> None:
+    """Serialize GeoPackage reads and writes on *lock* (``None`` to stop).
+
+    Use a :mod:`multiprocessing` lock, passed to pool initializers, when
+    stages in several threads or processes share one GeoPackage.
+    """
+    global _STORAGE_LOCK
+    _STORAGE_LOCK = lock
+
+
+def storage_lock():
+    """Return the shared GeoPackage lock, or a no-op context without one."""
+    return nullcontext() if _STORAGE_LOCK is None else _STORAGE_LOCK
 
 
 def get_geopackage_path(
@@ -36,10 +80,74 @@ def sanitize_layer_name(name: str) -> str:
     return safe[:LAYER_NAME_MAX_LENGTH]
 
 
+def spatial_sort(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """Return ``gdf`` ordered along a Hilbert curve of feature centres."""
+    order = np.argsort(hilbert_keys(gdf.geometry.values), kind="stable")
+    out = gdf.iloc[order]
+    if isinstance(gdf.index, pd.RangeIndex):
+        out = out.reset_index(drop=True)
+    return out
+
+
 def export_spatial_layer(gdf: gpd.GeoDataFrame, layer_name: str,
-                         gpkg_path: Path) -> None:
-    """Write ``gdf`` to ``gpkg_path`` under ``layer_name``."""
-    gdf.to_file(gpkg_path, layer=layer_name, driver="GPKG")
+                         gpkg_path: Path, mode: str = "w",
+                         sort: bool = False) -> None:
+    """Write ``gdf`` to ``gpkg_path`` under ``layer_name`` (``mode="a"``
+    appends to an existing layer).
+
+    With ``sort``, rows are written in :func:`spatial_sort` order so the
+    features a bbox read returns sit on neighbouring pages.
+    """
+    if sort:
+        gdf = spatial_sort(gdf)
+    with storage_lock():
+        gdf.to_file(gpkg_path, layer=layer_name, driver="GPKG", mode=mode)
+    _ROWS.written = getattr(_ROWS, "written", 0) + len(gdf)
+
+
+def read_spatial_layer(gpkg_path: Path, layer_name: str,
+                       bbox=None, mask=None) -> gpd.GeoDataFrame:
+    """Read ``layer_name`` from ``gpkg_path``, optionally within ``bbox``
+    or intersecting the ``mask`` geometry (both use the layer's R-tree)."""
+    with storage_lock():
+        gdf = gpd.read_file(
+            gpkg_path, layer=layer_name, bbox=bbox, mask=mask
+        )
+    _ROWS.read = getattr(_ROWS, "read", 0) + len(gdf)
+    return gdf
+
+
+def export_parquet_layer(gdf: gpd.GeoDataFrame, path: Path,
+                         sort: bool = True,
+                         row_group_size: int = PARQUET_ROW_GROUP) -> None:
+    """Write ``gdf`` to a GeoParquet file (needs pyarrow).
+
+    Rows are spatially sorted by default and a bbox covering column is
+    written, so every row group's statistics hold its extent and
+    :func:`read_parquet_layer` can skip row groups outside a bbox.
+    """
+    if sort:
+        gdf = spatial_sort(gdf)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    gdf.to_parquet(
+        path, write_covering_bbox=True, row_group_size=row_group_size
+    )
+    _ROWS.written = getattr(_ROWS, "written", 0) + len(gdf)
+
+
+def read_parquet_layer(path: Path, bbox=None) -> gpd.GeoDataFrame:
+    """Read a GeoParquet file, optionally only the rows within ``bbox``."""
+    gdf = gpd.read_parquet(path, bbox=bbox)
+    _ROWS.read = getattr(_ROWS, "read", 0) + len(gdf)
+    return gdf
+
+
+def list_spatial_layers(gpkg_path: Path) -> list[str]:
+    """Return layer names in ``gpkg_path`` (empty if the file is missing)."""
+    if not Path(gpkg_path).exists():
+        return []
+    with storage_lock():
+        return fiona.listlayers(str(gpkg_path))
 
 
 def reproject_all_layers(
@@ -56,6 +164,9 @@ def reproject_all_layers(
         except ValueError:
             service_wkid = ""
         gdf = gpd.read_file(gpkg_path, layer=layer_name)
+        if gdf.crs is not None and gdf.crs.to_epsg() == target_epsg:
+            # Already stored in the target CRS (e.g. delta-logged layers)
+            continue
         if gdf.crs is None:
             gdf = gdf.set_crs(epsg=source_epsg, allow_override=True)
         else:
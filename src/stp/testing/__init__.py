@@ -0,0 +1 @@
+"""Synthetic data and benchmarks for measuring how stages scale."""
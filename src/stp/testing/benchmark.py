@@ -0,0 +1,227 @@
+"""Scale benchmarks of the pipeline operators on a synthetic city."""
+
+from __future__ import annotations
+
+import json
+import logging
+import platform
+import subprocess
+import time
+from datetime import datetime
+from functools import cached_property
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import geopandas as gpd
+import pandas as pd
+
+from ..clean.trees import clean_trees_advanced
+from ..ops.attribute import BoundaryIndex
+from ..ops.centerline import sidewalk_centerlines
+from ..ops.erase import pairwise_erase
+from ..ops.linear import place_points
+from ..ops.nodes import intersection_buffers
+from ..ops.prune import rank_dominant_prune
+from ..ops.signs import clean_signs
+from ..ops.snap import snap_points
+from ..ops.union import union_polygons
+from .synth import synthetic_city
+
+__all__ = ["CASES", "run_benchmarks", "save_results", "load_results"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULTS = Path("Data") / "benchmarks" / "results.jsonl"
+SPACING = 25.0
+TREE_BUFFER = 25.0
+HYDRANT_BUFFER = 3.0
+
+
+class _Inputs:
+    """Synthetic layers plus the intermediate results later cases need.
+
+    Intermediates are built on first use, outside any timing.
+    """
+
+    def __init__(self, scale, seed: int, workers: Optional[int]) -> None:
+        self.layers = synthetic_city(scale, seed)
+        self.workers = workers
+
+    @cached_property
+    def geojson(self) -> bytes:
+        return self.layers["trees"].to_json().encode()
+
+    @cached_property
+    def lines(self) -> gpd.GeoDataFrame:
+        return sidewalk_centerlines(
+            self.layers["sidewalk"], workers=self.workers
+        )
+
+    @cached_property
+    def zones(self) -> gpd.GeoSeries:
+        return pd.concat([
+            self.layers["trees"].buffer(TREE_BUFFER),
+            self.layers["hydrants"].buffer(HYDRANT_BUFFER),
+            intersection_buffers(self.layers["street_center"]).geometry,
+        ], ignore_index=True)
+
+    @cached_property
+    def plantable(self) -> gpd.GeoDataFrame:
+        merged = union_polygons(self.zones, workers=self.workers)
+        return pairwise_erase(self.lines, [merged], workers=self.workers)
+
+    @cached_property
+    def points(self) -> gpd.GeoDataFrame:
+        return place_points(self.plantable, SPACING)
+
+
+def _parse_geojson(data: _Inputs) -> int:
+    # Same call the GeoJSON fetcher makes on the downloaded bytes
+    return len(gpd.read_file(BytesIO(data.geojson)))
+
+
+def _clean(data: _Inputs) -> int:
+    trees = clean_trees_advanced(
+        data.layers["trees"], data.layers["planting_spaces"]
+    )
+    signs = clean_signs(data.layers["street_sign"])
+    return len(trees) + len(signs)
+
+
+def _buffer(data: _Inputs) -> int:
+    hydrants = snap_points(data.layers["hydrants"], data.layers["sidewalk"])
+    zones = hydrants.buffer(HYDRANT_BUFFER)
+    nodes = intersection_buffers(data.layers["street_center"])
+    trees = data.layers["trees"].buffer(TREE_BUFFER)
+    return len(zones) + len(nodes) + len(trees)
+
+
+def _union(data: _Inputs) -> int:
+    union_polygons(data.zones, workers=data.workers)
+    return len(data.zones)
+
+
+def _centerlines(data: _Inputs) -> int:
+    return len(sidewalk_centerlines(
+        data.layers["sidewalk"], workers=data.workers
+    ))
+
+
+def _erase(data: _Inputs) -> int:
+    return len(pairwise_erase(data.lines, data.zones, workers=data.workers))
+
+
+def _points(data: _Inputs) -> int:
+    return len(place_points(data.plantable, SPACING))
+
+
+def _prune(data: _Inputs) -> int:
+    points, _ = rank_dominant_prune(data.plantable, SPACING)
+    return len(points)
+
+
+def _attribute(data: _Inputs) -> int:
+    layers = {
+        "borough": data.layers["borough"],
+        "community_districts": data.layers["community_districts"],
+    }
+    fields = {"borough": ["BoroCode"], "community_districts": ["BoroCD"]}
+    return len(BoundaryIndex(layers, fields).attribute(data.points))
+
+
+# Case name -> function of the inputs returning the rows it handled
+CASES: Dict[str, Callable[[_Inputs], int]] = {
+    "parse_geojson": _parse_geojson,
+    "clean": _clean,
+    "buffer": _buffer,
+    "union": _union,
+    "centerlines": _centerlines,
+    "erase": _erase,
+    "points": _points,
+    "prune": _prune,
+    "attribute": _attribute,
+}
+
+# Intermediates each case reads, built before the clock starts
+_NEEDS = {
+    "parse_geojson": ["geojson"],
+    "union": ["zones"],
+    "erase": ["lines", "zones"],
+    "points": ["plantable"],
+    "prune": ["plantable"],
+    "attribute": ["points"],
+}
+
+
+def _commit() -> Optional[str]:
+    """Return the current git commit, if there is one."""
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run_benchmarks(
+    scales: Sequence = ("block",),
+    cases: Optional[Sequence[str]] = None,
+    *,
+    repeat: int = 3,
+    seed: int = 0,
+    workers: Optional[int] = 1,
+) -> List[dict]:
+    """Time each case at each scale; return one result per pair.
+
+    A result keeps the best of *repeat* runs (``seconds``), the rows
+    handled and the commit, so runs can be compared over time.
+    """
+    names = list(CASES) if cases is None else list(cases)
+    commit = _commit()
+    stamp = datetime.now().isoformat(timespec="seconds")
+    results = []
+    for scale in scales:
+        data = _Inputs(scale, seed, workers)
+        for name in names:
+            for need in _NEEDS.get(name, []):
+                getattr(data, need)
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                rows = CASES[name](data)
+                times.append(time.perf_counter() - start)
+            best = min(times)
+            results.append({
+                "scale": scale,
+                "case": name,
+                "seconds": best,
+                "rows": rows,
+                "rows_per_s": rows / best if best else None,
+                "seed": seed,
+                "workers": workers,
+                "commit": commit,
+                "python": platform.python_version(),
+                "when": stamp,
+            })
+            logger.info("%s/%s: %.3fs, %d rows", scale, name, best, rows)
+    return results
+
+
+def save_results(results: List[dict], path: Path = DEFAULT_RESULTS) -> None:
+    """Append *results* to a JSON-lines file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as fh:
+        for row in results:
+            fh.write(json.dumps(row) + "\n")
+
+
+def load_results(path: Path = DEFAULT_RESULTS) -> pd.DataFrame:
+    """Return every recorded result as a frame (empty if none)."""
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
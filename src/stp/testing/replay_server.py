@@ -0,0 +1,346 @@
+"""Local stand-in for the ArcGIS REST and Socrata APIs the fetchers call.
+
+Serves registered GeoDataFrames (synthetic, or recorded GeoJSON files)
+from a threaded HTTP server on localhost, with configurable latency,
+page size, throttling and injected errors::
+
+    with ReplayServer(latency=0.05, page_limit=1000) as server:
+        server.add("trees", synthetic_city("borough")["trees"])
+        url = server.arcgis_url("trees")  # .../FeatureServer/0
+        ...
+        print(server.stats)
+
+ArcGIS: ``<layer>?f=json`` returns layer metadata and ``<layer>/query``
+honours ``resultOffset``, ``resultRecordCount``, ``returnCountOnly``,
+``returnIdsOnly``, envelope ``geometry``/``inSR``, ``outSR`` and
+``f=json|geojson``. Socrata: ``/resource/<name>.json`` and ``.geojson``
+honour ``$limit``, ``$offset`` and ``$order``.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+__all__ = ["ReplayServer"]
+
+OBJECT_ID = "OBJECTID"
+ARCGIS_PREFIX = "/arcgis/rest/services/"
+SOCRATA_PREFIX = "/resource/"
+DEFAULT_PAGE_LIMIT = 2000
+SOCRATA_DEFAULT_LIMIT = 1000
+
+_ESRI_TYPES = {"i": "esriFieldTypeInteger", "u": "esriFieldTypeInteger",
+               "f": "esriFieldTypeDouble", "M": "esriFieldTypeDate",
+               "b": "esriFieldTypeSmallInteger"}
+_ESRI_GEOMETRY = {"Point": "esriGeometryPoint",
+                  "MultiPoint": "esriGeometryMultipoint",
+                  "LineString": "esriGeometryPolyline",
+                  "MultiLineString": "esriGeometryPolyline",
+                  "Polygon": "esriGeometryPolygon",
+                  "MultiPolygon": "esriGeometryPolygon"}
+
+
+def _esri_geometry(geom) -> Optional[dict]:
+    """Return *geom* as Esri JSON (points, paths or rings)."""
+    if geom is None or geom.is_empty:
+        return None
+    kind = geom.geom_type
+    if kind == "Point":
+        return {"x": geom.x, "y": geom.y}
+    if kind == "MultiPoint":
+        return {"points": shapely.get_coordinates(geom).tolist()}
+    parts = shapely.get_parts(geom)
+    if kind.endswith("LineString"):
+        return {"paths": [shapely.get_coordinates(p).tolist() for p in parts]}
+    rings = []
+    for part in parts:
+        for ring in [part.exterior, *part.interiors]:
+            rings.append(shapely.get_coordinates(ring).tolist())
+    return {"rings": rings}
+
+
+def _records(frame: gpd.GeoDataFrame) -> list:
+    """Return the attribute rows of *frame* as JSON-ready dicts."""
+    attrs = pd.DataFrame(frame.drop(columns=frame.geometry.name))
+    for col in attrs.columns:
+        if pd.api.types.is_datetime64_any_dtype(attrs[col]):
+            attrs[col] = attrs[col].astype("int64") // 1_000_000
+    attrs = attrs.astype(object).where(attrs.notna(), None)
+    return attrs.to_dict("records")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+
+    def log_message(self, *args) -> None:  # keep test output quiet
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        replay = self.server.replay
+        status, body, headers = replay._respond(self.path)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    replay: "ReplayServer"
+
+
+class ReplayServer:
+    """ArcGIS/Socrata look-alike on ``127.0.0.1`` for offline fetch tests.
+
+    *latency* seconds are added to every request; *page_limit* caps the
+    records per page (``maxRecordCount``). With *max_concurrent*, requests
+    beyond that many in flight get a 429 with ``Retry-After``; with
+    *error_every*, every n-th request gets a 500. ``stats`` counts
+    requests, 429s, errors, bytes and the peak concurrency seen.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        page_limit: int = DEFAULT_PAGE_LIMIT,
+        max_concurrent: Optional[int] = None,
+        error_every: int = 0,
+        retry_after: float = 1.0,
+        port: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.page_limit = page_limit
+        self.max_concurrent = max_concurrent
+        self.error_every = error_every
+        self.retry_after = retry_after
+        self.datasets: Dict[str, gpd.GeoDataFrame] = {}
+        self.stats = {
+            "requests": 0, "throttled": 0, "errors": 0, "bytes": 0,
+            "peak_concurrent": 0,
+        }
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", port), _Handler)
+        self._server.replay = self
+        self._thread: Optional[threading.Thread] = None
+
+    # -- fixtures -----------------------------------------------------
+    def add(self, name: str, frame: gpd.GeoDataFrame) -> None:
+        """Serve *frame* as dataset *name* (``OBJECTID`` is added)."""
+        frame = frame.reset_index(drop=True)
+        if OBJECT_ID not in frame:
+            frame.insert(0, OBJECT_ID, np.arange(1, len(frame) + 1))
+        self.datasets[name] = frame
+
+    def add_file(self, name: str, path: Path) -> None:
+        """Serve a recorded GeoJSON (or any OGR-readable) file."""
+        self.add(name, gpd.read_file(path))
+
+    # -- lifecycle ----------------------------------------------------
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def arcgis_url(self, name: str) -> str:
+        """Return the FeatureServer layer URL of dataset *name*."""
+        return f"{self.url}{ARCGIS_PREFIX}{name}/FeatureServer/0"
+
+    def socrata_url(self, name: str, fmt: str = "json") -> str:
+        """Return the Socrata resource URL of dataset *name*."""
+        return f"{self.url}{SOCRATA_PREFIX}{name}.{fmt}"
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # -- requests -----------------------------------------------------
+    def _respond(self, path: str):
+        with self._lock:
+            self.stats["requests"] += 1
+            count = self.stats["requests"]
+            self._in_flight += 1
+            self.stats["peak_concurrent"] = max(
+                self.stats["peak_concurrent"], self._in_flight
+            )
+            busy = (
+                self.max_concurrent is not None
+                and self._in_flight > self.max_concurrent
+            )
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if busy:
+                with self._lock:
+                    self.stats["throttled"] += 1
+                return self._error(
+                    429, "Too many requests",
+                    {"Retry-After": str(self.retry_after)},
+                )
+            if self.error_every and count % self.error_every == 0:
+                with self._lock:
+                    self.stats["errors"] += 1
+                return self._error(500, "Injected error")
+            status, payload, ctype = self._route(path)
+            body = json.dumps(payload).encode()
+            with self._lock:
+                self.stats["bytes"] += len(body)
+            return status, body, {"Content-Type": ctype}
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    @staticmethod
+    def _error(status: int, message: str, headers: Optional[dict] = None):
+        body = json.dumps(
+            {"error": {"code": status, "message": message}}
+        ).encode()
+        return status, body, dict(headers or {}, **{
+            "Content-Type": "application/json"
+        })
+
+    def _route(self, path: str):
+        parts = urlsplit(path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        if parts.path.startswith(ARCGIS_PREFIX):
+            rest = parts.path[len(ARCGIS_PREFIX):].strip("/").split("/")
+            frame = self.datasets.get(rest[0])
+            if frame is None:
+                return 404, {"error": {"code": 404}}, "application/json"
+            if rest[-1] == "query":
+                return self._arcgis_query(frame, query)
+            return 200, self._arcgis_metadata(rest[0], frame), (
+                "application/json"
+            )
+        if parts.path.startswith(SOCRATA_PREFIX):
+            stem = Path(parts.path[len(SOCRATA_PREFIX):])
+            frame = self.datasets.get(stem.stem)
+            if frame is not None:
+                return self._socrata(frame, query, stem.suffix)
+        return 404, {"error": {"code": 404}}, "application/json"
+
+    def _arcgis_metadata(self, name: str, frame: gpd.GeoDataFrame) -> dict:
+        fields = []
+        for col, dtype in frame.dtypes.items():
+            if col == frame.geometry.name:
+                continue
+            kind = "esriFieldTypeOID" if col == OBJECT_ID else _ESRI_TYPES.get(
+                dtype.kind, "esriFieldTypeString"
+            )
+            fields.append({"name": col, "type": kind, "alias": col})
+        minx, miny, maxx, maxy = frame.total_bounds
+        kinds = frame.geom_type.dropna().unique()
+        return {
+            "name": name,
+            "type": "Feature Layer",
+            "geometryType": _ESRI_GEOMETRY.get(
+                kinds[0] if len(kinds) else "", None
+            ),
+            "objectIdField": OBJECT_ID,
+            "maxRecordCount": self.page_limit,
+            "fields": fields,
+            "extent": {
+                "xmin": minx, "ymin": miny, "xmax": maxx, "ymax": maxy,
+                "spatialReference": {"wkid": frame.crs.to_epsg()},
+            },
+            "supportsPagination": True,
+        }
+
+    def _arcgis_query(self, frame: gpd.GeoDataFrame, query: dict):
+        ctype = "application/json"
+        if query.get("geometry"):
+            frame = frame[frame.intersects(self._envelope(frame, query))]
+        if query.get("returnCountOnly", "").lower() == "true":
+            return 200, {"count": len(frame)}, ctype
+        if query.get("returnIdsOnly", "").lower() == "true":
+            return 200, {
+                "objectIdFieldName": OBJECT_ID,
+                "objectIds": frame[OBJECT_ID].tolist(),
+            }, ctype
+        offset = int(query.get("resultOffset", 0))
+        count = min(
+            int(query.get("resultRecordCount", self.page_limit)),
+            self.page_limit,
+        )
+        page = frame.iloc[offset:offset + count]
+        more = offset + len(page) < len(frame)
+        out_sr = query.get("outSR")
+        if out_sr and frame.crs is not None:
+            page = page.to_crs(int(out_sr))
+        if query.get("f", "json") == "geojson":
+            payload = json.loads(page.to_json(drop_id=True))
+            payload["properties"] = {"exceededTransferLimit": more}
+            return 200, payload, "application/geo+json"
+        features = [
+            {"attributes": attrs, "geometry": _esri_geometry(geom)}
+            for attrs, geom in zip(_records(page), page.geometry)
+        ]
+        return 200, {
+            "objectIdFieldName": OBJECT_ID,
+            "spatialReference": {
+                "wkid": page.crs.to_epsg() if page.crs else None
+            },
+            "features": features,
+            "exceededTransferLimit": more,
+        }, ctype
+
+    @staticmethod
+    def _envelope(frame: gpd.GeoDataFrame, query: dict):
+        """Return the query's ``geometry`` envelope in the CRS of *frame*."""
+        box = shapely.box(*map(float, query["geometry"].split(",")))
+        if query.get("inSR") and frame.crs is not None:
+            box = gpd.GeoSeries([box], crs=int(query["inSR"])).to_crs(
+                frame.crs
+            ).iloc[0]
+        return box
+
+    def _socrata(self, frame: gpd.GeoDataFrame, query: dict, suffix: str):
+        if "$order" in query:
+            column = query["$order"].split()[0]
+            descending = query["$order"].upper().endswith(" DESC")
+            frame = frame.sort_values(
+                column, ascending=not descending, kind="stable"
+            )
+        limit = min(
+            int(query.get("$limit", SOCRATA_DEFAULT_LIMIT)), self.page_limit
+        )
+        offset = int(query.get("$offset", 0))
+        page = frame.iloc[offset:offset + limit]
+        if frame.crs is not None:
+            page = page.to_crs(4326)
+        if suffix == ".geojson":
+            return 200, json.loads(page.to_json(drop_id=True)), (
+                "application/vnd.geo+json"
+            )
+        rows = _records(page)
+        name = page.geometry.name
+        for row, geom in zip(rows, page.geometry):
+            row[name] = shapely.geometry.mapping(geom) if geom else None
+        return 200, rows, "application/json"
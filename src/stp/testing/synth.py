@@ -0,0 +1,274 @@
+"""Deterministic synthetic city: a street grid with NYC-like layers.
+
+Every layer is derived from one grid of blocks, so the layers line up
+the way the real ones do: sidewalks ring each curb, centerlines run down
+the middle of every street, trees and signs sit on the sidewalks.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from ..ops.signs import DEFAULT_CURB_SHIFT
+from ..storage.file_storage import export_spatial_layer
+
+__all__ = ["SCALES", "synthetic_city", "write_city"]
+
+# Blocks per side of the square grid
+SCALES = {"block": 2, "neighborhood": 12, "borough": 60, "city": 150}
+EPSG = 2263
+ORIGIN = (980_000.0, 190_000.0)
+BLOCK_SIZE = (260.0, 800.0)
+STREET_WIDTH = 60.0
+SIDEWALK_WIDTH = 15.0
+TREE_SPACING = 40.0
+TREE_FILL = 0.6
+SIGN_SPACING = 120.0
+HYDRANTS_PER_BLOCK = 2
+
+SIGN_TEXT = np.array([
+    "NO STANDING ANYTIME <->",
+    "NO PARKING 8AM-6PM EXCEPT SUNDAY ->",
+    "NO STANDING EXCEPT TRUCKS LOADING 7AM-7PM <-",
+    "2 HMP 9AM-7PM EXCEPT SUNDAY ->",
+    "HOTEL LOADING ZONE <->",
+    "BUS STOP",
+])
+CONDITIONS = np.array(["Good", "Fair", "Poor", "Dead", "Unknown"])
+BORO_NAMES = np.array(["Manhattan", "Bronx", "Brooklyn", "Queens"])
+
+
+def _blocks(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the lower-left corners of an *n* by *n* block grid."""
+    pitch_x = BLOCK_SIZE[0] + STREET_WIDTH
+    pitch_y = BLOCK_SIZE[1] + STREET_WIDTH
+    i, j = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+    return ORIGIN[0] + i.ravel() * pitch_x, ORIGIN[1] + j.ravel() * pitch_y
+
+
+def _centerlines(n: int, rng: np.random.Generator) -> gpd.GeoDataFrame:
+    """Return one street segment per block side, meeting at nodes."""
+    half = STREET_WIDTH / 2.0
+    xs = ORIGIN[0] - half + np.arange(n + 1) * (BLOCK_SIZE[0] + STREET_WIDTH)
+    ys = ORIGIN[1] - half + np.arange(n + 1) * (BLOCK_SIZE[1] + STREET_WIDTH)
+    k, j = np.meshgrid(np.arange(n + 1), np.arange(n), indexing="ij")
+    k, j = k.ravel(), j.ravel()
+    avenues = np.stack([
+        np.column_stack([xs[k], ys[j]]), np.column_stack([xs[k], ys[j + 1]])
+    ], axis=1)
+    streets = np.stack([
+        np.column_stack([xs[j], ys[k]]), np.column_stack([xs[j + 1], ys[k]])
+    ], axis=1)
+    coords = np.concatenate([avenues, streets])
+    names = np.concatenate([
+        np.char.add("AVENUE ", k.astype(str)),
+        np.char.add("STREET ", k.astype(str)),
+    ])
+    low = (np.arange(len(coords)) % 50 * 2 + 1).astype(str)
+    # A few unaddressed segments, as in the real street centerline
+    low[rng.random(len(coords)) < 0.05] = ""
+    return gpd.GeoDataFrame(
+        {"physicalid": np.arange(len(coords)), "full_stree": names,
+         "L_LOW_HN": low},
+        geometry=shapely.linestrings(coords),
+        crs=EPSG,
+    )
+
+
+def _along(
+    rings: np.ndarray, counts: np.ndarray, rng: np.random.Generator
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(points, owner)`` at random spots along each ring."""
+    owner = np.repeat(np.arange(len(rings)), counts)
+    measure = rng.random(len(owner)) * shapely.length(rings)[owner]
+    return shapely.line_interpolate_point(rings[owner], measure), owner
+
+
+def _trees(
+    walks: np.ndarray, rng: np.random.Generator
+) -> Tuple[gpd.GeoDataFrame, gpd.GeoDataFrame]:
+    """Return street trees and the planting spaces they stand in."""
+    per_block = int(shapely.length(walks[0]) / TREE_SPACING * TREE_FILL)
+    points, _ = _along(walks, np.full(len(walks), per_block), rng)
+    n_trees = len(points)
+    # One in five planting spaces is empty
+    empty, _ = _along(walks, np.full(len(walks), per_block // 4), rng)
+    spaces = np.concatenate([points, empty])
+    ids = np.char.add("PS-", np.arange(len(spaces)).astype(str))
+    planting = gpd.GeoDataFrame(
+        {
+            "globalid": ids,
+            "psstatus": np.where(
+                np.arange(len(spaces)) < n_trees, "Populated", "Empty"
+            ),
+            "jurisdiction": np.where(
+                rng.random(len(spaces)) < 0.05, "Private", "DPR"
+            ),
+        },
+        geometry=spaces,
+        crs=EPSG,
+    )
+    trees = gpd.GeoDataFrame(
+        {
+            "objectid": np.arange(n_trees),
+            "tpstructure": np.where(
+                rng.random(n_trees) < 0.95, "Full", "Retired"
+            ),
+            "tpcondition": rng.choice(
+                CONDITIONS, n_trees, p=[0.6, 0.25, 0.1, 0.03, 0.02]
+            ),
+            "dbh": np.round(rng.gamma(2.0, 6.0, n_trees), 1),
+            "plantingspaceglobalid": ids[:n_trees],
+        },
+        geometry=points,
+        crs=EPSG,
+    )
+    return trees, planting
+
+
+def _signs(
+    x0: np.ndarray, y0: np.ndarray, rng: np.random.Generator
+) -> gpd.GeoDataFrame:
+    """Return sign records just off the curb of each block side.
+
+    Coordinates sit *curb_shift* feet out in the street, the way the
+    source data places them, with the side of the street they face.
+    """
+    width, height = BLOCK_SIZE
+    per_side = np.maximum(
+        1, (np.array([width, height, width, height]) / SIGN_SPACING)
+    ).astype(int)
+    shift = DEFAULT_CURB_SHIFT
+    frames = []
+    # south, east, north and west block faces
+    for side, count, along in zip("NWSE", per_side, range(4)):
+        blocks = np.repeat(np.arange(len(x0)), count)
+        t = rng.random(len(blocks))
+        bx, by = x0[blocks], y0[blocks]
+        if along == 0:
+            x, y = bx + t * width, by - shift
+        elif along == 1:
+            x, y = bx + width + shift, by + t * height
+        elif along == 2:
+            x, y = bx + t * width, by + height + shift
+        else:
+            x, y = bx - shift, by + t * height
+        frames.append(pd.DataFrame({
+            "sign_x_coord": x,
+            "sign_y_coord": y,
+            "side_of_street": side,
+        }))
+    records = pd.concat(frames, ignore_index=True)
+    records["order_number"] = np.arange(len(records))
+    records["record_type"] = "Current"
+    records["sign_description"] = rng.choice(SIGN_TEXT, len(records))
+    return gpd.GeoDataFrame(
+        records,
+        geometry=shapely.points(
+            records["sign_x_coord"], records["sign_y_coord"]
+        ),
+        crs=EPSG,
+    )
+
+
+def _hydrants(
+    curbs: np.ndarray, rng: np.random.Generator
+) -> gpd.GeoDataFrame:
+    """Return hydrants a couple of feet inside each curb line."""
+    rings = shapely.get_exterior_ring(
+        shapely.buffer(curbs, -2.0, join_style=2)
+    )
+    points, _ = _along(
+        rings, np.full(len(curbs), HYDRANTS_PER_BLOCK), rng
+    )
+    return gpd.GeoDataFrame(
+        {"unitid": np.char.add("H", np.arange(len(points)).astype(str))},
+        geometry=points,
+        crs=EPSG,
+    )
+
+
+def _boundaries(
+    bounds: Tuple[float, float, float, float], splits: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(boxes, cell index)`` splitting *bounds* into a grid."""
+    minx, miny, maxx, maxy = bounds
+    xs = np.linspace(minx, maxx, splits + 1)
+    ys = np.linspace(miny, maxy, splits + 1)
+    i, j = np.meshgrid(np.arange(splits), np.arange(splits), indexing="ij")
+    i, j = i.ravel(), j.ravel()
+    return shapely.box(xs[i], ys[j], xs[i + 1], ys[j + 1]), i * splits + j
+
+
+def synthetic_city(
+    scale="block", seed: int = 0
+) -> Dict[str, gpd.GeoDataFrame]:
+    """Return the layers of a synthetic city at *scale*.
+
+    *scale* is a key of :data:`SCALES` or a number of blocks per side.
+    The same *scale* and *seed* always give the same layers. Layer names
+    and fields follow the sources the pipeline reads: ``sidewalk``,
+    ``curb``, ``street_center``, ``trees``, ``planting_spaces``,
+    ``street_sign``, ``hydrants``, ``borough`` and
+    ``community_districts`` (EPSG:2263, feet).
+    """
+    n = SCALES[scale] if isinstance(scale, str) else int(scale)
+    rng = np.random.default_rng(seed)
+    x0, y0 = _blocks(n)
+    curbs = shapely.box(x0, y0, x0 + BLOCK_SIZE[0], y0 + BLOCK_SIZE[1])
+    inner = shapely.buffer(curbs, -SIDEWALK_WIDTH, join_style=2)
+    walks = shapely.get_exterior_ring(
+        shapely.buffer(curbs, -SIDEWALK_WIDTH / 2.0, join_style=2)
+    )
+    block_ids = np.arange(len(curbs))
+    layers = {
+        "curb": gpd.GeoDataFrame(
+            {"BLOCK_ID": block_ids}, geometry=curbs, crs=EPSG
+        ),
+        "sidewalk": gpd.GeoDataFrame(
+            {"BLOCK_ID": block_ids},
+            geometry=shapely.difference(curbs, inner),
+            crs=EPSG,
+        ),
+        "street_center": _centerlines(n, rng),
+    }
+    layers["trees"], layers["planting_spaces"] = _trees(walks, rng)
+    layers["street_sign"] = _signs(x0, y0, rng)
+    layers["hydrants"] = _hydrants(curbs, rng)
+
+    bounds = tuple(layers["street_center"].total_bounds)
+    boxes, cell = _boundaries(bounds, 2)
+    layers["borough"] = gpd.GeoDataFrame(
+        {"BoroCode": cell + 1, "BoroName": BORO_NAMES[cell]},
+        geometry=boxes,
+        crs=EPSG,
+    )
+    # Four districts per borough quadrant
+    boxes, cell = _boundaries(bounds, 4)
+    i, j = cell // 4, cell % 4
+    boro = (i // 2) * 2 + j // 2 + 1
+    district = (i % 2) * 2 + j % 2 + 1
+    layers["community_districts"] = gpd.GeoDataFrame(
+        {"BoroCD": boro * 100 + district}, geometry=boxes, crs=EPSG
+    )
+    return layers
+
+
+def write_city(
+    gpkg_path: Path,
+    scale="block",
+    seed: int = 0,
+    layers: Optional[Dict[str, gpd.GeoDataFrame]] = None,
+) -> Dict[str, gpd.GeoDataFrame]:
+    """Write a :func:`synthetic_city` to *gpkg_path*; return its layers."""
+    if layers is None:
+        layers = synthetic_city(scale, seed)
+    for name, gdf in layers.items():
+        export_spatial_layer(gdf, name, gpkg_path)
+    return layers
@@ -0,0 +1,39 @@
+import geopandas as gpd
+from shapely.geometry import Point, box
+import stp.ops.attribute as at
+
+
+def _layers():
+    boro = gpd.GeoDataFrame(
+        {"BoroCode": [1, 2]}, geometry=[box(0, 0, 10, 10), box(10, 0, 20, 10)]
+    )
+    council = gpd.GeoDataFrame({"CounDist": [7]}, geometry=[box(5, 0, 15, 5)])
+    return {"borough": boro, "council": council}
+
+
+def test_attribute_all_layers_in_one_pass():
+    index = at.BoundaryIndex(
+        _layers(), {"borough": ["BoroCode"], "council": ["CounDist"]}
+    )
+    pts = gpd.GeoSeries([Point(1, 1), Point(12, 2), Point(50, 50)])
+    out = index.attribute(pts, batch_size=2)
+    assert list(out["BoroCode"][:2]) == [1, 2]
+    assert out["CounDist"].isna().tolist() == [True, False, True]
+
+
+def test_index_round_trip(tmp_path):
+    index = at.BoundaryIndex(_layers(), {"borough": ["BoroCode"]})
+    index.save(tmp_path / "idx.pkl")
+    loaded = at.BoundaryIndex.load(tmp_path / "idx.pkl")
+    assert loaded.attribute([Point(15, 5)])["BoroCode"].iloc[0] == 2
+
+
+def test_load_or_build_index_reuses_cache(tmp_path):
+    gpkg = tmp_path / "data.gpkg"
+    _layers()["borough"].to_file(gpkg, layer="borough", driver="GPKG")
+    cache = tmp_path / "idx.pkl"
+    at.load_or_build_index(cache, gpkg, {"borough": ["BoroCode"]})
+    built = cache.stat().st_mtime_ns
+    _layers()["council"].to_file(gpkg, layer="council", driver="GPKG")
+    at.load_or_build_index(cache, gpkg, {"borough": ["BoroCode"]})
+    assert cache.stat().st_mtime_ns == built
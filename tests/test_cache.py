@@ -0,0 +1,76 @@
+import geopandas as gpd
+import shapely
+
+from stp.pipeline.cache import StageCache
+from stp.pipeline.dag import Stage, run_graph
+from stp.storage.file_storage import export_spatial_layer, read_spatial_layer
+
+CALLS = []
+
+
+def _buffer(params):
+    CALLS.append("buffer")
+    gdf = read_spatial_layer(params["gpkg"], "points")
+    gdf = gdf.set_geometry(gdf.buffer(params["radius"]))
+    export_spatial_layer(gdf, "zones", params["gpkg"])
+
+
+def _area(params):
+    CALLS.append("area")
+    gdf = read_spatial_layer(params["gpkg"], "zones")
+    gdf["area"] = gdf.area * params["scale"]
+    export_spatial_layer(gdf, "areas", params["gpkg"])
+
+
+STAGES = [
+    Stage("buffer", _buffer, ("points",), ("zones",), params=("radius",)),
+    Stage("area", _area, ("zones",), ("areas",), params=("scale",)),
+]
+
+
+def _run(tmp_path, **params):
+    gpkg = tmp_path / "data.gpkg"
+    params = dict({"gpkg": str(gpkg), "radius": 1.0, "scale": 1.0}, **params)
+    cache = StageCache(tmp_path / "cache", gpkg)
+    CALLS.clear()
+    run_graph(STAGES, params, workers=1, cache=cache)
+    return list(CALLS), read_spatial_layer(gpkg, "areas")
+
+
+def test_stage_cache_reruns_only_affected_stages(tmp_path):
+    points = gpd.GeoDataFrame(
+        geometry=shapely.points([0, 10], [0, 0]), crs="EPSG:2263"
+    )
+    export_spatial_layer(points, "points", tmp_path / "data.gpkg")
+
+    assert _run(tmp_path)[0] == ["buffer", "area"]
+    assert _run(tmp_path)[0] == []
+    calls, areas = _run(tmp_path, scale=2.0)
+    assert calls == ["area"]
+    assert areas["area"].round(1).tolist() == [6.3, 6.3]
+    # Going back restores the earlier outputs from the cache
+    calls, areas = _run(tmp_path)
+    assert calls == []
+    assert areas["area"].round(1).tolist() == [3.1, 3.1]
+
+    status = StageCache(tmp_path / "cache", tmp_path / "data.gpkg").status(
+        STAGES, {"radius": 2.0, "scale": 1.0}
+    )
+    assert [s[2] for s in status] == ["miss", "miss"]
+
+
+def test_tiling_params_and_outside_writes_invalidate(tmp_path):
+    gpkg = tmp_path / "data.gpkg"
+    points = gpd.GeoDataFrame(
+        geometry=shapely.points([0, 10], [0, 0]), crs="EPSG:2263"
+    )
+    export_spatial_layer(points, "points", gpkg)
+    assert _run(tmp_path)[0] == ["buffer", "area"]
+    assert _run(tmp_path, tiles={"halo": 5.0})[0] == ["buffer", "area"]
+
+    # A tiled run rewrites an output behind the cache's back
+    export_spatial_layer(points, "areas", gpkg)
+    StageCache(tmp_path / "cache", gpkg).invalidate(["areas"])
+    calls, areas = _run(tmp_path)
+    assert calls == []
+    assert areas["area"].round(1).tolist() == [3.1, 3.1]
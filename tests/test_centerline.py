@@ -0,0 +1,18 @@
+import geopandas as gpd
+import shapely
+from shapely.geometry import box
+import stp.ops.centerline as cl
+
+
+def test_skeletonize_prunes_end_spurs():
+    line = cl.skeletonize([box(0, 0, 100, 8)])[0]
+    assert line.geom_type == "LineString"
+    assert 85 < line.length < 100
+
+
+def test_sidewalk_centerlines_keeps_attributes():
+    corner = shapely.union_all([box(0, 0, 200, 10), box(0, 0, 10, 150)])
+    sidewalks = gpd.GeoDataFrame({"sw_id": [7]}, geometry=[corner])
+    out = cl.sidewalk_centerlines(sidewalks, workers=1)
+    assert list(out["sw_id"]) == [7]
+    assert abs(out.length.iloc[0] - 330) < 10
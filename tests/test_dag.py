@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from stp.pipeline.dag import Stage, run_graph, select_stages, stage_graph
+
+
+def _stages(log, barrier=None):
+    def step(name):
+        def func(params):
+            if barrier is not None and name in ("b", "c"):
+                barrier.wait(timeout=5)  # only passes if b and c overlap
+            log.append(name)
+        return func
+
+    return [
+        Stage("a", step("a"), (), ("x",)),
+        Stage("b", step("b"), ("x",), ("y",)),
+        Stage("c", step("c"), ("x",), ("z",)),
+        Stage("d", step("d"), ("y", "z"), ("out",)),
+    ]
+
+
+def test_stage_graph_and_selection():
+    stages = _stages([])
+    assert stage_graph(stages) == {
+        "a": set(), "b": {"a"}, "c": {"a"}, "d": {"b", "c"},
+    }
+    names = [s.name for s in select_stages(stages, ["+b"])]
+    assert names == ["a", "b"]
+    names = [s.name for s in select_stages(stages, ["c+"])]
+    assert names == ["c", "d"]
+    with pytest.raises(ValueError):
+        stage_graph(stages + [Stage("e", print, (), ("x",))])
+
+
+def test_run_graph_overlaps_independent_stages():
+    log = []
+    seconds = run_graph(_stages(log, threading.Barrier(2)), {}, workers=2)
+    assert log[0] == "a" and log[-1] == "d"
+    assert set(seconds) == {"a", "b", "c", "d"}
+
+
+def test_pooled_stages_share_the_worker_budget():
+    seen = []
+    stages = [
+        Stage("a", lambda p: seen.append(p["parallel"]["workers"]), (),
+              ("x",))
+    ]
+    params = {"parallel": {"workers": 8}}
+    run_graph(stages, params, workers=2)
+    run_graph(stages, params, workers=1)
+    assert seen == [4, 8]
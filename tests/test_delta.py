@@ -0,0 +1,56 @@
+import geopandas as gpd
+import numpy as np
+import shapely
+
+import stp.pipeline.delta as dl
+from stp.pipeline.scheduler import grid_tiles, run_tiles
+from stp.storage.file_storage import export_spatial_layer, read_spatial_layer
+
+
+def _points(xs, n=None):
+    return gpd.GeoDataFrame(
+        {"n": np.arange(len(xs)) if n is None else n},
+        geometry=shapely.points(xs, np.full(len(xs), 5.0)),
+        crs="EPSG:2263",
+    )
+
+
+def _copy_points(params):
+    gdf = read_spatial_layer(params["gpkg"], "points")
+    export_spatial_layer(gdf, "out", params["gpkg"])
+
+
+def test_change_set_finds_inserts_updates_deletes():
+    old = _points([0.5, 1.5, 2.5])
+    new = _points([0.5, 9.5, 3.5], n=[0, 1, 3])
+    changes = dl.change_set(old, new, "n")
+    kinds = dict(zip(changes[dl.FEATURE_ID], changes[dl.CHANGE]))
+    assert kinds == {"1": "update", "2": "delete", "3": "insert"}
+    moved = changes[changes[dl.FEATURE_ID] == "1"].geometry.iloc[0]
+    assert moved.bounds == (1.5, 5.0, 9.5, 5.0)
+
+
+def test_delta_reruns_and_merges_only_dirty_tiles(tmp_path):
+    gpkg = tmp_path / "city.gpkg"
+    dl.record_changes(gpkg, "points", _points(np.arange(0.5, 40, 1.0)), "n")
+    tiles = grid_tiles((0, 0, 40, 10), size=10, crs="EPSG:2263")
+    params = {"gpkg": str(gpkg)}
+    work = tmp_path / "tiles"
+    assert run_tiles(
+        [_copy_points], params, tiles, ["out"], work_dir=work, halo=1.0,
+        workers=1,
+    ) == {}
+    dl.clear_changes(gpkg)
+
+    moved = _points(np.arange(0.5, 40, 1.0))
+    moved.loc[35, "geometry"] = shapely.Point(35.5, 6.0)
+    changes = dl.record_changes(gpkg, "points", moved, "n")
+    only = dl.dirty_tiles(tiles, dl.dirty_region(changes, grow=1.0))
+    assert only == ["3_0"]
+    assert run_tiles(
+        [_copy_points], params, tiles, ["out"], work_dir=work, halo=1.0,
+        only=only, workers=1,
+    ) == {}
+    out = read_spatial_layer(gpkg, "out").set_index("n")
+    assert len(out) == 40
+    assert out.geometry.loc[35].y == 6.0
@@ -0,0 +1,33 @@
+import geopandas as gpd
+import shapely
+from shapely.geometry import LineString, box
+import stp.ops.erase as er
+
+
+def test_erase_keeps_untouched_rows_and_attributes():
+    lines = gpd.GeoDataFrame(
+        {"sw_id": [1, 2]},
+        geometry=[
+            LineString([(0, 0), (10, 0)]),
+            LineString([(0, 50), (10, 50)]),
+        ],
+    )
+    zones = gpd.GeoSeries([box(4, -1, 6, 1), box(5, -1, 8, 1)])
+    out = er.pairwise_erase(lines, zones, workers=1)
+    assert list(out["sw_id"]) == [1, 2]
+    assert out.geometry.iloc[0].length == 6
+    assert out.geometry.iloc[1] is lines.geometry.iloc[1]
+
+
+def test_erase_drops_fully_erased():
+    lines = gpd.GeoDataFrame(geometry=[LineString([(0, 0), (1, 0)])])
+    out = er.pairwise_erase(lines, [box(-1, -1, 2, 1)], workers=1)
+    assert out.empty
+
+
+def test_erase_on_precision_grid():
+    lines = gpd.GeoDataFrame(geometry=[LineString([(0, 0), (10, 0)])])
+    zones = [box(4.0012, -1, 6.0049, 1)]
+    out = er.pairwise_erase(lines, zones, workers=1, grid_size=0.01)
+    coords = shapely.get_coordinates(out.geometry.values)
+    assert sorted(coords[:, 0]) == [0, 4.0, 6.0, 10]
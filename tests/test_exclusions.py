@@ -0,0 +1,72 @@
+import sqlite3
+
+import numpy as np
+import pytest
+from shapely.geometry import LineString, Point
+from stp.ops.exclusions import ExclusionIndex
+
+
+def test_exclusion_index_refresh_and_query(tmp_path):
+    lines = np.array(
+        [LineString([(0, 0), (100, 0)]), LineString([(0, 50), (100, 50)])],
+        dtype=object,
+    )
+    with ExclusionIndex.open(tmp_path / "ex.sqlite") as index:
+        index.insert("trees", [0], [10.0], [20.0])
+        touched = index.update_layer(
+            "hydrants", lines, np.array([Point(50, 1)]), 3.0, stamp="a",
+            ids=[0, 1],
+        )
+        assert list(touched) == [0]
+        hits = index.query(0, 15.0, 60.0)
+        assert list(hits["reason"]) == ["trees", "hydrants"]
+        assert len(index.query(1)) == 0
+
+        # Unchanged stamp is a no-op; a refresh touches old and new rows
+        assert len(
+            index.update_layer("hydrants", lines, [], stamp="a", ids=[0, 1])
+        ) == 0
+        touched = index.update_layer(
+            "hydrants", lines, np.array([Point(5, 49)]), 3.0, stamp="b",
+            ids=[0, 1],
+        )
+        assert list(touched) == [0, 1]
+        seg, start, end = index.intervals()
+        assert list(seg) == [0, 1]
+        assert start[0] == 10.0 and end[0] == 20.0
+
+
+def test_refresh_touches_only_changed_segments():
+    lines = np.array(
+        [LineString([(0, y), (100, y)]) for y in range(0, 500, 100)],
+        dtype=object,
+    )
+    hydrants = np.array([Point(50, y + 1) for y in range(0, 500, 100)])
+    with ExclusionIndex() as index:
+        ids = np.arange(5) * 10
+        touched = index.update_layer(
+            "hydrants", lines, hydrants, 3.0, "a", ids=ids
+        )
+        assert list(touched) == [0, 10, 20, 30, 40]
+        hydrants[2] = Point(70, 201)
+        touched = index.update_layer(
+            "hydrants", lines, hydrants, 3.0, "b", ids=ids
+        )
+        assert list(touched) == [20]
+
+        # Re-sorted sidewalk: rows follow the ids, not the positions
+        seg, start, end = index.intervals(ids=ids[::-1])
+        assert list(seg) == [0, 1, 2, 3, 4]
+        assert start[2] - start[0] == pytest.approx(20.0)
+
+
+def test_failed_replace_keeps_old_rows_and_stamp():
+    lines = np.array([LineString([(0, 0), (100, 0)])], dtype=object)
+    with ExclusionIndex() as index:
+        index.update_layer(
+            "hydrants", lines, [Point(50, 1)], 3.0, "a", ids=[7]
+        )
+        with pytest.raises(sqlite3.Error):
+            index.replace("hydrants", [7], [np.nan], [3.0], stamp="b")
+        assert index.stamp("hydrants") == "a"
+        assert list(index.intervals()[0]) == [7]
@@ -1,4 +1,9 @@
+import geopandas as gpd
+import pytest
+from shapely.geometry import Point
+
 import stp.storage.file_storage as fs
+from stp.core.tiles import hilbert_keys
 
 
 def test_sanitize_layer_name():
@@ -8,3 +13,24 @@ def test_sanitize_layer_name():
 def test_get_geopackage_path(tmp_path):
     gpkg = fs.get_geopackage_path(tmp_path)
     assert gpkg.parent == tmp_path
+
+
+@pytest.fixture
+def points():
+    pts = [Point(1, 0), Point(0, 0), None, Point(1, 1), Point(0, 1)]
+    return gpd.GeoDataFrame({"n": range(5)}, geometry=pts, crs=2263)
+
+
+def test_export_sorts_rows_along_hilbert_curve(tmp_path, points):
+    keys = hilbert_keys(points.geometry.values, (0, 0, 1, 1), level=1)
+    assert keys[[1, 4, 3, 0]].tolist() == [0, 1, 2, 3]
+    gpkg = tmp_path / "t.gpkg"
+    fs.export_spatial_layer(points, "pts", gpkg, sort=True)
+    assert fs.read_spatial_layer(gpkg, "pts")["n"].tolist() == [1, 4, 3, 0, 2]
+
+
+def test_parquet_bbox_read(tmp_path, points):
+    pytest.importorskip("pyarrow")
+    fs.export_parquet_layer(points.dropna(), tmp_path / "t.parquet")
+    got = fs.read_parquet_layer(tmp_path / "t.parquet", bbox=(0, 0, 0.5, 2))
+    assert got["n"].tolist() == [1, 4]
@@ -0,0 +1,36 @@
+import numpy as np
+from shapely.geometry import LineString, Polygon
+import stp.ops.linear as lin
+
+
+def test_merge_intervals_per_line():
+    line, start, end = lin.merge_intervals(
+        np.array([0, 0, 1, 0]),
+        np.array([5.0, 1.0, 0.0, 20.0]),
+        np.array([8.0, 6.0, 1.0, 30.0]),
+    )
+    assert list(line) == [0, 0, 1]
+    assert list(start) == [1.0, 20.0, 0.0]
+    assert list(end) == [8.0, 30.0, 1.0]
+
+
+def test_place_points_skips_exclusions_and_corners():
+    lines = [
+        LineString([(0, 0), (100, 0)]),
+        LineString([(100, 0), (100, 80)]),
+    ]
+    zone = Polygon([(40, -5), (60, -5), (60, 5), (40, 5)])
+    out = lin.place_points(lines, 25, [zone])
+    xs = out.geometry.x.to_numpy()
+    assert not ((xs > 40) & (xs < 60) & (out.geometry.y == 0)).any()
+    geoms = np.asarray(out.geometry.values)
+    a, b = lin.conflict_pairs(geoms, 24.99)
+    parent = out["PARENT_FID"].to_numpy()
+    assert not (parent[a] != parent[b]).any()
+    assert list(parent).count(0) == 4
+
+
+def test_line_substrings_keeps_inner_vertices():
+    line = LineString([(0, 0), (10, 0), (10, 10)])
+    (piece,) = lin.line_substrings([line], [5.0], [15.0])
+    assert list(piece.coords) == [(5, 0), (10, 0), (10, 5)]
@@ -0,0 +1,16 @@
+from shapely.geometry import LineString
+import stp.ops.nodes as nd
+
+
+def test_intersection_buffers_once_per_true_node():
+    lines = [
+        LineString([(0, 0), (100, 0)]),
+        LineString([(100.2, 0.1), (200, 0)]),
+        LineString([(100, 0), (100, 100)]),
+        LineString([(200, 0), (300, 0)]),
+    ]
+    nodes = nd.centerline_nodes(lines)
+    assert sorted(nodes["DEGREE"]) == [1, 1, 1, 2, 3]
+    buffers = nd.intersection_buffers(lines, distance=40)
+    assert len(buffers) == 1
+    assert round(buffers.geometry.iloc[0].centroid.x) == 100
@@ -0,0 +1,21 @@
+import geopandas as gpd
+from shapely.geometry import box
+import stp.ops.overlay as ov
+
+
+def test_planar_overlay_keeps_attributes_per_face():
+    districts = gpd.GeoDataFrame(
+        {"CounDist": [1, 2]}, geometry=[box(0, 0, 10, 10), box(10, 0, 20, 10)]
+    )
+    hvi = gpd.GeoDataFrame({"HVI": [5]}, geometry=[box(5, 0, 15, 10)])
+    out = ov.planar_overlay(
+        {"council": districts, "hvi": hvi},
+        {"council": ["CounDist"], "hvi": ["HVI"]},
+        tile_size=4,
+        workers=1,
+    )
+    assert len(out) == 4
+    assert abs(out.area.sum() - 200) < 1e-9
+    both = out[(out["CounDist"] == 2) & (out["HVI"] == 5)]
+    assert abs(both.area.sum() - 50) < 1e-9
+    assert out["HVI"].isna().sum() == 2
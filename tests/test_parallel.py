@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import shapely
+
+from stp.core import parallel
+
+
+def _buffer(geoms, distance):
+    return shapely.buffer(geoms, distance)
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    geoms = shapely.points(rng.random((500, 2)) * 1000)
+    geoms[[3, 70]] = None
+    return geoms
+
+
+def test_shared_geometries_round_trip(points):
+    rows = np.array([70, 1, 3, 499])
+    with parallel.SharedGeometries(points) as shared:
+        got = parallel.read_shared(shared.handle, rows)
+    assert got[0] is None and got[2] is None
+    assert shapely.equals(got[[1, 3]], points[[1, 499]]).all()
+
+
+def test_spatial_chunks_cover_every_row_once(points):
+    chunks = parallel.spatial_chunks(points, chunk_size=64)
+    assert sorted(np.concatenate(chunks).tolist()) == list(range(500))
+    assert max(len(c) for c in chunks) <= 64
+
+
+@pytest.mark.parametrize("mode", ["process", "thread"])
+def test_map_geometries_matches_serial(points, mode):
+    got = parallel.map_geometries(
+        _buffer, points, 5.0, workers=2, mode=mode, chunk_size=100
+    )
+    want = shapely.buffer(points, 5.0)
+    assert shapely.equals(got[~shapely.is_missing(want)],
+                          want[~shapely.is_missing(want)]).all()
+    assert shapely.is_missing(got[[3, 70]]).all()
+    areas = parallel.map_geometries(
+        shapely.area, want, workers=2, mode=mode, chunk_size=100
+    )
+    assert areas.dtype == float and np.isclose(areas[0], want[0].area)
+
+
+def _split(geoms, erasers, distance):
+    grown = shapely.buffer(erasers, distance)
+    return shapely.difference(geoms, shapely.union_all(grown)), grown.size
+
+
+def test_map_shared_returns_geometries_through_shared_memory(points):
+    tasks = [(np.arange(0, 250), np.array([0, 1]), 5.0),
+             (np.arange(250, 500), np.array([2]), 5.0)]
+    with parallel.worker_pool(2) as pool:
+        got = parallel.map_shared(_split, (points, points), tasks, pool)
+    want = parallel.map_shared(_split, (points, points), tasks)
+    for (geoms, n), (expected, m) in zip(got, want):
+        assert n == m
+        assert (shapely.to_wkb(geoms) == shapely.to_wkb(expected)).all()
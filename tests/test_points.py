@@ -0,0 +1,15 @@
+import geopandas as gpd
+from shapely.geometry import LineString
+import stp.ops.points as pts
+
+
+def test_generate_points_ragged_with_rank_fields():
+    lines = gpd.GeoSeries(
+        [LineString([(0, 0), (60, 0)]), LineString([(0, 10), (10, 10)])],
+        index=[11, 12],
+    )
+    out = pts.generate_points(lines, 25)
+    assert list(out["PARENT_FID"]) == [11, 11, 11, 12]
+    assert list(out.geometry.x[:3]) == [5.0, 30.0, 55.0]
+    assert out["PARENT_LEN"].iloc[-1] == 10
+    assert out.geometry.x.iloc[-1] == 5.0
@@ -0,0 +1,21 @@
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import LineString
+import stp.ops.prune as pr
+
+
+def test_rank_dominant_prune_longer_line_wins():
+    lines = gpd.GeoDataFrame(
+        {"side": ["long", "short"]},
+        geometry=[
+            LineString([(0, 0), (100, 0)]),
+            LineString([(0, 10), (60, 10)]),
+        ],
+    )
+    points, kept = pr.rank_dominant_prune(lines, 25)
+    geoms = np.asarray(points.geometry.values)
+    a, b = pr.conflict_pairs(geoms, 25)
+    parent = points["PARENT_FID"].to_numpy()
+    assert not (parent[a] != parent[b]).any()
+    assert (points.geometry.y == 0).sum() == 5
+    assert "long" in set(kept["side"])
@@ -0,0 +1,48 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+
+rasterio = pytest.importorskip("rasterio")
+from rasterio.transform import from_origin  # noqa: E402
+
+import stp.ops.raster as rs  # noqa: E402
+
+
+def test_raster_to_polygons_merges_window_seams(tmp_path):
+    data = np.zeros((10, 10), dtype=np.uint8)
+    data[2:8, 2:8] = 2  # one grass block spanning four windows
+    data[0, 9] = 2  # a lone pixel inside a single window
+    data[9, 0] = 5
+    tif = tmp_path / "land.tif"
+    with rasterio.open(
+        tif, "w", driver="GTiff", height=10, width=10, count=1,
+        dtype="uint8", crs="EPSG:2263",
+        transform=from_origin(0, 10, 1, 1),
+    ) as dst:
+        dst.write(data, 1)
+
+    gpkg = tmp_path / "out.gpkg"
+    count = rs.raster_to_polygons(tif, gpkg, "grass", window=4, workers=1)
+    out = gpd.read_file(gpkg, layer="grass")
+    assert count == len(out) == 2
+    assert sorted(out.area) == [1.0, 36.0]
+    assert set(out["Pit_Type"]) == {"EP/LP"}
+
+
+def test_raster_to_polygons_replaces_layer_when_nothing_found(tmp_path):
+    tif = tmp_path / "land.tif"
+    with rasterio.open(
+        tif, "w", driver="GTiff", height=4, width=4, count=1,
+        dtype="uint8", crs="EPSG:2263",
+        transform=from_origin(0, 4, 1, 1),
+    ) as dst:
+        dst.write(np.zeros((4, 4), dtype=np.uint8), 1)
+
+    gpkg = tmp_path / "out.gpkg"
+    stale = gpd.GeoDataFrame(
+        {"Pit_Type": ["old"]}, geometry=gpd.points_from_xy([1], [1]),
+        crs="EPSG:2263",
+    )
+    stale.to_file(gpkg, layer="grass", driver="GPKG")
+    assert rs.raster_to_polygons(tif, gpkg, "grass", workers=1) == 0
+    assert len(gpd.read_file(gpkg, layer="grass")) == 0
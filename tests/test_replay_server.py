@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from stp.testing.replay_server import ReplayServer  # noqa: E402
+from stp.testing.synth import synthetic_city  # noqa: E402
+
+
+@pytest.fixture
+def trees():
+    return synthetic_city("block")["trees"]
+
+
+def test_arcgis_query_pages_until_transfer_limit(trees):
+    with ReplayServer(page_limit=50) as server:
+        server.add("trees", trees)
+        url = server.arcgis_url("trees")
+        meta = requests.get(url, params={"f": "json"}).json()
+        assert meta["maxRecordCount"] == 50
+
+        frames, offset, more = [], 0, True
+        while more:
+            resp = requests.get(f"{url}/query", params={
+                "where": "1=1", "outFields": "*", "f": "geojson",
+                "outSR": 4326, "resultOffset": offset,
+            })
+            page = resp.json()
+            frames.append(page["features"])
+            more = page["properties"]["exceededTransferLimit"]
+            offset += len(page["features"])
+        assert [len(f) for f in frames] == [50, 50, 20]
+        esri = requests.get(f"{url}/query", params={"f": "json"}).json()
+        assert set(esri["features"][0]["geometry"]) == {"x", "y"}
+
+        rows = requests.get(server.socrata_url("trees"), params={
+            "$limit": 30, "$offset": 100, "$order": "objectid DESC",
+        }).json()
+        assert [r["objectid"] for r in rows[:2]] == [19, 18]
+        assert rows[0]["geometry"]["type"] == "Point"
+
+
+def test_throttling_and_injected_errors(trees):
+    with ReplayServer(latency=0.2, max_concurrent=1) as server:
+        server.add("trees", trees)
+        url = server.socrata_url("trees")
+        codes = []
+        threads = [
+            threading.Thread(
+                target=lambda: codes.append(requests.get(url).status_code)
+            )
+            for _ in range(2)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(codes) == [200, 429]
+        assert server.stats["throttled"] == 1
+
+    with ReplayServer(error_every=2) as server:
+        server.add("trees", trees)
+        codes = [
+            requests.get(server.socrata_url("trees")).status_code
+            for _ in range(4)
+        ]
+        assert codes == [200, 500, 200, 500]
+
+
+def test_arcgis_envelope_filter(trees):
+    minx, miny, maxx, maxy = trees.total_bounds
+    box = f"{minx},{miny},{(minx + maxx) / 2},{maxy}"
+    with ReplayServer() as server:
+        server.add("trees", trees)
+        count = requests.get(server.arcgis_url("trees") + "/query", params={
+            "geometry": box, "inSR": 2263, "returnCountOnly": "true",
+        }).json()["count"]
+    assert 0 < count < len(trees)
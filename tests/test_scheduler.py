@@ -0,0 +1,60 @@
+import geopandas as gpd
+import numpy as np
+import shapely
+
+import stp.pipeline.scheduler as sc
+from stp.storage.file_storage import export_spatial_layer, read_spatial_layer
+
+
+def _buffer_points(params):
+    gdf = read_spatial_layer(params["gpkg"], "points")
+    if params.get("fail") and (gdf.geometry.x > 15).any():
+        raise RuntimeError("boom")
+    gdf = gdf.set_geometry(gdf.buffer(1.0))
+    export_spatial_layer(gdf, "out", params["gpkg"])
+
+
+def _source(tmp_path):
+    xs = np.arange(0.5, 20, 1.0)
+    points = gpd.GeoDataFrame(
+        {"n": np.arange(len(xs))},
+        geometry=shapely.points(xs, np.full(len(xs), 5.0)),
+        crs="EPSG:2263",
+    )
+    gpkg = tmp_path / "city.gpkg"
+    export_spatial_layer(points, "points", gpkg)
+    return gpkg
+
+
+def test_run_tiles_stitches_without_seam_duplicates(tmp_path):
+    gpkg = _source(tmp_path)
+    tiles = sc.grid_tiles((0, 0, 20, 10), size=10, crs="EPSG:2263")
+    assert len(tiles) == 2
+    failed = sc.run_tiles(
+        [_buffer_points], {"gpkg": str(gpkg)}, tiles, ["out"],
+        work_dir=tmp_path / "tiles", halo=2.0, workers=1,
+    )
+    assert failed == {}
+    out = read_spatial_layer(gpkg, "out")
+    assert sorted(out["n"]) == list(range(20))
+
+
+def test_run_tiles_reports_and_retries_failed_tile(tmp_path):
+    gpkg = _source(tmp_path)
+    tiles = sc.grid_tiles((0, 0, 20, 10), size=10, crs="EPSG:2263")
+    work = tmp_path / "tiles"
+    params = {"gpkg": str(gpkg), "fail": True}
+    failed = sc.run_tiles(
+        [_buffer_points], params, tiles, ["out"],
+        work_dir=work, halo=2.0, retries=0, workers=1,
+    )
+    assert list(failed) == ["1_0"]
+    assert "boom" in failed["1_0"]
+    assert (work / "tile_0_0.done").exists()
+
+    failed = sc.run_tiles(
+        [_buffer_points], {"gpkg": str(gpkg)}, tiles, ["out"],
+        work_dir=work, halo=2.0, only=["1_0"], workers=1,
+    )
+    assert failed == {}
+    assert len(read_spatial_layer(gpkg, "out")) == 20
@@ -0,0 +1,29 @@
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import LineString
+import stp.ops.signs as sg
+
+
+def test_signs_split_and_flag_sidewalks():
+    records = pd.DataFrame({
+        "sign_description": [
+            "NO STANDING ANYTIME -->", "NO PARKING <->", "BUS STOP ->",
+        ],
+        "side_of_street": ["N", "n", "N"],
+        "sign_x_coord": [50, 80, 10],
+        "sign_y_coord": [0, 0, 0],
+    })
+    signs = sg.clean_signs(records, curb_shift=5)
+    assert list(signs["sign_type"]) == ["NSTAND", "NPARK"]
+    sidewalks = gpd.GeoDataFrame(
+        {"name": ["a"]},
+        geometry=[LineString([(0, 5), (100, 5)])],
+        crs=2263,
+    )
+    snapped, orphans = sg.snap_signs(signs, sidewalks)
+    assert len(orphans) == 0
+    out = sg.no_standing_segments(sidewalks, snapped)
+    assert [round(g.length, 1) for g in out.geometry] == [48.5, 48.5]
+    assert list(out["no_stand"]) == [0, 1]
+    assert list(out["name"]) == ["a", "a"]
+
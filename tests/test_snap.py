@@ -0,0 +1,18 @@
+import geopandas as gpd
+from shapely.geometry import LineString, Point, box
+import stp.ops.snap as sn
+
+
+def test_snap_points_to_lines_and_polygon_edges():
+    points = gpd.GeoDataFrame(
+        {"name": ["a", "b", "far"]},
+        geometry=[Point(30, 4), Point(50, 57), Point(500, 500)],
+    )
+    targets = [LineString([(0, 0), (100, 0)]), box(0, 50, 100, 60)]
+    out = sn.snap_points(points, targets, max_distance=10)
+    assert list(out["SNAP_ID"]) == [0, 1, -1]
+    assert list(out["SNAP_DIST"][:2]) == [4.0, 3.0]
+    assert out.geometry.iloc[0].equals(Point(30, 0))
+    assert out.geometry.iloc[1].equals(Point(50, 60))
+    assert out["MEASURE"].iloc[0] == 30.0
+    assert out.geometry.iloc[2].equals(Point(500, 500))
@@ -0,0 +1,60 @@
+import shapely
+
+from stp.cli import stp_pipeline as sp
+from stp.pipeline.dag import run_graph, stage_graph
+from stp.pipeline.delta import CHANGES_LAYER, record_changes
+from stp.pipeline.scheduler import TILE_ID
+from stp.storage.file_storage import list_spatial_layers, read_spatial_layer
+from stp.testing.synth import write_city
+
+
+def test_join_waits_for_the_configured_boundaries():
+    params = {"boundaries": {"census_tracts": ["BoroCT2020"]}}
+    join = {s.name: s for s in sp._stages(params)}["join_and_export"]
+    assert join.inputs == ("planting_points", "census_tracts")
+    graph = stage_graph(sp._stages(params))
+    assert graph["join_and_export"] == {"generate_planting_locations"}
+
+
+def test_delta_after_a_citywide_run_runs_every_tile(tmp_path):
+    gpkg = tmp_path / "city.gpkg"
+    city = write_city(gpkg, "block")
+    params = {
+        "gpkg": str(gpkg),
+        "boundaries": {"borough": ["BoroCode"]},
+        "boundary_index": str(tmp_path / "index.pkl"),
+        "tiles": {"size": 1000, "work_dir": str(tmp_path / "tiles")},
+        "parallel": {"workers": 1},
+    }
+    run_graph(sp._stages(params), params, workers=1)
+    before = read_spatial_layer(gpkg, "planting_points")
+    assert len(before) and TILE_ID not in before
+
+    hydrants = city["hydrants"].copy()
+    hydrants.loc[0, "geometry"] = shapely.Point(980100.0, 190000.0)
+    record_changes(gpkg, "hydrants", hydrants, "unitid")
+    sp.run_delta(params)
+    after = read_spatial_layer(gpkg, "planting_points")
+    assert TILE_ID in after
+    assert len(after) == len(before)
+    assert CHANGES_LAYER not in list_spatial_layers(gpkg)
+
+    # Now stitched: the next delta reruns only the tiles it touches,
+    # grown by the sidewalk the moved hydrant sits on
+    hydrants.loc[0, "geometry"] = shapely.Point(980100.0, 190010.0)
+    record_changes(gpkg, "hydrants", hydrants, "unitid")
+    sp.run_delta(params)
+    again = read_spatial_layer(gpkg, "planting_points")
+    assert len(again) == len(before)
+
+
+def test_config_is_merged_over_the_packaged_defaults(tmp_path):
+    config = tmp_path / "run.yaml"
+    config.write_text("spacing: 10\ntiles:\n  size: 500\n")
+    params = sp.load_parameters(config)
+    assert params["spacing"] == 10
+    assert params["tiles"]["size"] == 500
+    assert "halo" in params["tiles"]
+    assert "community_districts" in params["boundaries"]
+    # Building the graph needs no boundaries; only the join does
+    assert sp._stages({})[-1].inputs == ("planting_points",)
@@ -0,0 +1,52 @@
+import pytest
+import shapely
+
+from stp.pipeline.study_area import (
+    apply_study_area,
+    resolve_study_area,
+    study_mask,
+)
+from stp.storage.file_storage import read_spatial_layer
+from stp.testing.synth import write_city
+
+
+@pytest.fixture
+def city(tmp_path):
+    gpkg = tmp_path / "city.gpkg"
+    return gpkg, write_city(gpkg, "neighborhood")
+
+
+def test_resolve_forms(city):
+    gpkg, layers = city
+    districts = layers["community_districts"]
+    want = districts.loc[districts["BoroCD"] == 101].geometry.iloc[0]
+    fields = {"community_districts": ["BoroCD"]}
+    area = resolve_study_area("community_districts:101", gpkg, fields)
+    assert area.equals(want)
+    assert resolve_study_area([0, 0, 1, 2], gpkg).bounds == (0, 0, 1, 2)
+    assert resolve_study_area(want.wkt, gpkg).equals_exact(want, 1e-6)
+    lonlat = resolve_study_area(
+        {"bbox": [-74.0, 40.7, -73.99, 40.71], "crs": 4326}, gpkg, crs=2263
+    )
+    assert lonlat.bounds[0] > 900_000
+    with pytest.raises(ValueError):
+        resolve_study_area("community_districts:999", gpkg, fields)
+    # Boundary layers from elsewhere (e.g. PostGIS) through a reader
+    area = resolve_study_area(
+        "community_districts:101", None, fields, reader=layers.get
+    )
+    assert area.equals(want)
+
+
+def test_reads_are_limited_to_the_study_area(city):
+    gpkg, layers = city
+    params = apply_study_area(
+        {"study_area": "community_districts:101",
+         "boundaries": {"community_districts": ["BoroCD"]}},
+        gpkg,
+    )
+    area = study_mask(params)
+    assert study_mask({}) is None
+    trees = read_spatial_layer(gpkg, "trees", mask=area)
+    assert 0 < len(trees) < len(layers["trees"])
+    assert shapely.intersects(trees.geometry.values, area).all()
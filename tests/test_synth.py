@@ -0,0 +1,27 @@
+import numpy as np
+
+from stp.ops.signs import clean_signs
+from stp.testing.benchmark import run_benchmarks
+from stp.testing.synth import synthetic_city
+
+
+def test_synthetic_city_is_deterministic_and_aligned():
+    city = synthetic_city("block", seed=3)
+    again = synthetic_city("block", seed=3)
+    assert set(city) >= {"sidewalk", "street_center", "trees", "hydrants"}
+    for name, gdf in city.items():
+        assert gdf.geom_equals(again[name]).all(), name
+    sidewalk = city["sidewalk"].union_all()
+    assert city["trees"].within(sidewalk).all()
+    # Signs sit in the street but land on the sidewalk once cleaned
+    signs = clean_signs(city["street_sign"])
+    assert len(signs) and signs.within(sidewalk.buffer(0.01)).all()
+    other = synthetic_city("block", seed=4)
+    trees_x = city["trees"].geometry.x
+    assert not np.array_equal(trees_x, other["trees"].geometry.x)
+
+
+def test_run_benchmarks_records_each_case():
+    results = run_benchmarks(["block"], ["clean", "points"], repeat=1)
+    assert [r["case"] for r in results] == ["clean", "points"]
+    assert all(r["seconds"] > 0 and r["rows"] > 0 for r in results)
@@ -0,0 +1,69 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+
+from stp.pipeline.dag import Stage, run_graph
+from stp.pipeline.trace import RunTrace, current_rss, measure
+from stp.storage.file_storage import export_spatial_layer, read_spatial_layer
+
+
+def _make(params):
+    points = gpd.GeoDataFrame(
+        geometry=shapely.points(range(5), range(5)), crs="EPSG:2263"
+    )
+    export_spatial_layer(points, "points", params["gpkg"])
+
+
+def _keep_two(params):
+    points = read_spatial_layer(params["gpkg"], "points")
+    export_spatial_layer(points.iloc[:2], "two", params["gpkg"])
+
+
+def test_run_trace_reports_stage_rows_and_profiles(tmp_path):
+    stages = [
+        Stage("make", _make, (), ("points",)),
+        Stage("keep_two", _keep_two, ("points",), ("two",)),
+    ]
+    trace = RunTrace(tmp_path / "traces", profile=True)
+    run_graph(
+        stages, {"gpkg": str(tmp_path / "d.gpkg")}, workers=1, trace=trace
+    )
+    paths = trace.write()
+
+    report = json.loads(paths["report"].read_text())
+    rows = {
+        r["stage"]: (r["rows_in"], r["rows_out"]) for r in report["stages"]
+    }
+    assert rows == {"make": (0, 5), "keep_two": (5, 2)}
+    assert all(r["cpu"] >= 0 and r["peak_rss"] for r in report["stages"])
+    events = json.loads(paths["trace"].read_text())["traceEvents"]
+    assert [e["name"] for e in events] == ["make", "keep_two"]
+    assert (trace.profile_dir / "keep_two.prof").exists()
+
+
+def _spin(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+
+def _big(params):
+    block = np.ones(16 * 1024 * 1024)  # 128 MB
+    time.sleep(0.3)
+    del block
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(_spin, 0.3).result()
+
+
+@pytest.mark.skipif(current_rss() is None, reason="no current RSS here")
+def test_measure_samples_stage_peaks_and_counts_worker_cpu():
+    big = measure("big", _big, {})
+    small = measure("small", lambda params: None, {})
+    assert big["peak_rss"] - small["peak_rss"] > 64 * 1024 * 1024
+    assert big["cpu_children"] >= 0.2
+    assert big["cpu"] >= big["cpu_children"]
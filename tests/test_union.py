@@ -0,0 +1,51 @@
+import shapely
+from shapely.geometry import Point, box
+import stp.ops.union as un
+
+
+def test_union_polygons_merges_across_tiles():
+    buffers = [Point(x, 0).buffer(3) for x in range(0, 100, 4)]
+    merged = un.union_polygons(buffers, tile_size=10, workers=1)
+    expected = shapely.union_all(buffers)
+    assert merged.symmetric_difference(expected).area < 1e-6
+    assert merged.geom_type == "Polygon"
+
+
+def test_union_polygons_coverage():
+    cells = [box(x, y, x + 1, y + 1) for x in range(5) for y in range(5)]
+    merged = un.union_polygons(cells, coverage=True, tile_size=2, workers=2)
+    assert merged.equals(box(0, 0, 5, 5))
+
+
+def test_union_polygons_on_precision_grid():
+    # Near-coincident edges from two sources close on a 0.01 grid
+    cells = [box(0, 0, 1, 1), box(1.003, 0, 2, 1.002)]
+    merged = un.union_polygons(cells, workers=1, grid_size=0.01)
+    assert merged.geom_type == "Polygon"
+    assert merged.equals(box(0, 0, 2, 1))
+
+
+def test_union_polygons_merges_when_buffers_exceed_half_a_tile():
+    buffers = [Point(x, 0).buffer(30) for x in range(0, 400, 4)]
+    merged = un.union_polygons(buffers, tile_size=10, workers=1)
+    assert merged.geom_type == "Polygon"
+    assert merged.symmetric_difference(shapely.union_all(buffers)).area < 1e-6
+
+
+def test_union_polygons_merges_oversized_inputs_last(monkeypatch):
+    seen = []
+    real = un._union_chunk
+
+    def spy(geoms, coverage, core, *args):
+        seen.append(core)
+        return real(geoms, coverage, core, *args)
+
+    monkeypatch.setattr(un, "_union_chunk", spy)
+    cells = [box(x, y, x + 1, y + 1) for x in range(0, 100, 3)
+             for y in range(0, 100, 3)]
+    park = box(10, 10, 60, 20)
+    merged = un.union_polygons(cells + [park], tile_size=10, workers=1)
+    expected = shapely.union_all(cells + [park])
+    assert merged.symmetric_difference(expected).area < 1e-6
+    # The park does not shrink the first level's tile cores to nothing
+    assert all(core is not None for core in seen[:100])